@@ -0,0 +1,182 @@
+"""
+Contrôle d'admission des analyses de CV.
+
+Remplace le simple Semaphore global : la concurrence est alignée sur la taille
+de l'executor, la file d'attente est bornée (rejet immédiat avec Retry-After)
+et les demandes en attente sont servies à tour de rôle par utilisateur, afin
+qu'un upload en masse ne bloque pas les uploads unitaires des autres.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Hashable, Optional
+
+
+class AdmissionRejected(Exception):
+    """Levée quand une analyse ne peut pas être admise (file pleine ou attente trop longue)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Limiteur de concurrence avec file bornée et équité par utilisateur (round-robin)"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_wait: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+
+        self._active = 0
+        # Une file FIFO par utilisateur ; l'ordre du dict donne le tour de rôle
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._queued = 0
+
+        # Durée moyenne (EWMA) d'occupation d'un slot, pour estimer Retry-After
+        self._avg_service_time = 5.0
+
+        # Métriques exportées
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.timeout_total = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def estimate_retry_after(self, extra: int = 1) -> int:
+        """Estime en secondes le temps avant qu'un slot se libère pour `extra` demandes"""
+        waves = (self._queued + extra) / self.max_concurrent
+        return max(1, int(math.ceil(waves * self._avg_service_time)))
+
+    def check_capacity(self, count: int) -> None:
+        """Vérifie qu'un lot de `count` analyses peut être accepté, sinon lève AdmissionRejected"""
+        free_slots = self.max_concurrent - self._active
+        if self._queued + count - max(0, free_slots) > self.max_queue:
+            self.rejected_total += 1
+            raise AdmissionRejected(
+                "Serveur surchargé, trop d'analyses en attente.",
+                retry_after=self.estimate_retry_after(count)
+            )
+
+    async def acquire(self, key: Hashable) -> float:
+        """Attend un slot d'analyse pour `key` (l'utilisateur) et retourne le temps d'attente"""
+        # Chemin rapide : slot libre et personne en attente
+        if self._active < self.max_concurrent and self._queued == 0:
+            self._active += 1
+            self._record_admission(0.0)
+            return 0.0
+
+        if self._queued >= self.max_queue:
+            self.rejected_total += 1
+            raise AdmissionRejected(
+                "Serveur surchargé, trop d'analyses en attente.",
+                retry_after=self.estimate_retry_after()
+            )
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._queues.setdefault(key, deque()).append(waiter)
+        self._queued += 1
+        start = time.monotonic()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Le slot a été attribué juste avant l'annulation : le rendre
+                self.release()
+            else:
+                waiter.cancel()
+                self._remove_waiter(key, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeout_total += 1
+                raise AdmissionRejected(
+                    "Temps d'attente dépassé, le serveur est trop chargé.",
+                    retry_after=self.estimate_retry_after()
+                )
+            raise
+
+        waited = time.monotonic() - start
+        self._record_admission(waited)
+        return waited
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        """Libère un slot et le transmet à la prochaine demande (tour de rôle par utilisateur)"""
+        if service_time is not None:
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * service_time
+        self._active -= 1
+        while self._queues and self._active < self.max_concurrent:
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable):
+        """Context manager : `async with controller.slot(user_id) as waited: ...` (waited = attente en s)"""
+        waited = await self.acquire(key)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(time.monotonic() - start)
+
+    def _remove_waiter(self, key: Hashable, waiter: asyncio.Future) -> None:
+        queue = self._queues.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+            self._queued -= 1
+        except ValueError:
+            return
+        if not queue:
+            del self._queues[key]
+
+    def _record_admission(self, waited: float) -> None:
+        self.admitted_total += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+
+    def snapshot(self) -> Dict:
+        """Retourne les métriques courantes (profondeur de file, temps d'attente, rejets)"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "queued_users": len(self._queues),
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "timeout_total": self.timeout_total,
+            "wait_time_avg": round(self.wait_time_total / self.admitted_total, 3) if self.admitted_total else 0.0,
+            "wait_time_max": round(self.wait_time_max, 3),
+            "avg_service_time": round(self._avg_service_time, 3),
+        }
+
+
+# Nombre de threads de l'executor d'analyse (une analyse occupe un thread à la fois)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+
+analysis_admission = AdmissionController(
+    max_concurrent=int(os.getenv("MAX_CONCURRENT_ANALYSES", str(ANALYSIS_WORKERS))),
+    max_queue=int(os.getenv("ANALYSIS_MAX_QUEUE", "20")),
+    max_wait=float(os.getenv("ANALYSIS_MAX_QUEUE_WAIT", "60")),
+)
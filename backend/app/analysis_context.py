@@ -0,0 +1,35 @@
+"""
+Résultats intermédiaires d'une analyse, calculés une seule fois par requête.
+
+Les deux niveaux de l'analyse (analyze_cv_fast, complete_analysis), le score de correspondance
+du profil et le score global recalculaient chacun les compétences requises du poste, le résumé
+du CV, les mots-clés de la description et plusieurs similarités (dont certaines deux fois dans
+la même fonction). Le contexte de l'analyseur les mémorise pour la durée de la requête.
+
+Les clés contiennent les textes d'entrée : une valeur mémorisée est toujours celle qui aurait
+été recalculée (le résultat de l'analyse est inchangé, voir benchmarks/golden).
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable
+
+
+@dataclass
+class AnalysisContext:
+    """Mémo d'une analyse (CV, description du poste), porté par le CVAnalyzer de la requête"""
+    cv_text: str = ""
+    job_description: str = ""
+    values: Dict[Hashable, Any] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+    def matches(self, cv_text: str, job_description: str) -> bool:
+        return self.cv_text == cv_text and self.job_description == job_description
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Valeur mémorisée pour `key`, calculée au premier appel (une erreur n'est pas mémorisée)"""
+        if key in self.values:
+            self.hits += 1
+            return self.values[key]
+        value = self.values[key] = compute()
+        self.misses += 1
+        return value
@@ -0,0 +1,125 @@
+"""
+Stockage des textes volumineux d'une analyse, hors de la ligne analyses.
+
+Chaque ligne analyses contenait la description du poste complète (répétée pour chaque CV
+d'un upload en masse) et le profil candidat en JSON (plusieurs Ko) : la table, le cache de
+pages et chaque chargement ORM en étaient alourdis, alors que la liste et le classement
+n'utilisent que quelques colonnes.
+
+- Descriptions de poste : table job_postings adressée par contenu (SHA-256 du texte),
+  une ligne par texte distinct, référencée par analyses.job_posting_id.
+  Les identifiants sont mis en cache une fois la transaction qui les a créés ou lus validée
+  (`remember_job_postings`, appelé par le committer) : un lot annulé n'y laisse rien.
+- Profils candidats : table analysis_profiles (une ligne par analyse), JSON compressé
+  avec zlib, lu seulement par GET /analysis/{id}.
+"""
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+
+PROFILE_COMPRESSION_LEVEL = int(os.getenv("PROFILE_COMPRESSION_LEVEL", "6"))
+
+# Identifiants des descriptions déjà enregistrées (immuables : adressées par contenu)
+_JOB_POSTING_CACHE_SIZE = 256
+_job_posting_ids: "OrderedDict[str, int]" = OrderedDict()
+# Lu par le thread écrivain, complété depuis la boucle d'événements
+_job_posting_lock = threading.Lock()
+
+
+def job_posting_hash(description: str) -> str:
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def job_posting_ids(session: Session, descriptions: Iterable[str]) -> Dict[str, int]:
+    """
+    Identifiants job_postings des descriptions (créées si absentes), indexés par texte.
+    Le cache n'est pas modifié : les lignes créées ne sont sûres qu'après le commit.
+    """
+    hashes = {description: job_posting_hash(description) for description in set(descriptions)}
+    ids = {}
+    missing = {}
+    with _job_posting_lock:
+        for description, content_hash in hashes.items():
+            if content_hash in _job_posting_ids:
+                _job_posting_ids.move_to_end(content_hash)
+                ids[description] = _job_posting_ids[content_hash]
+            else:
+                missing[content_hash] = description
+    if missing:
+        existing = dict(session.execute(
+            select(models.JobPosting.content_hash, models.JobPosting.id)
+            .where(models.JobPosting.content_hash.in_(list(missing)))
+        ).all())
+        new_postings = [models.JobPosting(content_hash=content_hash, description=description)
+                        for content_hash, description in missing.items() if content_hash not in existing]
+        if new_postings:
+            session.add_all(new_postings)
+            session.flush()
+            existing.update((posting.content_hash, posting.id) for posting in new_postings)
+        for content_hash, description in missing.items():
+            ids[description] = existing[content_hash]
+    return ids
+
+
+def remember_job_postings(ids: Dict[str, int]) -> None:
+    """Met en cache les identifiants (description -> id), une fois leur transaction validée"""
+    with _job_posting_lock:
+        for description, job_posting_id in ids.items():
+            content_hash = job_posting_hash(description)
+            _job_posting_ids[content_hash] = job_posting_id
+            _job_posting_ids.move_to_end(content_hash)
+        while len(_job_posting_ids) > _JOB_POSTING_CACHE_SIZE:
+            _job_posting_ids.popitem(last=False)
+
+
+def forget_job_postings() -> None:
+    """Vide le cache des identifiants (après une écriture en échec : la base a pu être vidée)"""
+    with _job_posting_lock:
+        _job_posting_ids.clear()
+
+
+def compress_profile(profile_json: str) -> bytes:
+    return zlib.compress(profile_json.encode("utf-8"), PROFILE_COMPRESSION_LEVEL)
+
+
+def profile_row(analysis_id: int, profile_json: str) -> Dict:
+    """Valeurs d'une ligne analysis_profiles"""
+    return {"analysis_id": analysis_id, "encoding": "zlib", "data": compress_profile(profile_json)}
+
+
+def decode_profile(encoding: str, data: bytes) -> str:
+    """JSON du profil stocké"""
+    if encoding == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    if encoding == "identity":
+        return data.decode("utf-8")
+    raise ValueError(f"Encodage de profil inconnu : {encoding}")
+
+
+def save_profile(session: Session, analysis_id: int, profile_json: str) -> None:
+    """Enregistre (ou remplace) le profil d'une analyse, dans la transaction de `session`"""
+    session.merge(models.AnalysisProfile(**profile_row(analysis_id, profile_json)))
+
+
+async def load_profile(db: AsyncSession, analysis_id: int) -> Optional[Dict]:
+    """Profil candidat d'une analyse (None si absent)"""
+    profile = await db.get(models.AnalysisProfile, analysis_id)
+    if profile is None:
+        return None
+    return json.loads(decode_profile(profile.encoding, profile.data))
+
+
+async def load_job_description(db: AsyncSession, job_posting_id: Optional[int]) -> Optional[str]:
+    if job_posting_id is None:
+        return None
+    return await db.scalar(select(models.JobPosting.description).where(models.JobPosting.id == job_posting_id))
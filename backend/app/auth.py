@@ -1,19 +1,33 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Hashable, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from typing import Union
 from . import models, database
+from .admission import AdmissionController, AdmissionRejected
+import asyncio
+import contextvars
+import functools
 import os
 import hashlib
+import logging
+import threading
+import time
 import bcrypt
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 jours
@@ -21,6 +35,76 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 jours
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
+# Cache des utilisateurs authentifiés : pas de requête SQL par appel authentifié
+# (polling de /analysis/). Durée de vie courte : une suppression faite par un autre
+# processus est prise en compte au plus tard après USER_CACHE_TTL secondes. 0 désactive le cache.
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+
+
+class UserCache:
+    """Cache LRU à durée de vie limitée des utilisateurs, indexé par le sujet du token (email)"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        # Invalidation possible depuis le thread écrivain (événements SQLAlchemy)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, models.User]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email: str) -> Optional[models.User]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, email: str, user: models.User) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: Optional[str] = None) -> None:
+        """Retire un utilisateur du cache (tous si email est None)"""
+        with self._lock:
+            if email is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(email, None)
+
+
+user_cache = UserCache(USER_CACHE_TTL, USER_CACHE_MAX_SIZE)
+
+
+@event.listens_for(models.User, "after_delete")
+def _forget_deleted_user(mapper, connection, target):
+    user_cache.invalidate(target.email)
+
+
+@event.listens_for(models.User, "after_update")
+def _forget_updated_users(mapper, connection, target):
+    # L'email (clé du cache) peut avoir changé : tout invalider (modification rare)
+    user_cache.invalidate()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _forget_bulk_modified_users(orm_execute_state):
+    """query(User).delete() / update(User) ne déclenchent pas les événements par objet"""
+    if (orm_execute_state.is_delete or orm_execute_state.is_update) and \
+            any(mapper.class_ is models.User for mapper in orm_execute_state.all_mappers):
+        user_cache.invalidate()
+
 def _pre_hash_password(password: str) -> bytes:
     """
     Pré-hash le mot de passe avec SHA-256 pour éviter la limite de 72 bytes de bcrypt.
@@ -28,13 +112,18 @@ def _pre_hash_password(password: str) -> bytes:
     """
     return hashlib.sha256(password.encode('utf-8')).digest()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Schéma des hachages actuels (bcrypt direct sur le SHA-256 du mot de passe) ; les autres
+# schémas acceptés par verify_password sont des hachages passlib hérités, réécrits à la connexion
+CURRENT_HASH_SCHEME = "bcrypt_sha256"
+
+def _verify_password_scheme(plain_password: str, hashed_password: str) -> Optional[str]:
     """
     Vérifie un mot de passe en pré-hashant d'abord avec SHA-256.
     Compatible avec les anciens hachages passlib et les nouveaux hachages directs.
+    Retourne le schéma qui a validé le mot de passe, None si le mot de passe est incorrect.
     """
     if not plain_password or not hashed_password:
-        return False
+        return None
     
     pre_hashed = _pre_hash_password(plain_password)
     
@@ -48,28 +137,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         result = bcrypt.checkpw(pre_hashed, hashed_bytes)
         if result:
-            return True
+            return CURRENT_HASH_SCHEME
     except (ValueError, Exception) as e:
-        print(f"Erreur bcrypt.checkpw: {str(e)}")
+        logger.debug("Erreur bcrypt.checkpw: %s", e)
     
     # En cas d'erreur, essayer avec passlib (pour compatibilité ascendante)
     try:
         pre_hashed_hex = pre_hashed.hex()
         result = pwd_context.verify(pre_hashed_hex, hashed_password)
         if result:
-            return True
+            return "passlib_sha256_hex"
     except (ValueError, Exception) as e:
-        print(f"Erreur pwd_context.verify: {str(e)}")
+        logger.debug("Erreur pwd_context.verify: %s", e)
     
     # Dernier recours : essayer de vérifier directement avec le mot de passe en clair (pour les anciens hachages)
     try:
         result = pwd_context.verify(plain_password, hashed_password)
         if result:
-            return True
+            return "passlib_plain"
     except (ValueError, Exception) as e:
-        print(f"Erreur pwd_context.verify (plain): {str(e)}")
+        logger.debug("Erreur pwd_context.verify (plain): %s", e)
     
-    return False
+    return None
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Vérifie un mot de passe (tous schémas acceptés, voir _verify_password_scheme)"""
+    return _verify_password_scheme(plain_password, hashed_password) is not None
 
 def get_password_hash(password: str) -> str:
     """
@@ -82,6 +175,59 @@ def get_password_hash(password: str) -> str:
     hashed = bcrypt.hashpw(pre_hashed, salt)
     return hashed.decode('utf-8')
 
+# Hachage et vérification hors de la boucle d'événements : bcrypt coûte ~250 ms de CPU par appel
+# (jusqu'à trois vérifications pour un hachage hérité) et bloquait toutes les requêtes du worker.
+# Executor dédié de PASSWORD_HASH_WORKERS threads (bcrypt libère le GIL) ; au-delà, les demandes
+# attendent dans une file bornée, servie à tour de rôle par email (voir admission.py).
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+password_admission = AdmissionController(
+    max_concurrent=PASSWORD_HASH_WORKERS,
+    max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32")),
+    max_wait=float(os.getenv("PASSWORD_HASH_MAX_WAIT", "10")),
+)
+
+_hash_executor = None
+
+def get_hash_executor():
+    """Retourne l'executor de hachage, le créant si nécessaire"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password_hash")
+    return _hash_executor
+
+def shutdown_hash_executor() -> None:
+    """Arrête l'executor de hachage (à l'arrêt de l'application)"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
+
+async def _run_hashing(key: Hashable, func, *args):
+    """Exécute func dans l'executor de hachage ; lève AdmissionRejected si la file est pleine"""
+    async with password_admission.slot(key):
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), functools.partial(context.run, func, *args))
+
+async def hash_password(password: str, key: Hashable = None) -> str:
+    """get_password_hash exécuté dans l'executor de hachage (key : utilisateur, pour l'équité de la file)"""
+    return await _run_hashing(key, get_password_hash, password)
+
+async def _rehash_legacy_password(user: models.User, password: str) -> None:
+    """Réécrit un hachage hérité au schéma actuel (la chaîne de repli n'est payée qu'une fois)"""
+    try:
+        hashed_password = await hash_password(password, key=user.email)
+        await database.run_write(lambda session: session.execute(
+            update(models.User).where(models.User.id == user.id).values(hashed_password=hashed_password)))
+    except Exception as e:
+        # La connexion reste valide : nouvelle tentative à la prochaine connexion
+        logger.warning("Échec de la réécriture du hachage pour l'utilisateur %s: %s", user.id, e)
+        return
+    # Sans marquer l'objet modifié : la session de la requête est en lecture seule
+    set_committed_value(user, "hashed_password", hashed_password)
+    logger.info("Hachage hérité réécrit pour l'utilisateur %s", user.id)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -92,32 +238,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
     try:
-        user = get_user_by_email(db, email)
+        user = await get_user_by_email(db, email)
         if not user:
-            print(f"Utilisateur non trouvé pour l'email: {email}")
+            logger.info("Utilisateur non trouvé pour l'email: %s", email)
             return False
         
-        # Vérifier le mot de passe
-        password_valid = verify_password(password, user.hashed_password)
-        if not password_valid:
-            print(f"Mot de passe incorrect pour l'email: {email}")
+        # Vérifier le mot de passe (executor de hachage)
+        scheme = await _run_hashing(email, _verify_password_scheme, password, user.hashed_password)
+        if scheme is None:
+            logger.info("Mot de passe incorrect pour l'email: %s", email)
             return False
+        if scheme != CURRENT_HASH_SCHEME:
+            await _rehash_legacy_password(user, password)
         
         return user
+    except AdmissionRejected:
+        raise
     except Exception as e:
-        print(f"Erreur lors de l'authentification: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erreur lors de l'authentification: %s", e)
         return False
 
 async def get_current_user(
     token: Union[str, None] = Depends(oauth2_scheme),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -133,8 +282,14 @@ async def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user_by_email(db, email=email)
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+    user = await get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
+    # Détaché de la session : un rollback de la requête ne doit pas expirer l'objet partagé
+    db.expunge(user)
+    user_cache.put(email, user)
     return user
 
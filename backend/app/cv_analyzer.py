@@ -1,14 +1,55 @@
-import PyPDF2
-import docx
 import json
+import logging
 import re
 import requests
-from typing import List, Dict, Optional
+import time
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional, Tuple
 import os
 from dotenv import load_dotenv
+from .analysis_context import AnalysisContext
+from .logging_config import SAMPLED
+from .doc_extraction import extract_doc_text
+from .docx_extraction import extract_docx_text
+from .metrics import StageTimer
+from .pdf_extraction import ExtractionBudgetExceeded, extract_pdf_text
+from .preflight import PDF_HEADER_WINDOW, sniff_format
+from .sections import SectionMap, segment_cv
+from .workers import get_process_pool, shutdown_process_pool
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Extracteurs du profil répartis sur le pool de processus partagé (workers.py) : la latence
+# d'un CV seul baisse sur une machine multi-cœurs. Délai maximal par CV pour l'ensemble des
+# extracteurs ; un champ non terminé à temps garde sa valeur vide.
+PROFILE_PARALLEL = os.getenv("PROFILE_PARALLEL", "false").lower() == "true"
+PROFILE_DEADLINE_SECONDS = float(os.getenv("PROFILE_DEADLINE_SECONDS", "20"))
+
+# Champs du profil : (clé, étape chronométrée, valeur vide)
+PROFILE_FIELDS = (
+    ("identite", "identity", dict),
+    ("resume_professionnel", "summary", dict),
+    ("competences_techniques", "skills", dict),
+    ("experiences_professionnelles", "experiences", list),
+    ("stages_alternances", "internships", list),
+    ("projets", "projects", list),
+    ("formation", "education", list),
+    ("certifications", "certifications", list),
+    ("langues", "languages", list),
+    ("soft_skills", "soft_skills", list),
+)
+# Analyse en deux niveaux : champs du premier niveau (résultat rapide), les autres sont
+# calculés ensuite par complete_analysis
+FAST_PROFILE_FIELDS = tuple(f for f in PROFILE_FIELDS if f[0] in (
+    "identite", "resume_professionnel", "competences_techniques", "langues", "soft_skills"))
+SLOW_PROFILE_FIELDS = tuple(f for f in PROFILE_FIELDS if f not in FAST_PROFILE_FIELDS)
+
+# Mots communs non significatifs ignorés par la similarité
+SIMILARITY_STOP_WORDS = frozenset({'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'way', 'who', 'boy', 'did', 'she', 'use', 'her', 'many', 'than', 'them', 'these', 'le', 'de', 'la', 'les', 'des', 'du', 'un', 'une', 'et', 'ou', 'pour', 'avec', 'dans', 'sur', 'par', 'est', 'sont', 'été', 'être', 'avoir', 'fait', 'faire', 'avec', 'dans', 'pour', 'sont', 'cette', 'cette', 'comme', 'plus', 'tout', 'tous', 'toutes'})
+
 class CVAnalyzer:
     def __init__(self):
         # Configuration Hugging Face API (optionnelle - fonctionne sans clé pour les modèles publics)
@@ -43,6 +84,26 @@ class CVAnalyzer:
         
         # Modèle pour l'analyse de texte et extraction d'informations structurées
         self.text_analysis_model = "sentence-transformers/all-MiniLM-L6-v2"
+        
+        # Chronométrage par étape (temps réel et CPU) de l'analyse en cours
+        self.timer = StageTimer()
+        
+        # Segmentation du dernier CV analysé (voir sections.py)
+        self._section_map: Optional[SectionMap] = None
+        
+        # Résultats intermédiaires de l'analyse en cours (voir analysis_context.py)
+        self.context = AnalysisContext()
+    
+    def _begin_analysis(self, cv_text: str, job_description: str) -> None:
+        """Garde le contexte si l'analyse porte sur le même CV et le même poste, sinon le remplace"""
+        if not self.context.matches(cv_text, job_description):
+            self.context = AnalysisContext(cv_text, job_description)
+    
+    def _sections(self, cv_text: str) -> SectionMap:
+        """Segmentation du CV, calculée une fois par texte et partagée par les extracteurs et le score"""
+        if self._section_map is None or self._section_map.text != cv_text:
+            self._section_map = segment_cv(cv_text)
+        return self._section_map
     
     def _call_hf_api(self, model: str, inputs: Dict, task: str = "feature-extraction") -> Optional[Dict]:
         """Appelle l'API Hugging Face Inference"""
@@ -77,18 +138,21 @@ class CVAnalyzer:
         """Calcul amélioré de similarité basé sur les mots-clés et la structure"""
         if not text1 or not text2:
             return 0.0
-        
-        text1_lower = text1.lower()
-        text2_lower = text2.lower()
-        
-        # Extraire les mots significatifs (3+ caractères pour capturer plus de mots)
-        words1 = set(re.findall(r'\b\w{3,}\b', text1_lower))
-        words2 = set(re.findall(r'\b\w{3,}\b', text2_lower))
-        
-        # Filtrer les mots communs non significatifs
-        stop_words = {'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'way', 'who', 'boy', 'did', 'she', 'use', 'her', 'many', 'than', 'them', 'these', 'le', 'de', 'la', 'les', 'des', 'du', 'un', 'une', 'et', 'ou', 'pour', 'avec', 'dans', 'sur', 'par', 'est', 'sont', 'été', 'être', 'avoir', 'fait', 'faire', 'avec', 'dans', 'pour', 'sont', 'cette', 'cette', 'comme', 'plus', 'tout', 'tous', 'toutes'}
-        words1 = {w for w in words1 if w not in stop_words and len(w) >= 3}
-        words2 = {w for w in words2 if w not in stop_words and len(w) >= 3}
+        return self.context.get(("similarity", text1, text2), lambda: self._compute_similarity(text1, text2))
+    
+    def _similarity_terms(self, text: str) -> Tuple[set, set, int]:
+        """Mots significatifs, paires de mots consécutifs et nombre de mots d'un texte (mémorisés)"""
+        def compute():
+            text_lower = text.lower()
+            # Extraire les mots significatifs (3+ caractères pour capturer plus de mots)
+            words = {w for w in re.findall(r'\b\w{3,}\b', text_lower) if w not in SIMILARITY_STOP_WORDS}
+            phrases = set(re.findall(r'\b\w{3,}\s+\w{3,}\b', text_lower))
+            return words, phrases, len(text_lower.split())
+        return self.context.get(("terms", text), compute)
+    
+    def _compute_similarity(self, text1: str, text2: str) -> float:
+        words1, phrases1, length1 = self._similarity_terms(text1)
+        words2, phrases2, length2 = self._similarity_terms(text2)
         
         if not words1 or not words2:
             return 0.0
@@ -99,8 +163,6 @@ class CVAnalyzer:
         jaccard = len(intersection) / len(union) if union else 0.0
         
         # Bonus pour les phrases communes (2+ mots consécutifs)
-        phrases1 = set(re.findall(r'\b\w{3,}\s+\w{3,}\b', text1_lower))
-        phrases2 = set(re.findall(r'\b\w{3,}\s+\w{3,}\b', text2_lower))
         phrase_score = 0.0
         if phrases1 and phrases2:
             phrase_intersection = phrases1.intersection(phrases2)
@@ -116,7 +178,7 @@ class CVAnalyzer:
         
         # Améliorer le score si les textes sont courts et ont des mots-clés communs
         # (cas où la description est courte mais pertinente)
-        if len(text1_lower.split()) <= 10 or len(text2_lower.split()) <= 10:
+        if length1 <= 10 or length2 <= 10:
             # Si un des textes est court, être plus généreux avec les correspondances
             if len(intersection) >= 2:
                 final_score = max(final_score, 0.3)  # Minimum 0.3 si au moins 2 mots communs
@@ -142,54 +204,41 @@ class CVAnalyzer:
         return len(intersection) / len(union) if union else 0.0
     
     def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier PDF avec amélioration du formatage"""
-        text = ""
+        """Extrait le texte d'un fichier PDF avec amélioration du formatage (moteur PDF_BACKEND)"""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        # Nettoyer et améliorer le formatage
-                        # Remplacer les espaces multiples par un seul espace
-                        page_text = re.sub(r'\s+', ' ', page_text)
-                        # Restaurer les sauts de ligne pour les listes
-                        page_text = re.sub(r'([.!?])\s+([A-Z])', r'\1\n\2', page_text)
-                        # Restaurer les sauts de ligne pour les dates
-                        page_text = re.sub(r'(\d{4})\s+([A-Z])', r'\1\n\2', page_text)
-                        text += page_text + "\n\n"
+            return extract_pdf_text(file_path)
+        except ExtractionBudgetExceeded:
+            raise
         except Exception as e:
             raise Exception(f"Erreur lors de l'extraction du PDF: {str(e)}")
-        return text.strip()
     
     def extract_text_from_docx(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier DOCX avec amélioration du formatage"""
-        text = ""
+        """Extrait le texte d'un fichier DOCX (lecture en flux, voir docx_extraction)"""
         try:
-            doc = docx.Document(file_path)
-            for paragraph in doc.paragraphs:
-                para_text = paragraph.text.strip()
-                if para_text:
-                    text += para_text + "\n"
-            
-            # Extraire aussi les tableaux
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = " | ".join([cell.text.strip() for cell in row.cells if cell.text.strip()])
-                    if row_text:
-                        text += row_text + "\n"
+            return extract_docx_text(file_path)
         except Exception as e:
             raise Exception(f"Erreur lors de l'extraction du DOCX: {str(e)}")
-        return text.strip()
+    
+    def extract_text_from_doc(self, file_path: str) -> str:
+        """Extrait le texte d'un document Word 97-2003 (.doc) avec le lecteur OLE2 natif"""
+        try:
+            return extract_doc_text(file_path)
+        except Exception as e:
+            raise Exception(f"Erreur lors de l'extraction du DOC: {str(e)}")
     
     def extract_text(self, file_path: str, file_extension: str) -> str:
-        """Extrait le texte selon le type de fichier"""
-        if file_extension.lower() == '.pdf':
-            return self.extract_text_from_pdf(file_path)
-        elif file_extension.lower() in ['.docx', '.doc']:
-            return self.extract_text_from_docx(file_path)
-        else:
-            raise ValueError(f"Format de fichier non supporté: {file_extension}")
+        """Extrait le texte selon le type réel du fichier (octets magiques), à défaut selon l'extension"""
+        with self.timer.span("extraction"):
+            with open(file_path, 'rb') as file:
+                file_format = sniff_format(file.read(PDF_HEADER_WINDOW)) or file_extension.lower()
+            if file_format == '.pdf':
+                return self.extract_text_from_pdf(file_path)
+            elif file_format == '.docx':
+                return self.extract_text_from_docx(file_path)
+            elif file_format == '.doc':
+                return self.extract_text_from_doc(file_path)
+            else:
+                raise ValueError(f"Format de fichier non supporté: {file_extension}")
     
     def extract_skills(self, cv_text: str) -> List[str]:
         """Extrait les compétences du CV de manière dynamique avec IA (sans liste statique)"""
@@ -257,13 +306,13 @@ class CVAnalyzer:
                                         if clean_word and len(clean_word) > 2:
                                             skills.append(clean_word)
                 except requests.Timeout:
-                    print(f"Timeout NER extraction")
+                    logger.warning("Timeout NER extraction")
                     continue
                 except Exception as e:
-                    print(f"Erreur NER extraction: {str(e)}")
+                    logger.warning("Erreur NER extraction: %s", e)
                     continue
         except Exception as e:
-            print(f"Erreur lors de l'extraction NER: {str(e)}")
+            logger.warning("Erreur lors de l'extraction NER: %s", e)
         
         return skills
     
@@ -343,7 +392,7 @@ class CVAnalyzer:
         
         return skills
     
-    def extract_languages(self, cv_text: str) -> List[str]:
+    def extract_languages(self, cv_text: str, sections: Optional[SectionMap] = None) -> List[str]:
         """Extrait les langues parlées du CV"""
         # Liste des langues communes (français, anglais, etc.)
         languages_keywords = {
@@ -387,30 +436,21 @@ class CVAnalyzer:
                         found_languages.append(lang_name)
                         break
         
-        # Chercher aussi les niveaux de langue (A1, A2, B1, B2, C1, C2, natif, etc.)
-        language_level_patterns = [
-            r'(?i)(natif|native|maternel|mother tongue)',
-            r'(?i)(courant|fluent|avancé|advanced)',
-            r'(?i)(intermédiaire|intermediate|moyen)',
-            r'(?i)(débutant|beginner|basic)',
-            r'(?i)(A1|A2|B1|B2|C1|C2)'
-        ]
-        
-        # Si on trouve des niveaux mais pas de langues, chercher autour
-        lines = cv_text.split('\n')
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            # Si la ligne contient un niveau de langue
-            if any(re.search(pattern, line_lower) for pattern in language_level_patterns):
-                # Chercher les langues dans les lignes proches
-                context_lines = lines[max(0, i-2):min(len(lines), i+3)]
-                context_text = ' '.join(context_lines).lower()
-                for lang_name, keywords in languages_keywords.items():
-                    if lang_name not in found_languages:
-                        for keyword in keywords:
-                            if keyword.lower() in context_text:
-                                found_languages.append(lang_name)
-                                break
+        # Chercher aussi les niveaux de langue (A1, A2, B1, B2, C1, C2, natif, etc.),
+        # repérés par la segmentation du CV
+        if sections is None:
+            sections = self._sections(cv_text)
+        lines = sections.lines
+        for i in sorted(sections.markers["language_levels"]):
+            # Chercher les langues dans les lignes proches
+            context_lines = lines[max(0, i-2):min(len(lines), i+3)]
+            context_text = ' '.join(context_lines).lower()
+            for lang_name, keywords in languages_keywords.items():
+                if lang_name not in found_languages:
+                    for keyword in keywords:
+                        if keyword.lower() in context_text:
+                            found_languages.append(lang_name)
+                            break
         
         return found_languages
     
@@ -460,28 +500,32 @@ class CVAnalyzer:
         - Projets / réalisations
         - Informations personnelles
         - Score et recommandations
+        
+        Enchaîne les deux niveaux de l'analyse (analyze_cv_fast puis complete_analysis).
         """
-        # 1. EXTRACTION COMPLÈTE DU PROFIL STRUCTURÉ (avec IA)
+        partial = self.analyze_cv_fast(cv_text, job_description, provisional=False)
+        return self.complete_analysis(cv_text, job_description, partial)
+    
+    def analyze_cv_fast(self, cv_text: str, job_description: str, provisional: bool = True) -> Dict:
+        """
+        Premier niveau de l'analyse : identité, résumé, compétences, langues et score provisoire
+        (calculé sans les expériences, la formation ni les certifications). Le résultat a la même
+        forme que celui d'analyze_cv ; complete_analysis le complète.
+        provisional=False saute les scores provisoires (enchaînement direct des deux niveaux).
+        """
+        self._begin_analysis(cv_text, job_description)
+        
+        # 1. EXTRACTION DU PROFIL (champs rapides)
         try:
-            candidate_profile = self.extract_candidate_profile(cv_text, job_description)
+            if provisional:
+                candidate_profile = self.extract_candidate_profile(cv_text, job_description, FAST_PROFILE_FIELDS)
+            else:
+                candidate_profile = self._extract_profile_fields(cv_text, FAST_PROFILE_FIELDS)
         except Exception as e:
-            print(f"Erreur lors de l'extraction du profil candidat: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Erreur lors de l'extraction du profil candidat: %s", e)
             # Profil par défaut en cas d'erreur
-            candidate_profile = {
-                "identite": {},
-                "resume_professionnel": {},
-                "competences_techniques": {},
-                "experiences_professionnelles": [],
-                "stages_alternances": [],
-                "projets": [],
-                "formation": [],
-                "certifications": [],
-                "langues": [],
-                "soft_skills": [],
-                "score_correspondance": 0.0
-            }
+            candidate_profile = {field: empty() for field, _, empty in FAST_PROFILE_FIELDS}
+            candidate_profile["score_correspondance"] = 0.0
         
         # 2. EXTRACTION DES COMPÉTENCES (techniques, métiers, soft skills)
         cv_skills_technical = candidate_profile.get("competences_techniques", {})
@@ -496,88 +540,152 @@ class CVAnalyzer:
         
         # 3. EXTRACTION DES COMPÉTENCES REQUISES DU POSTE (avec IA sémantique)
         try:
-            required_skills = self._extract_required_skills_from_job(job_description)
+            with self.timer.span("job_skills"):
+                required_skills = self._extract_required_skills_from_job(job_description)
         except Exception as e:
-            print(f"Erreur lors de l'extraction des compétences requises: {str(e)}")
+            logger.exception("Erreur lors de l'extraction des compétences requises: %s", e)
             required_skills = []
         
         # 4. COMPARAISON DES COMPÉTENCES (avec IA)
         try:
-            missing_skills, matching_skills = self._compare_skills_with_ia(all_cv_skills, required_skills, job_description)
+            with self.timer.span("comparison"):
+                missing_skills, matching_skills = self._compare_skills_with_ia(all_cv_skills, required_skills, job_description)
         except Exception as e:
-            print(f"Erreur lors de la comparaison des compétences: {str(e)}")
+            logger.exception("Erreur lors de la comparaison des compétences: %s", e)
             missing_skills = []
             matching_skills = []
         
-        # 5. ANALYSE DES EXPÉRIENCES PROFESSIONNELLES (avec IA)
-        experiences = candidate_profile.get("experiences_professionnelles", [])
+        # 5. SCORE PROVISOIRE (expériences, formation et certifications pas encore analysées)
+        score = 0.0
         try:
-            relevant_experience, irrelevant_experience = self._classify_experiences_with_ia(
-                experiences, job_description
-            )
+            if provisional:
+                with self.timer.span("scoring"):
+                    score = self._calculate_comprehensive_score(
+                        matching_skills=matching_skills,
+                        required_skills=required_skills,
+                        relevant_experience=[],
+                        education_match=0.0,
+                        cert_match=0.0,
+                        projects_match=0.0,
+                        cv_text=cv_text,
+                        job_description=job_description
+                    )
         except Exception as e:
-            print(f"Erreur lors de la classification des expériences: {str(e)}")
-            relevant_experience = []
-            irrelevant_experience = []
+            logger.exception("Erreur lors du calcul du score: %s", e)
+            score = 0.0
         
-        # 6. ANALYSE DE LA FORMATION (avec IA)
-        education = candidate_profile.get("formation", [])
-        try:
-            education_match_score = self._evaluate_education_relevance(education, job_description)
-        except Exception as e:
-            print(f"Erreur lors de l'évaluation de la formation: {str(e)}")
-            education_match_score = 0.0
+        return {
+            "score": round(score, 2) if score is not None else 0.0,
+            "missing_skills": missing_skills if missing_skills else [],
+            "relevant_experience": [],
+            "irrelevant_experience": [],
+            "recommendations": [],
+            "languages": self._languages_list(candidate_profile.get("langues", [])),
+            "candidate_profile": candidate_profile,
+            # Repris par complete_analysis (non enregistrés)
+            "required_skills": required_skills,
+            "matching_skills": matching_skills,
+        }
+    
+    def complete_analysis(self, cv_text: str, job_description: str, partial: Dict) -> Dict:
+        """
+        Second niveau de l'analyse : expériences, stages, projets, formation, certifications,
+        score définitif et recommandations, à partir du résultat d'analyze_cv_fast.
+        Les valeurs déjà calculées par le premier niveau (compétences requises, résumé,
+        similarités) sont reprises du contexte de l'analyseur.
+        """
+        self._begin_analysis(cv_text, job_description)
+        
+        required_skills = partial.get("required_skills", [])
+        matching_skills = partial.get("matching_skills", [])
+        missing_skills = partial.get("missing_skills", [])
         
-        # 7. ANALYSE DES CERTIFICATIONS (avec IA)
-        certifications = candidate_profile.get("certifications", [])
+        # 1. EXTRACTION DU PROFIL (champs lents) et score de correspondance sur le profil complet
+        candidate_profile = dict(partial.get("candidate_profile") or {})
         try:
-            cert_match_score = self._evaluate_certifications_relevance(certifications, job_description)
+            candidate_profile.update(self._extract_profile_fields(cv_text, SLOW_PROFILE_FIELDS))
+            candidate_profile = {field: candidate_profile.get(field, empty()) for field, _, empty in PROFILE_FIELDS}
+            with self.timer.span("match_score"):
+                candidate_profile["score_correspondance"] = self._calculate_match_score(candidate_profile, job_description)
         except Exception as e:
-            print(f"Erreur lors de l'évaluation des certifications: {str(e)}")
-            cert_match_score = 0.0
+            logger.exception("Erreur lors de l'extraction du profil candidat: %s", e)
+            candidate_profile = {field: candidate_profile.get(field, empty()) for field, _, empty in PROFILE_FIELDS}
+            candidate_profile["score_correspondance"] = 0.0
         
-        # 8. ANALYSE DES PROJETS (avec IA)
-        projects = candidate_profile.get("projets", [])
+        # 2. ANALYSE DES EXPÉRIENCES PROFESSIONNELLES (avec IA)
+        experiences = candidate_profile.get("experiences_professionnelles", [])
         try:
-            projects_match_score = self._evaluate_projects_relevance(projects, job_description)
+            with self.timer.span("experience_classification"):
+                relevant_experience, irrelevant_experience = self._classify_experiences_with_ia(
+                    experiences, job_description
+                )
         except Exception as e:
-            print(f"Erreur lors de l'évaluation des projets: {str(e)}")
-            projects_match_score = 0.0
+            logger.exception("Erreur lors de la classification des expériences: %s", e)
+            relevant_experience = []
+            irrelevant_experience = []
+        
+        # 3 à 5 : une seule observation de l'étape "relevance" par analyse
+        with self.timer.span("relevance"):
+            # 3. ANALYSE DE LA FORMATION (avec IA)
+            education = candidate_profile.get("formation", [])
+            try:
+                education_match_score = self._evaluate_education_relevance(education, job_description)
+            except Exception as e:
+                logger.exception("Erreur lors de l'évaluation de la formation: %s", e)
+                education_match_score = 0.0
+        
+            # 4. ANALYSE DES CERTIFICATIONS (avec IA)
+            certifications = candidate_profile.get("certifications", [])
+            try:
+                cert_match_score = self._evaluate_certifications_relevance(certifications, job_description)
+            except Exception as e:
+                logger.exception("Erreur lors de l'évaluation des certifications: %s", e)
+                cert_match_score = 0.0
         
-        # 9. ANALYSE DES LANGUES
-        languages = candidate_profile.get("langues", [])
+            # 5. ANALYSE DES PROJETS (avec IA)
+            projects = candidate_profile.get("projets", [])
+            try:
+                projects_match_score = self._evaluate_projects_relevance(projects, job_description)
+            except Exception as e:
+                logger.exception("Erreur lors de l'évaluation des projets: %s", e)
+                projects_match_score = 0.0
         
-        # 10. CALCUL DU SCORE GLOBAL (basé sur tous les critères avec pondération IA)
+        # 6. CALCUL DU SCORE GLOBAL (basé sur tous les critères avec pondération IA)
         try:
-            score = self._calculate_comprehensive_score(
-                matching_skills=matching_skills,
-                required_skills=required_skills,
-                relevant_experience=relevant_experience,
-                education_match=education_match_score,
-                cert_match=cert_match_score,
-                projects_match=projects_match_score,
-                cv_text=cv_text,
-                job_description=job_description
-            )
+            with self.timer.span("scoring"):
+                score = self._calculate_comprehensive_score(
+                    matching_skills=matching_skills,
+                    required_skills=required_skills,
+                    relevant_experience=relevant_experience,
+                    education_match=education_match_score,
+                    cert_match=cert_match_score,
+                    projects_match=projects_match_score,
+                    cv_text=cv_text,
+                    job_description=job_description
+                )
         except Exception as e:
-            print(f"Erreur lors du calcul du score: {str(e)}")
+            logger.exception("Erreur lors du calcul du score: %s", e)
             score = 0.0
         
-        # 11. GÉNÉRATION DE RECOMMANDATIONS INTELLIGENTES (avec IA)
+        # 7. GÉNÉRATION DE RECOMMANDATIONS INTELLIGENTES (avec IA)
         try:
-            recommendations = self._generate_ai_recommendations(
-                score=score,
-                missing_skills=missing_skills,
-                relevant_experience=relevant_experience,
-                education_match=education_match_score,
-                cert_match=cert_match_score,
-                cv_text=cv_text,
-                job_description=job_description
-            )
+            with self.timer.span("recommendations"):
+                recommendations = self._generate_ai_recommendations(
+                    score=score,
+                    missing_skills=missing_skills,
+                    relevant_experience=relevant_experience,
+                    education_match=education_match_score,
+                    cert_match=cert_match_score,
+                    cv_text=cv_text,
+                    job_description=job_description
+                )
         except Exception as e:
-            print(f"Erreur lors de la génération des recommandations: {str(e)}")
+            logger.exception("Erreur lors de la génération des recommandations: %s", e)
             recommendations = []
         
+        logger.debug("Contexte d'analyse : %d valeurs réutilisées, %d calculées",
+                     self.context.hits, self.context.misses, extra=SAMPLED)
+        
         # Formater les expériences de manière sécurisée
         formatted_relevant = []
         for exp in relevant_experience[:5]:
@@ -593,27 +701,33 @@ class CVAnalyzer:
             except Exception as e:
                 formatted_irrelevant.append(str(exp))
         
-        # Extraire les langues de manière sécurisée
-        languages_list = []
-        if languages:
-            for lang in languages:
-                if isinstance(lang, dict):
-                    languages_list.append(lang.get("langue", ""))
-                elif isinstance(lang, str):
-                    languages_list.append(lang)
-        
         return {
             "score": round(score, 2) if score is not None else 0.0,
             "missing_skills": missing_skills if missing_skills else [],
             "relevant_experience": formatted_relevant,
             "irrelevant_experience": formatted_irrelevant,
             "recommendations": recommendations if recommendations else [],
-            "languages": languages_list,
+            "languages": self._languages_list(candidate_profile.get("langues", [])),
             "candidate_profile": candidate_profile if candidate_profile else {}
         }
     
+    def _languages_list(self, languages: List) -> List[str]:
+        """Noms des langues du profil (extraits de manière sécurisée)"""
+        languages_list = []
+        if languages:
+            for lang in languages:
+                if isinstance(lang, dict):
+                    languages_list.append(lang.get("langue", ""))
+                elif isinstance(lang, str):
+                    languages_list.append(lang)
+        return languages_list
+    
     def _extract_required_skills_from_job(self, job_description: str) -> List[str]:
         """Extrait les compétences requises de la description du poste avec IA (sans liste statique)"""
+        return self.context.get(("required_skills", job_description),
+                                lambda: self._compute_required_skills(job_description))
+    
+    def _compute_required_skills(self, job_description: str) -> List[str]:
         required_skills = []
         
         # Méthode 1: Extraction par patterns (sections de compétences requises) - PRIORITAIRE
@@ -884,39 +998,16 @@ class CVAnalyzer:
     ) -> float:
         """Calcule un score global basé sur tous les critères avec pondération IA"""
         
-        # Extraire le résumé professionnel du CV pour comparaison directe
-        professional_summary = ""
-        lines = cv_text.split('\n')
-        summary_keywords = ['résumé', 'resume', 'profil', 'profile', 'summary', 'about', 'à propos']
-        in_summary = False
-        summary_lines = []
+        # Résumé professionnel du CV pour comparaison directe (déjà repéré par la segmentation)
+        professional_summary = self._score_summary(cv_text)
+        summary_text = professional_summary if professional_summary else cv_text[:500]
         
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in summary_keywords):
-                in_summary = True
-                continue
-            if in_summary:
-                if line.strip() and len(line.strip()) > 10:
-                    summary_lines.append(line.strip())
-                elif len(summary_lines) > 0:
-                    break
-        
-        if summary_lines:
-            professional_summary = ' '.join(summary_lines[:4])
-        else:
-            # Si pas de résumé trouvé, utiliser les premières lignes du CV
-            professional_summary = ' '.join([line.strip() for line in lines[:10] if line.strip() and len(line.strip()) > 10])
+        # Mots-clés importants de la description et du résumé
+        job_keywords = self._keywords(job_description)
+        summary_keywords = self._keywords(summary_text)
         
         # Si aucune compétence requise n'est identifiée, comparer directement description vs résumé
         if not required_skills:
-            job_lower = job_description.lower()
-            summary_lower = professional_summary.lower() if professional_summary else cv_text[:500].lower()
-            
-            # Comparaison directe description vs résumé professionnel
-            job_keywords = set(re.findall(r'\b\w{4,}\b', job_lower))
-            summary_keywords = set(re.findall(r'\b\w{4,}\b', summary_lower))
-            
             if job_keywords:
                 overlap = len(job_keywords.intersection(summary_keywords)) / len(job_keywords)
                 # Score basé uniquement sur la correspondance
@@ -939,13 +1030,6 @@ class CVAnalyzer:
             skills_score = skills_score * 0.1  # Pénalité de 90% supplémentaire
         
         # 2. Comparaison directe Description vs Résumé Professionnel (20% - NOUVEAU)
-        job_lower = job_description.lower()
-        summary_lower = professional_summary.lower() if professional_summary else cv_text[:500].lower()
-        
-        # Extraire les mots-clés importants de la description
-        job_keywords = set(re.findall(r'\b\w{4,}\b', job_lower))
-        summary_keywords = set(re.findall(r'\b\w{4,}\b', summary_lower))
-        
         summary_match_score = 0.0
         if job_keywords and summary_keywords:
             overlap = len(job_keywords.intersection(summary_keywords)) / len(job_keywords)
@@ -1009,6 +1093,20 @@ class CVAnalyzer:
         
         return min(max(final_score, 0.0), 100.0)
     
+    def _score_summary(self, cv_text: str) -> str:
+        """Résumé du CV comparé à la description par le score global (mémorisé)"""
+        def compute():
+            sections = self._sections(cv_text)
+            if sections.summary_lines:
+                return ' '.join(sections.summary_lines[:4])
+            # Si pas de résumé trouvé, utiliser les premières lignes du CV
+            return ' '.join([line for line in sections.stripped[:10] if len(line) > 10])
+        return self.context.get(("score_summary", cv_text), compute)
+    
+    def _keywords(self, text: str) -> set:
+        """Mots de 4 caractères ou plus d'un texte, en minuscules (mémorisés)"""
+        return self.context.get(("keywords", text), lambda: set(re.findall(r'\b\w{4,}\b', text.lower())))
+    
     def _generate_ai_recommendations(
         self,
         score: float,
@@ -1103,30 +1201,77 @@ class CVAnalyzer:
             return " ".join(parts) if parts else str(exp)
         return str(exp)
     
-    def extract_candidate_profile(self, cv_text: str, job_description: str) -> Dict:
-        """Extrait et structure le profil complet du candidat"""
-        lines = cv_text.split('\n')
-        cv_lower = cv_text.lower()
-        
-        profile = {
-            "identite": self._extract_identity(cv_text, lines),
-            "resume_professionnel": self._extract_professional_summary(cv_text, lines),
-            "competences_techniques": self._extract_technical_skills_structured(cv_text, cv_lower),
-            "experiences_professionnelles": self._extract_professional_experiences_structured(cv_text, lines),
-            "stages_alternances": self._extract_internships_structured(cv_text, lines),
-            "projets": self._extract_projects_structured(cv_text, lines),
-            "formation": self._extract_education_structured(cv_text, lines),
-            "certifications": self._extract_certifications_structured(cv_text, lines),
-            "langues": self._extract_languages_structured(cv_text, lines),
-            "soft_skills": self._extract_soft_skills(cv_text, cv_lower),
-            "score_correspondance": None  # Sera calculé à la fin
-        }
+    def extract_candidate_profile(self, cv_text: str, job_description: str, fields=PROFILE_FIELDS) -> Dict:
+        """Extrait et structure le profil du candidat (tous les champs par défaut)"""
+        profile = self._extract_profile_fields(cv_text, fields)
+        profile["score_correspondance"] = None  # Sera calculé à la fin
         
         # Calculer le score de correspondance
-        profile["score_correspondance"] = self._calculate_match_score(profile, job_description)
+        with self.timer.span("match_score"):
+            profile["score_correspondance"] = self._calculate_match_score(profile, job_description)
         
         return profile
     
+    def _extract_profile_fields(self, cv_text: str, fields) -> Dict:
+        """Calcule les champs demandés du profil, dans le pool de processus si PROFILE_PARALLEL"""
+        profile = self._extract_profile_parallel(cv_text, fields) if PROFILE_PARALLEL else None
+        if profile is None:
+            span = self.timer.span
+            # Segmentation en une passe : chaque extracteur ne parcourt que sa section
+            with span("sections"):
+                self._sections(cv_text)
+            profile = {}
+            for field, stage, _ in fields:
+                with span(stage):
+                    profile[field] = self._extract_profile_field(field, cv_text)
+        return profile
+    
+    def _extract_profile_field(self, field: str, cv_text: str):
+        """Calcule un champ du profil (dans le thread d'analyse ou dans un worker du pool)"""
+        sections = self._sections(cv_text)
+        extractors = {
+            "identite": lambda: self._extract_identity(cv_text, sections.lines),
+            "resume_professionnel": lambda: self._extract_professional_summary(cv_text, sections),
+            "competences_techniques": lambda: self._extract_technical_skills_structured(cv_text, sections.lowered),
+            "experiences_professionnelles": lambda: self._extract_professional_experiences_structured(cv_text, sections),
+            "stages_alternances": lambda: self._extract_internships_structured(cv_text, sections),
+            "projets": lambda: self._extract_projects_structured(cv_text, sections),
+            "formation": lambda: self._extract_education_structured(cv_text, sections),
+            "certifications": lambda: self._extract_certifications_structured(cv_text, sections),
+            "langues": lambda: self._extract_languages_structured(cv_text, sections),
+            "soft_skills": lambda: self._extract_soft_skills(cv_text, sections.lowered),
+        }
+        return extractors[field]()
+    
+    def _extract_profile_parallel(self, cv_text: str, fields) -> Optional[Dict]:
+        """Répartit les extracteurs sur le pool de processus ; None si le pool est indisponible"""
+        try:
+            pool = get_process_pool()
+            futures = {field: pool.submit(_profile_field_worker, field, cv_text) for field, _, _ in fields}
+            wait(futures.values(), timeout=PROFILE_DEADLINE_SECONDS)
+            
+            profile, late = {}, []
+            for field, stage, empty in fields:
+                future = futures[field]
+                if not future.done():
+                    # Le worker finit sa tâche en arrière-plan, son résultat est ignoré
+                    future.cancel()
+                    late.append(field)
+                    profile[field] = empty()
+                    continue
+                profile[field], wall, cpu = future.result()
+                self.timer.record(stage, wall, cpu)
+        except BrokenProcessPool:
+            # Un worker a été tué (mémoire, signal) : recréer le pool au prochain appel
+            logger.warning("Pool de processus interrompu, extraction séquentielle du profil")
+            shutdown_process_pool()
+            return None
+        
+        if late:
+            logger.warning("Délai d'extraction du profil dépassé (%.0fs), champs vides : %s",
+                           PROFILE_DEADLINE_SECONDS, ", ".join(late))
+        return profile
+    
     def _extract_identity(self, cv_text: str, lines: List[str]) -> Dict:
         """Extrait l'identité du candidat"""
         identity = {}
@@ -1387,25 +1532,12 @@ class CVAnalyzer:
         
         return identity
     
-    def _extract_professional_summary(self, cv_text: str, lines: List[str]) -> Dict:
+    def _extract_professional_summary(self, cv_text: str, sections: SectionMap) -> Dict:
         """Extrait le résumé professionnel"""
         summary = {}
         
-        # Chercher les sections de résumé
-        summary_keywords = ['résumé', 'resume', 'profil', 'profile', 'summary', 'about', 'à propos']
-        summary_section = []
-        in_summary = False
-        
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in summary_keywords):
-                in_summary = True
-                continue
-            if in_summary:
-                if line.strip() and len(line.strip()) > 10:
-                    summary_section.append(line.strip())
-                elif len(summary_section) > 0:
-                    break
+        # Section de résumé (repérée par la segmentation)
+        summary_section = sections.summary_lines
         
         if summary_section:
             summary["resume"] = ' '.join(summary_section[:4])
@@ -1587,7 +1719,7 @@ class CVAnalyzer:
         # Par défaut, mettre dans "outils" si aucune catégorie ne correspond
         return "outils"
     
-    def _extract_professional_experiences_structured(self, cv_text: str, lines: List[str]) -> List[Dict]:
+    def _extract_professional_experiences_structured(self, cv_text: str, sections: SectionMap) -> List[Dict]:
         """Extrait les expériences professionnelles structurées avec amélioration"""
         experiences = []
         
@@ -1595,18 +1727,8 @@ class CVAnalyzer:
         date_pattern = r'(\d{4})\s*[-–—]\s*(\d{4}|présent|present|now|aujourd\'hui|current)'
         all_dates = list(re.finditer(date_pattern, cv_text, re.IGNORECASE))
         
-        # Chercher les sections d'expérience
-        exp_keywords = ['expérience', 'experience', 'work', 'employment', 'emploi', 'professional', 'career']
-        exp_sections = []
-        
-        # Trouver les indices des sections d'expérience
-        for i, line in enumerate(lines):
-            line_lower = line.lower().strip()
-            if any(keyword in line_lower for keyword in exp_keywords) and len(line_lower) < 50:
-                exp_sections.append(i)
-        
-        # Si pas de section trouvée, chercher par dates
-        if not exp_sections:
+        # Si pas de titre de section d'expérience, chercher par dates
+        if not sections.markers["experience"]:
             # Chercher les blocs de texte autour des dates
             for date_match in all_dates[:10]:  # Limiter à 10
                 start_pos = max(0, date_match.start() - 200)
@@ -1703,8 +1825,8 @@ class CVAnalyzer:
             current_exp = {}
             in_experience = False
             
-            for i, line in enumerate(lines):
-                line_stripped = line.strip()
+            for i in sections.section("experience"):
+                line_stripped = sections.stripped[i]
                 if not line_stripped or len(line_stripped) < 3:
                     if current_exp and (current_exp.get("intitule_poste") or current_exp.get("entreprise")):
                         experiences.append(current_exp)
@@ -1712,12 +1834,12 @@ class CVAnalyzer:
                     in_experience = False
                     continue
                 
-                # Détecter période
-                period_match = re.search(r'(\d{4})\s*[-–—]\s*(\d{4}|présent|present|now)', line_stripped)
-                if period_match:
+                # Période détectée par la segmentation
+                period = sections.periods.get(i)
+                if period:
                     if current_exp and (current_exp.get("intitule_poste") or current_exp.get("entreprise")):
                         experiences.append(current_exp)
-                    current_exp = {"periode": period_match.group(0)}
+                    current_exp = {"periode": period}
                     in_experience = True
                     continue
                 
@@ -1756,19 +1878,16 @@ class CVAnalyzer:
         
         return unique_experiences[:10]
     
-    def _extract_internships_structured(self, cv_text: str, lines: List[str]) -> List[Dict]:
+    def _extract_internships_structured(self, cv_text: str, sections: SectionMap) -> List[Dict]:
         """Extrait les stages et alternances"""
         internships = []
-        stage_patterns = [
-            r'(?i)(stage|internship|alternance|apprentissage|apprenticeship)',
-            r'(?i)(stagiaire|intern)'
-        ]
+        headings = sections.markers["internships"]
         
         current_stage = {}
         in_stage = False
         
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
+        for i in sections.section("internships"):
+            line_stripped = sections.stripped[i]
             if not line_stripped:
                 if current_stage and current_stage.get("intitule"):
                     internships.append(current_stage)
@@ -1776,7 +1895,7 @@ class CVAnalyzer:
                 in_stage = False
                 continue
             
-            if any(re.search(pattern, line_stripped) for pattern in stage_patterns):
+            if i in headings:
                 if current_stage and current_stage.get("intitule"):
                     internships.append(current_stage)
                 current_stage = {}
@@ -1797,19 +1916,16 @@ class CVAnalyzer:
         
         return internships[:5]
     
-    def _extract_projects_structured(self, cv_text: str, lines: List[str]) -> List[Dict]:
+    def _extract_projects_structured(self, cv_text: str, sections: SectionMap) -> List[Dict]:
         """Extrait les projets"""
         projects = []
-        project_patterns = [
-            r'(?i)(projet|project|portfolio)',
-            r'(?i)(réalisations|achievements)'
-        ]
+        headings = sections.markers["projects"]
         
         current_project = {}
         in_project = False
         
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
+        for i in sections.section("projects"):
+            line_stripped = sections.stripped[i]
             if not line_stripped:
                 if current_project and current_project.get("nom"):
                     projects.append(current_project)
@@ -1817,7 +1933,7 @@ class CVAnalyzer:
                 in_project = False
                 continue
             
-            if any(re.search(pattern, line_stripped) for pattern in project_patterns):
+            if i in headings:
                 if current_project and current_project.get("nom"):
                     projects.append(current_project)
                 current_project = {}
@@ -1839,38 +1955,19 @@ class CVAnalyzer:
         
         return projects[:5]
     
-    def _extract_education_structured(self, cv_text: str, lines: List[str]) -> List[Dict]:
+    def _extract_education_structured(self, cv_text: str, sections: SectionMap) -> List[Dict]:
         """Extrait la formation de manière structurée et claire, sans doublons"""
         education = []
-        edu_keywords = ['formation', 'education', 'études', 'studies', 'diplôme', 'diploma']
         degree_keywords = ['master', 'licence', 'bachelor', 'diplôme', 'bac', 'phd', 'doctorat', 
                           'mba', 'bts', 'dut', 'ingénieur', 'engineer']
         school_keywords = ['université', 'university', 'école', 'school', 'institut', 'institute', 
                           'college', 'faculté', 'faculty', 'supérieure']
         
-        # Trouver la section Formation
-        section_start = -1
-        section_end = len(lines)
-        for i, line in enumerate(lines):
-            line_lower = line.lower().strip()
-            if any(keyword in line_lower for keyword in edu_keywords) and len(line_lower) < 30:
-                section_start = i + 1
-                # Trouver la fin de la section
-                for j in range(i + 1, min(len(lines), i + 100)):
-                    next_line_lower = lines[j].lower().strip()
-                    if any(keyword in next_line_lower for keyword in ['expérience', 'experience', 'compétences', 'skills', 'projets', 'certifications', 'langues']):
-                        section_end = j
-                        break
-                break
-        
-        if section_start == -1:
-            section_start = 0
-        
-        # Parser les formations ligne par ligne
+        # Parser les formations ligne par ligne (section Formation, tout le CV à défaut)
         current_edu = {}
         
-        for i in range(section_start, section_end):
-            line = lines[i].strip()
+        for i in sections.section("education"):
+            line = sections.stripped[i]
             if not line or len(line) < 3:
                 if current_edu and current_edu.get("diplome"):
                     education.append(current_edu)
@@ -1992,22 +2089,19 @@ class CVAnalyzer:
         
         return unique_education[:5]
     
-    def _extract_certifications_structured(self, cv_text: str, lines: List[str]) -> List[Dict]:
+    def _extract_certifications_structured(self, cv_text: str, sections: SectionMap) -> List[Dict]:
         """Extrait les certifications"""
         certifications = []
-        cert_patterns = [
-            r'(?i)(certification|certificat|certificate|cert)',
-            r'(?i)(aws certified|azure certified|google cloud|oracle certified)'
-        ]
+        headings = sections.markers["certifications"]
         
         current_cert = {}
         in_cert = False
         
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
+        for i in sections.section("certifications"):
+            line_stripped = sections.stripped[i]
             line_lower = line_stripped.lower()
             
-            if any(re.search(pattern, line_lower) for pattern in cert_patterns):
+            if i in headings:
                 if current_cert and current_cert.get("nom"):
                     certifications.append(current_cert)
                 current_cert = {}
@@ -2029,10 +2123,10 @@ class CVAnalyzer:
         
         return certifications[:5]
     
-    def _extract_languages_structured(self, cv_text: str, lines: List[str]) -> List[Dict]:
+    def _extract_languages_structured(self, cv_text: str, sections: SectionMap) -> List[Dict]:
         """Extrait les langues avec niveaux"""
         languages_list = []
-        languages = self.extract_languages(cv_text)
+        languages = self.extract_languages(cv_text, sections)
         
         # Chercher les niveaux pour chaque langue
         for lang in languages:
@@ -2144,9 +2238,11 @@ class CVAnalyzer:
         if not cv_full_text.strip():
             return 0.0
         
-        # DEBUG
-        print(f"[DEBUG] CV résumé (premiers 200 caractères): {cv_full_text[:200]}")
-        print(f"[DEBUG] Description poste (premiers 200 caractères): {job_description[:200]}")
+        # Traces de debug échantillonnées (les extraits de texte ne sont construits que si DEBUG est actif)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("CV résumé (premiers 200 caractères): %s", cv_full_text[:200], extra=SAMPLED)
+            logger.debug("Description poste (premiers 200 caractères): %s", job_description[:200], extra=SAMPLED)
         
         # Extraire le résumé professionnel maintenant (pour utilisation dans le calcul sémantique)
         professional_summary_for_semantic = ""
@@ -2179,7 +2275,9 @@ class CVAnalyzer:
             if len(common_words) >= 3:
                 semantic_score = max(semantic_score, 0.6)  # Minimum 0.6 si 3+ mots-clés communs
         
-        print(f"[DEBUG] Score sémantique IA: {semantic_score:.3f} (full: {semantic_score_full:.3f}, summary: {semantic_score_summary:.3f})")
+        if debug:
+            logger.debug("Score sémantique IA: %.3f (full: %.3f, summary: %.3f)",
+                         semantic_score, semantic_score_full, semantic_score_summary, extra=SAMPLED)
         
         # Comparaison des compétences requises vs compétences du CV (20%)
         required_skills = self._extract_required_skills_from_job(job_description)
@@ -2222,7 +2320,8 @@ class CVAnalyzer:
                     matching_count += 0.0
             
             skills_match_score = matching_count / len(required_skills[:20]) if required_skills[:20] else 0.0
-        print(f"[DEBUG] Score correspondance compétences: {skills_match_score:.3f}")
+        if debug:
+            logger.debug("Score correspondance compétences: %.3f", skills_match_score, extra=SAMPLED)
         
         # Comparaison résumé professionnel vs description (10%)
         professional_summary = professional_summary_for_semantic  # Utiliser celui déjà extrait
@@ -2231,7 +2330,8 @@ class CVAnalyzer:
         if professional_summary:
             # Utiliser le calcul amélioré local (pas d'API)
             summary_semantic_score = self._enhanced_similarity(professional_summary, job_description)
-        print(f"[DEBUG] Score sémantique résumé: {summary_semantic_score:.3f}")
+        if debug:
+            logger.debug("Score sémantique résumé: %.3f", summary_semantic_score, extra=SAMPLED)
         
         # Calcul du score final avec pondération réaliste
         # Donner plus de poids aux compétences car c'est le critère le plus objectif
@@ -2314,6 +2414,23 @@ class CVAnalyzer:
             # Très bonne correspondance
             final_score = max(final_score, 65.0)  # Minimum 65% pour très bonne correspondance
         
-        print(f"[DEBUG] Score final calculé: {final_score:.1f} (sémantique: {semantic_score:.3f}, compétences: {skills_match_score:.3f}, résumé: {summary_semantic_score:.3f})")
+        if debug:
+            logger.debug("Score final calculé: %.1f (sémantique: %.3f, compétences: %.3f, résumé: %.3f)",
+                         final_score, semantic_score, skills_match_score, summary_semantic_score, extra=SAMPLED)
         
         return round(min(max(final_score, 0.0), 100.0), 1)
+
+
+# Analyseur propre à chaque worker du pool : la segmentation du CV est partagée
+# par les extracteurs exécutés dans le même processus
+_worker_analyzer: Optional[CVAnalyzer] = None
+
+
+def _profile_field_worker(field: str, cv_text: str) -> Tuple[object, float, float]:
+    """Point d'entrée des workers : un champ du profil, avec ses temps réel et CPU"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = CVAnalyzer()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    value = _worker_analyzer._extract_profile_field(field, cv_text)
+    return value, time.perf_counter() - wall_start, time.thread_time() - cpu_start
@@ -1,17 +1,72 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from typing import Callable, Optional
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
+from .admission import ANALYSIS_WORKERS
+from .sqlite_writer import SQLiteWriter
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # URL de la base de données (SQLite par défaut pour le développement)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./cv_analysis.db")
 
+
+def _async_url(url: str) -> str:
+    """
+    Même base avec un pilote asynchrone : aiosqlite pour SQLite, asyncpg pour PostgreSQL,
+    aiomysql pour MySQL. Les autres URL sont gardées telles quelles (pilote déjà asynchrone).
+    """
+    scheme, _, rest = url.partition(":")
+    if scheme == "sqlite":
+        return "sqlite+aiosqlite:" + rest
+    if scheme in ("postgres", "postgresql", "postgresql+psycopg2"):
+        # asyncpg attend ssl=... au lieu de sslmode=...
+        return "postgresql+asyncpg:" + rest.replace("sslmode=", "ssl=")
+    if scheme in ("mysql", "mysql+pymysql", "mysql+mysqldb"):
+        return "mysql+aiomysql:" + rest
+    return url
+
+
+def _check_async_url(url: str) -> str:
+    """Refuse une URL dont le pilote n'est pas asynchrone (erreur explicite plutôt qu'à l'import du moteur)"""
+    try:
+        is_async = make_url(url).get_dialect().is_async
+    except Exception as e:
+        raise ValueError(f"URL de base de données asynchrone invalide ({e}) : définir ASYNC_DATABASE_URL") from e
+    if not is_async:
+        raise ValueError(
+            f"Le pilote de {make_url(url).drivername} n'est pas asynchrone : définir ASYNC_DATABASE_URL "
+            "avec un pilote asynchrone (sqlite+aiosqlite, postgresql+asyncpg, mysql+aiomysql)"
+        )
+    return url
+
+
+# URL utilisée par les routes (sessions asynchrones, voir get_async_db)
+ASYNC_DATABASE_URL = _check_async_url(os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL)))
+
+# SQLite : toutes les écritures passent par un thread écrivain unique (voir sqlite_writer.py),
+# les sessions des routes sont en lecture seule
+SQLITE_WRITER = "sqlite" in DATABASE_URL and os.getenv("SQLITE_WRITER", "true").lower() == "true"
+
+# SQLite : connexions gardées dans un pool ("queue", défaut) ou ouvertes à chaque session
+# ("null"). En pool, les PRAGMA ne sont exécutés qu'à l'ouverture de chaque connexion physique.
+SQLITE_POOL = os.getenv("SQLITE_POOL", "queue").lower()
+# Taille du pool alignée sur l'executor d'analyse (requêtes en cours), doublée en pointe
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", str(max(2, ANALYSIS_WORKERS))))
+
 # Configuration pour éviter les blocages
 connect_args = {}
 pool_config = {}
+async_pool_config = {}
 
 if "sqlite" in DATABASE_URL:
     # Configuration spécifique pour SQLite
@@ -19,12 +74,21 @@ if "sqlite" in DATABASE_URL:
         "check_same_thread": False,
         "timeout": 10.0  # Timeout réduit à 10 secondes pour éviter les blocages
     }
-    # SQLite utilise NullPool par défaut, mais on peut configurer un pool
-    # pour améliorer les performances avec plusieurs requêtes
-    pool_config = {
-        "poolclass": None,  # NullPool pour SQLite (pas de pool)
-        "pool_pre_ping": False,  # Pas nécessaire pour SQLite
-    }
+    if make_url(DATABASE_URL).database in (None, "", ":memory:"):
+        # Base en mémoire (une base par connexion) : pool par défaut de SQLAlchemy
+        pass
+    elif SQLITE_POOL == "null":
+        pool_config = {"poolclass": NullPool}
+        async_pool_config = {"poolclass": NullPool}
+    else:
+        sizing = {
+            "pool_size": SQLITE_POOL_SIZE,
+            "max_overflow": SQLITE_POOL_SIZE,
+            "pool_timeout": 30,
+            "pool_pre_ping": False,  # Pas nécessaire pour SQLite (fichier local)
+        }
+        pool_config = {"poolclass": QueuePool, **sizing}
+        async_pool_config = {"poolclass": AsyncAdaptedQueuePool, **sizing}
 else:
     # Configuration pour PostgreSQL/MySQL (production)
     pool_config = {
@@ -34,7 +98,9 @@ else:
         "pool_recycle": 3600,  # Recycler les connexions après 1 heure
         "pool_pre_ping": True,  # Vérifier que les connexions sont vivantes avant utilisation
     }
+    async_pool_config = pool_config
 
+# Moteur synchrone : création des tables, scripts d'administration
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
@@ -42,41 +108,110 @@ engine = create_engine(
     **pool_config
 )
 
+# Moteur asynchrone des routes : les attentes de la base (verrou SQLite, réseau) ne bloquent
+# plus la boucle d'événements ni les autres requêtes du worker
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"timeout": 10.0} if "sqlite" in ASYNC_DATABASE_URL else {},
+    echo=False,
+    **async_pool_config
+)
+
 # Pour SQLite, activer WAL mode pour améliorer les performances concurrentes
-if "sqlite" in DATABASE_URL:
-    @event.listens_for(engine, "connect")
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=10000",  # 10 secondes de timeout pour les verrous
+)
+
+
+def _sqlite_pragmas(*extra: str):
+    """Listener "connect" qui applique les PRAGMA communs puis `extra` à chaque nouvelle connexion"""
     def set_sqlite_pragma(dbapi_conn, connection_record):
         """Active le mode WAL pour SQLite afin d'améliorer les performances concurrentes"""
         cursor = dbapi_conn.cursor()
         try:
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute("PRAGMA synchronous=NORMAL")
-            cursor.execute("PRAGMA foreign_keys=ON")
-            cursor.execute("PRAGMA busy_timeout=10000")  # 10 secondes de timeout pour les verrous
-            cursor.execute("PRAGMA wal_autocheckpoint=1000")  # Optimiser les checkpoints WAL
+            for pragma in SQLITE_PRAGMAS + extra:
+                cursor.execute(pragma)
         except Exception as e:
-            print(f"Erreur lors de la configuration SQLite: {e}")
+            logger.warning("Erreur lors de la configuration SQLite: %s", e)
         finally:
             cursor.close()
+    return set_sqlite_pragma
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+def _sqlite_explicit_transactions(engine) -> None:
+    """
+    Transactions SQLite ouvertes par SQLAlchemy (BEGIN explicite) plutôt que par pysqlite,
+    qui n'ouvre la transaction qu'à la première instruction DML : sans cela, un SAVEPOINT
+    émis en début de session ouvre sa propre transaction et son RELEASE la valide.
+    Nécessaire aux savepoints (isolation des lignes d'un lot, voir write_behind.insert_all).
+    """
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_begin(dbapi_conn, connection_record):
+        dbapi_conn.isolation_level = None
 
-def get_db():
-    """Générateur de session de base de données avec gestion automatique de la fermeture"""
-    db = SessionLocal()
-    try:
-        yield db
-        # NE PAS faire de commit automatique - laisser les routes gérer leurs propres commits
-    except Exception:
-        # En cas d'erreur, faire un rollback avant de fermer
-        db.rollback()
-        raise
-    finally:
-        # Fermer la session de manière explicite
-        db.close()
+    @event.listens_for(engine, "begin")
+    def emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
 
 
+sqlite_writer: Optional[SQLiteWriter] = None
+
+if "sqlite" in DATABASE_URL:
+    # Scripts d'administration : checkpoints automatiques du WAL
+    event.listen(engine, "connect", _sqlite_pragmas("PRAGMA wal_autocheckpoint=1000"))
+    if SQLITE_WRITER and engine.url.database not in (None, "", ":memory:"):
+        # Une connexion dédiée au thread écrivain, qui gère lui-même les checkpoints
+        writer_engine = create_engine(DATABASE_URL, connect_args=connect_args, poolclass=StaticPool, echo=False)
+        event.listen(writer_engine, "connect", _sqlite_pragmas("PRAGMA wal_autocheckpoint=0"))
+        _sqlite_explicit_transactions(writer_engine)
+        sqlite_writer = SQLiteWriter(writer_engine, os.path.abspath(engine.url.database))
+        # Lectures seulement sur les connexions des routes
+        event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas("PRAGMA query_only=ON"))
+    else:
+        event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas("PRAGMA wal_autocheckpoint=1000"))
+        _sqlite_explicit_transactions(async_engine.sync_engine)
 
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# expire_on_commit=False : les objets restent lisibles après le commit sans nouvelle requête
+# (pas de chargement implicite possible en asynchrone)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession,
+                                       autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+async def get_async_db():
+    """Session asynchrone de la requête, fermée automatiquement (dépendance FastAPI)"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            # NE PAS faire de commit automatique - laisser les routes gérer leurs propres commits
+        except Exception:
+            # En cas d'erreur, faire un rollback avant de fermer
+            await db.rollback()
+            raise
+
+async def run_write(job: Callable[[Session], object]):
+    """
+    Exécute `job(session)` (code SQLAlchemy synchrone) dans sa propre transaction validée
+    et retourne son résultat. SQLite : file de l'écrivain unique ; autres bases : session
+    asynchrone (run_sync).
+    """
+    if sqlite_writer is not None:
+        return await asyncio.wrap_future(sqlite_writer.submit(job))
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.run_sync(job)
+            await db.commit()
+            return result
+        except Exception:
+            await db.rollback()
+            raise
 
+def shutdown_writer() -> None:
+    """Termine les écritures en file de l'écrivain SQLite (à l'arrêt de l'application)"""
+    if sqlite_writer is not None:
+        sqlite_writer.stop()
@@ -0,0 +1,237 @@
+"""
+Extraction du texte des documents Word binaires (.doc, Word 97 à 2003).
+
+Lecteur natif, sans convertisseur externe : le conteneur OLE2/CFB (Compound File Binary)
+est décodé directement (FAT, mini-FAT, répertoire), puis le texte principal est
+reconstitué à partir du FIB et de la table des pièces (CLX) du flux WordDocument.
+Seuls les flux nécessaires sont lus ; les chaînes de secteurs sont bornées par la
+taille du fichier (pas de boucle infinie sur un fichier corrompu).
+"""
+import re
+import struct
+from typing import Dict, List, Tuple
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+# Valeurs spéciales des tables d'allocation
+_FREESECT, _ENDOFCHAIN, _DIFSECT = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFC
+
+# Caractères de contrôle Word : fin de paragraphe, de cellule, saut de ligne ou de page
+_BREAKS = str.maketrans({"\r": "\n", "\x07": "\n", "\x0b": "\n", "\x0c": "\n", "\x0e": "\n",
+                         "\x1e": "-", "\xa0": " ", "\t": " "})
+# Objets ancrés (images, notes, dessins) et trait d'union conditionnel
+_ANCHORS = re.compile(r"[\x00-\x06\x08\x1f]")
+_LINE_SPACES = re.compile(r"[ ]{2,}")
+
+
+class DocFormatError(Exception):
+    """Document .doc illisible (conteneur corrompu, format trop ancien, document chiffré)"""
+
+
+class CompoundFile:
+    """Lecteur minimal de conteneur OLE2/CFB (lecture seule, en mémoire)"""
+
+    def __init__(self, data: bytes):
+        if len(data) < 512 or data[:8] != OLE_SIGNATURE:
+            raise DocFormatError("Ce fichier n'est pas un document Word (.doc) valide.")
+        self.data = data
+        (sector_shift, mini_shift) = struct.unpack_from("<HH", data, 0x1E)
+        if sector_shift not in (9, 12) or mini_shift != 6:
+            raise DocFormatError("En-tête du document .doc invalide.")
+        self.sector_size = 1 << sector_shift
+        self.mini_sector_size = 1 << mini_shift
+        (fat_count, self.first_dir_sector, _, self.mini_cutoff, self.first_minifat_sector,
+         minifat_count, first_difat_sector, difat_count) = struct.unpack_from("<IIIIIIII", data, 0x2C)
+        # Nombre maximal de secteurs : borne toutes les chaînes (fichiers corrompus ou cycliques)
+        self.max_sectors = max(1, (len(data) - self.sector_size) // self.sector_size + 1)
+
+        fat_sectors = [s for s in struct.unpack_from("<109I", data, 0x4C) if s not in (_FREESECT, _ENDOFCHAIN)]
+        sector, per_sector = first_difat_sector, self.sector_size // 4 - 1
+        for _ in range(min(difat_count, self.max_sectors)):
+            if sector in (_FREESECT, _ENDOFCHAIN):
+                break
+            entries = struct.unpack_from(f"<{per_sector + 1}I", self._sector(sector))
+            fat_sectors.extend(s for s in entries[:per_sector] if s not in (_FREESECT, _ENDOFCHAIN))
+            sector = entries[per_sector]
+        if len(fat_sectors) < min(fat_count, self.max_sectors):
+            raise DocFormatError("Table d'allocation du document .doc incomplète.")
+
+        fat = bytearray()
+        for sector in fat_sectors[:fat_count]:
+            fat += self._sector(sector)
+        self.fat = struct.unpack(f"<{len(fat) // 4}I", fat)
+
+        self.entries = self._read_directory()
+        root = self.entries.get("Root Entry")
+        self.mini_stream = self._chain_bytes(root[0], root[1], self.fat, self.sector_size,
+                                             self._sector) if root else b""
+        minifat = self._chain_bytes(self.first_minifat_sector, minifat_count * self.sector_size,
+                                    self.fat, self.sector_size, self._sector) if minifat_count else b""
+        self.minifat = struct.unpack(f"<{len(minifat) // 4}I", minifat)
+
+    def _sector(self, index: int) -> bytes:
+        offset = (index + 1) * self.sector_size
+        if index >= _DIFSECT or offset >= len(self.data):
+            raise DocFormatError("Secteur hors du fichier : document .doc corrompu.")
+        return self.data[offset:offset + self.sector_size]
+
+    def _mini_sector(self, index: int) -> bytes:
+        offset = index * self.mini_sector_size
+        if offset + self.mini_sector_size > len(self.mini_stream):
+            raise DocFormatError("Mini-secteur hors du flux : document .doc corrompu.")
+        return self.mini_stream[offset:offset + self.mini_sector_size]
+
+    def _chain_bytes(self, start: int, size: int, table, unit: int, read) -> bytes:
+        """Concatène les secteurs d'une chaîne jusqu'à `size` octets (chaîne bornée)"""
+        chunks, sector, remaining = [], start, size
+        for _ in range(self.max_sectors * (self.sector_size // unit)):
+            if remaining <= 0 or sector in (_ENDOFCHAIN, _FREESECT):
+                break
+            if sector >= len(table):
+                raise DocFormatError("Chaîne de secteurs invalide : document .doc corrompu.")
+            chunks.append(read(sector))
+            remaining -= unit
+            sector = table[sector]
+        data = b"".join(chunks)
+        if len(data) < size:
+            raise DocFormatError("Flux tronqué : document .doc corrompu.")
+        return data[:size]
+
+    def _read_directory(self) -> Dict[str, Tuple[int, int]]:
+        """Nom de flux -> (premier secteur, taille), pour les flux et la racine"""
+        sector, chunks = self.first_dir_sector, []
+        for _ in range(self.max_sectors):
+            if sector in (_ENDOFCHAIN, _FREESECT) or sector >= len(self.fat):
+                break
+            chunks.append(self._sector(sector))
+            sector = self.fat[sector]
+        directory = b"".join(chunks)
+
+        entries = {}
+        for offset in range(0, len(directory) - 127, 128):
+            name_length, entry_type = struct.unpack_from("<HB", directory, offset + 64)
+            if entry_type not in (2, 5) or not 2 <= name_length <= 64:
+                continue
+            name = directory[offset:offset + name_length - 2].decode("utf-16-le", errors="replace")
+            # Taille sur 64 bits : les 32 bits de poids faible suffisent (fichiers de 10 Mo au plus)
+            start, size = struct.unpack_from("<II", directory, offset + 116)
+            entries.setdefault(name, (start, size))
+        return entries
+
+    def open_stream(self, name: str) -> bytes:
+        """Contenu complet d'un flux de premier niveau"""
+        if name not in self.entries:
+            raise DocFormatError(f"Flux {name} absent : ce n'est pas un document Word.")
+        start, size = self.entries[name]
+        if size > len(self.data):
+            raise DocFormatError("Taille de flux incohérente : document .doc corrompu.")
+        if size < self.mini_cutoff:
+            return self._chain_bytes(start, size, self.minifat, self.mini_sector_size, self._mini_sector)
+        return self._chain_bytes(start, size, self.fat, self.sector_size, self._sector)
+
+
+def _read_fib(word_document: bytes) -> Tuple[str, int, int, int]:
+    """Retourne (flux de table, ccpText, fcClx, lcbClx) après validation du FIB"""
+    if len(word_document) < 0x1AA:
+        raise DocFormatError("En-tête Word (FIB) tronqué.")
+    ident, n_fib = struct.unpack_from("<HH", word_document, 0)
+    if ident != 0xA5EC:
+        raise DocFormatError("Ce fichier n'est pas un document Word (.doc) valide.")
+    if n_fib < 101:
+        raise DocFormatError("Format Word 95 ou antérieur non supporté.")
+    flags = struct.unpack_from("<H", word_document, 0x0A)[0]
+    if flags & 0x0100:
+        raise DocFormatError("Le document est protégé par un mot de passe.")
+    table_stream = "1Table" if flags & 0x0200 else "0Table"
+    ccp_text = struct.unpack_from("<i", word_document, 0x4C)[0]
+    fc_clx, lcb_clx = struct.unpack_from("<II", word_document, 0x1A2)
+    return table_stream, ccp_text, fc_clx, lcb_clx
+
+
+def _read_pieces(table: bytes, fc_clx: int, lcb_clx: int) -> List[Tuple[int, int, int, bool]]:
+    """Table des pièces : liste de (cp début, cp fin, position dans WordDocument, texte compressé)"""
+    clx = table[fc_clx:fc_clx + lcb_clx]
+    position = 0
+    # Ignorer les Prc (modifications de propriétés) qui précèdent la table des pièces
+    while position < len(clx) and clx[position] == 0x01:
+        position += 3 + struct.unpack_from("<H", clx, position + 1)[0]
+    if position + 5 > len(clx) or clx[position] != 0x02:
+        raise DocFormatError("Table des pièces introuvable : document .doc corrompu.")
+    lcb = struct.unpack_from("<I", clx, position + 1)[0]
+    plc = clx[position + 5:position + 5 + lcb]
+    count = (len(plc) - 4) // 12
+    if count <= 0:
+        return []
+    cps = struct.unpack_from(f"<{count + 1}I", plc, 0)
+    pieces = []
+    for i in range(count):
+        fc = struct.unpack_from("<I", plc, 4 * (count + 1) + 8 * i + 2)[0]
+        compressed = bool(fc & 0x40000000)
+        fc &= 0x3FFFFFFF
+        pieces.append((cps[i], cps[i + 1], fc // 2 if compressed else fc, compressed))
+    return pieces
+
+
+def _strip_fields(text: str) -> str:
+    """Supprime le code des champs (entre 0x13 et 0x14) et garde leur résultat (jusqu'à 0x15)"""
+    if "\x13" not in text:
+        return text
+    output, stack = [], []
+    for char in text:
+        if char == "\x13":
+            stack.append(True)          # dans le code du champ
+        elif char == "\x14" and stack:
+            stack[-1] = False           # dans le résultat affiché
+        elif char == "\x15" and stack:
+            stack.pop()
+        elif not stack or not stack[-1]:
+            output.append(char)
+    return "".join(output)
+
+
+def _load(data: bytes) -> Tuple[CompoundFile, bytes, Tuple[str, int, int, int]]:
+    try:
+        container = CompoundFile(data)
+        # DOCX protégé par mot de passe : paquet OOXML chiffré dans un conteneur OLE2
+        if "EncryptedPackage" in container.entries:
+            raise DocFormatError("Le document est protégé par un mot de passe.")
+        word_document = container.open_stream("WordDocument")
+        return container, word_document, _read_fib(word_document)
+    except (struct.error, IndexError, OverflowError, MemoryError) as e:
+        raise DocFormatError(f"Document .doc corrompu ({e}).")
+
+
+def _load_pieces(container: CompoundFile, table_stream: str, fc_clx: int, lcb_clx: int):
+    try:
+        return _read_pieces(container.open_stream(table_stream), fc_clx, lcb_clx)
+    except struct.error as e:
+        raise DocFormatError(f"Document .doc corrompu ({e}).")
+
+
+def check_doc(data: bytes) -> None:
+    """Vérifie qu'un .doc est lisible (conteneur, FIB, chiffrement, table des pièces) ; lève DocFormatError"""
+    container, _, (table_stream, _, fc_clx, lcb_clx) = _load(data)
+    if not _load_pieces(container, table_stream, fc_clx, lcb_clx):
+        raise DocFormatError("Le document .doc ne contient pas de texte.")
+
+
+def extract_doc_text(file_path: str) -> str:
+    """Extrait le texte principal d'un .doc (une ligne par paragraphe ou cellule)"""
+    with open(file_path, "rb") as f:
+        container, word_document, (table_stream, ccp_text, fc_clx, lcb_clx) = _load(f.read())
+    pieces = _load_pieces(container, table_stream, fc_clx, lcb_clx)
+
+    parts, remaining = [], max(0, ccp_text)
+    for cp_start, cp_end, offset, compressed in pieces:
+        if remaining <= 0:
+            break
+        length = min(cp_end - cp_start, remaining)
+        if compressed:
+            parts.append(word_document[offset:offset + length].decode("cp1252", errors="replace"))
+        else:
+            parts.append(word_document[offset:offset + 2 * length].decode("utf-16-le", errors="replace"))
+        remaining -= length
+
+    text = _ANCHORS.sub("", _strip_fields("".join(parts)).translate(_BREAKS))
+    lines = (_LINE_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
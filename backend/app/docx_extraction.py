@@ -0,0 +1,147 @@
+"""
+Extraction du texte des fichiers DOCX.
+
+Par défaut (DOCX_BACKEND=stream), `word/document.xml` est lu en flux directement depuis
+l'archive zip avec un parseur XML incrémental : pas de modèle objet python-docx, mémoire
+bornée, paragraphes et lignes de tableau émis dans l'ordre du document. Une cellule
+fusionnée n'est émise qu'une fois. Les zones de texte et contrôles de contenu (souvent
+utilisés par les modèles de CV pour la barre latérale) sont inclus.
+DOCX_BACKEND=python-docx conserve l'ancien comportement ; c'est aussi le repli en cas
+de document inhabituel (partie principale introuvable, XML invalide, altChunk).
+"""
+import logging
+import os
+import posixpath
+import zipfile
+from typing import List
+from xml.etree import ElementTree
+
+import docx
+
+logger = logging.getLogger(__name__)
+
+DOCX_BACKENDS = ("stream", "python-docx")
+DOCX_BACKEND = os.getenv("DOCX_BACKEND", "stream").lower()
+if DOCX_BACKEND not in DOCX_BACKENDS:
+    logger.warning("DOCX_BACKEND inconnu (%s), utilisation de stream", DOCX_BACKEND)
+    DOCX_BACKEND = "stream"
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_OFFICE_DOCUMENT = "/officeDocument"
+
+W_BODY, W_P, W_R, W_T, W_TAB, W_BR, W_CR = (_W + tag for tag in ("body", "p", "r", "t", "tab", "br", "cr"))
+W_NO_BREAK_HYPHEN, W_TBL, W_TR, W_TC, W_VMERGE, W_ALT_CHUNK = (
+    _W + tag for tag in ("noBreakHyphen", "tbl", "tr", "tc", "vMerge", "altChunk")
+)
+W_VAL, W_TYPE = _W + "val", _W + "type"
+
+
+class UnsupportedDocx(Exception):
+    """Structure que le lecteur en flux ne sait pas traiter (repli sur python-docx)"""
+
+
+def _main_part_name(archive: zipfile.ZipFile) -> str:
+    """Nom de la partie principale du document (d'après _rels/.rels, word/document.xml par défaut)"""
+    try:
+        with archive.open("_rels/.rels") as rels:
+            for rel in ElementTree.parse(rels).getroot().iter(_REL):
+                if rel.get("Type", "").endswith(_OFFICE_DOCUMENT):
+                    return posixpath.normpath(rel.get("Target", "").lstrip("/"))
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+
+def _stream_lines(xml_stream) -> List[str]:
+    """Parcourt document.xml et retourne les lignes (paragraphes, lignes de tableau) dans l'ordre"""
+    lines: List[str] = []
+    tags: List[str] = []        # pile des balises ouvertes
+    paragraphs: List[list] = []  # pile des paragraphes en cours (zones de texte imbriquées)
+    cells: List[list] = []      # pile des cellules en cours : [paragraphes, continuation de fusion]
+    rows: List[list] = []       # pile des lignes de tableau en cours
+    skip_depth = 0              # > 0 à l'intérieur d'un mc:Fallback (doublon de mc:Choice)
+    body = None
+
+    for event, elem in ElementTree.iterparse(xml_stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            tags.append(tag)
+            if skip_depth or tag == _MC_FALLBACK:
+                skip_depth += 1
+            elif tag == W_P:
+                paragraphs.append([])
+            elif tag == W_TC:
+                cells.append([[], False])
+            elif tag == W_TR:
+                rows.append([])
+            elif tag == W_BODY:
+                body = elem
+            elif tag == W_ALT_CHUNK:
+                raise UnsupportedDocx("altChunk")
+            continue
+
+        tags.pop()
+        if skip_depth:
+            skip_depth -= 1
+        elif tag == W_T:
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tags and tags[-1] == W_R and paragraphs:
+            # Éléments de run équivalents à du texte (comme Run.text de python-docx)
+            if tag == W_TAB:
+                paragraphs[-1].append("\t")
+            elif tag == W_CR or (tag == W_BR and elem.get(W_TYPE, "textWrapping") == "textWrapping"):
+                paragraphs[-1].append("\n")
+            elif tag == W_NO_BREAK_HYPHEN:
+                paragraphs[-1].append("-")
+        elif tag == W_VMERGE and cells:
+            # Cellule fusionnée verticalement : seule la première (restart) porte le texte
+            if elem.get(W_VAL, "continue") == "continue":
+                cells[-1][1] = True
+        elif tag == W_P:
+            text = "".join(paragraphs.pop()).strip()
+            if cells:
+                cells[-1][0].append(text)
+            elif text:
+                lines.append(text)
+        elif tag == W_TC:
+            cell_paragraphs, continuation = cells.pop()
+            cell_text = "\n".join(cell_paragraphs).strip()
+            if rows and cell_text and not continuation:
+                rows[-1].append(cell_text)
+        elif tag == W_TR:
+            row_text = " | ".join(rows.pop())
+            if row_text:
+                lines.append(row_text)
+
+        elem.clear()
+        # Libérer les blocs de premier niveau déjà traités (mémoire bornée)
+        if body is not None and len(tags) == 2 and tags[-1] == W_BODY:
+            body.clear()
+    return lines
+
+
+def _extract_with_python_docx(file_path: str) -> str:
+    """Ancienne extraction : paragraphes puis tableaux, via le modèle objet python-docx"""
+    doc = docx.Document(file_path)
+    lines = [paragraph.text.strip() for paragraph in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            lines.append(" | ".join([cell.text.strip() for cell in row.cells if cell.text.strip()]))
+    return "\n".join(line for line in lines if line)
+
+
+def extract_docx_text(file_path: str) -> str:
+    """Extrait le texte d'un DOCX (une ligne par paragraphe ou ligne de tableau)"""
+    if DOCX_BACKEND == "python-docx":
+        return _extract_with_python_docx(file_path)
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            with archive.open(_main_part_name(archive)) as xml_stream:
+                lines = _stream_lines(xml_stream)
+    except (KeyError, ElementTree.ParseError, UnsupportedDocx) as e:
+        logger.info("Lecture en flux du DOCX impossible (%s), repli sur python-docx", e)
+        return _extract_with_python_docx(file_path)
+    return "\n".join(lines).strip()
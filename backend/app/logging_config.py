@@ -0,0 +1,102 @@
+"""
+Configuration du logging structuré de l'application.
+
+- niveaux par module : LOG_LEVEL (défaut INFO) et LOG_LEVELS="app.cv_analyzer=DEBUG,app.routes=WARNING"
+- format : LOG_FORMAT=text (défaut) ou json
+- échantillonnage des événements DEBUG du chemin critique : LOG_SAMPLE_EVERY (1 sur N, défaut 100)
+- corrélation : chaque ligne porte l'identifiant de requête (en-tête X-Request-ID)
+
+Les messages utilisent le formatage paresseux de logging (`logger.debug("... %s", x)`) :
+un niveau désactivé ne coûte qu'un test d'entier.
+"""
+import contextvars
+import itertools
+import json
+import logging
+import os
+import sys
+from typing import Dict
+
+# Identifiant de la requête en cours (propagé aux threads de l'executor via copy_context)
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default="-")
+
+# À passer en `extra` pour les événements DEBUG très fréquents (appelés à chaque analyse)
+SAMPLED = {"sampled": True}
+
+
+class RequestIdFilter(logging.Filter):
+    """Ajoute l'identifiant de requête courant à chaque enregistrement"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Ne conserve qu'un enregistrement sur N parmi ceux marqués `sampled`"""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: Dict[str, "itertools.count"] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.every == 1:
+            return True
+        counter = self._counters.get(record.msg)
+        if counter is None:
+            counter = self._counters.setdefault(record.msg, itertools.count())
+        return next(counter) % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate chaque enregistrement en une ligne JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Parse "module=NIVEAU,module2=NIVEAU" en dictionnaire"""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """Configure le logger `app` (handler, format, niveaux, filtres) ; idempotent"""
+    app_logger = logging.getLogger("app")
+    if getattr(app_logger, "_configured", False):
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(name)s] [req:%(request_id)s] %(message)s"
+        ))
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(int(os.getenv("LOG_SAMPLE_EVERY", "100"))))
+
+    app_logger.addHandler(handler)
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    # Éviter la duplication des lignes par le logger racine (gunicorn/uvicorn)
+    app_logger.propagate = False
+
+    for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+    app_logger._configured = True
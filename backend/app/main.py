@@ -1,22 +1,43 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 import os
+import secrets
+import uuid
+from .logging_config import configure_logging, request_id_var
+
+# Configurer le logging avant d'importer les modules qui créent leurs loggers
+configure_logging()
+
 from . import database
+from .admission import analysis_admission
+from .metrics import render_prometheus
+from .write_behind import analysis_writer
 from .routes import auth, cv, analysis
 
-# Créer les tables de la base de données
-database.Base.metadata.create_all(bind=database.engine)
+# Le schéma est créé et migré avant le démarrage des workers (voir app/migrate.py)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestion du cycle de vie de l'application"""
-    # Startup
+    # Startup - analyses partielles abandonnées par un worker arrêté (voir routes/cv.py)
+    partial_sweeper = asyncio.create_task(cv.sweep_partial_analyses())
     yield
+    partial_sweeper.cancel()
     # Shutdown - nettoyer les ressources
     from .routes.cv import _shared_executor
     if _shared_executor is not None:
         _shared_executor.shutdown(wait=False)  # Ne pas bloquer au shutdown
+    from .workers import shutdown_process_pool
+    shutdown_process_pool()
+    from .auth import shutdown_hash_executor
+    shutdown_hash_executor()
+    # Écrire les résultats encore en attente avant de fermer les connexions
+    await analysis_writer.drain()
+    database.shutdown_writer()
+    await database.async_engine.dispose()
 
 app = FastAPI(
     title="CV Analysis API",
@@ -43,6 +64,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Associe un identifiant à chaque requête (repris de X-Request-ID si fourni) pour corréler les logs"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:12]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Inclure les routes
 app.include_router(auth.router)
 app.include_router(cv.router)
@@ -56,7 +89,48 @@ async def root():
 async def health_check():
     return {"status": "ok"}
 
+# /metrics et /health/details exposent l'état interne (files d'analyse, écritures, caches) :
+# réservés à la supervision, avec l'en-tête "Authorization: Bearer <METRICS_TOKEN>".
+# Sans METRICS_TOKEN (développement), seules les connexions locales sans en-tête de proxy
+# sont acceptées. Un reverse proxy sur la même machine qui n'ajoute pas X-Forwarded-For
+# (ou Forwarded) rendrait ces routes publiques : définir METRICS_TOKEN en production.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+_LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+_PROXY_HEADERS = ("x-forwarded-for", "x-real-ip", "forwarded")
 
+def _check_metrics_access(request: Request) -> None:
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Jeton d'accès aux métriques invalide",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    elif (request.client is None or request.client.host not in _LOOPBACK_HOSTS
+          or any(header in request.headers for header in _PROXY_HEADERS)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Métriques accessibles uniquement en local (définir METRICS_TOKEN)",
+        )
 
+@app.get("/health/details")
+async def health_details(request: Request):
+    """État de la file d'analyse (profondeur, attente, rejets), des écritures groupées et du hachage"""
+    _check_metrics_access(request)
+    from .auth import password_admission
+    health = {
+        "status": "ok",
+        "admission": analysis_admission.snapshot(),
+        "writes": analysis_writer.snapshot(),
+        "password_hashing": password_admission.snapshot(),
+    }
+    if database.sqlite_writer is not None:
+        health["sqlite_writer"] = database.sqlite_writer.snapshot()
+    return health
 
-
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """Métriques du worker au format texte Prometheus (durées par étape, file d'analyse)"""
+    _check_metrics_access(request)
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
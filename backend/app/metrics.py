@@ -0,0 +1,141 @@
+"""
+Instrumentation du pipeline d'analyse : chronométrage par étape et export Prometheus.
+
+Chaque CVAnalyzer possède un StageTimer qui mesure le temps réel (wall) et le temps
+CPU du thread pour chaque étape (`with self.timer.span("identity"): ...`). Les mesures
+sont aussi agrégées dans des histogrammes globaux, exposés par `GET /metrics` au
+format texte Prometheus. Les métriques sont propres à chaque worker (processus).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from .admission import analysis_admission
+
+# Bornes des histogrammes (secondes) : de 1 ms à 60 s
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Histogramme cumulatif thread-safe, avec une série par valeur d'étiquette"""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # valeur d'étiquette -> [compteurs par bucket, somme, nombre]
+        self._series: Dict[str, list] = {}
+
+    def observe(self, label_value: str, value: float) -> None:
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self._series[label_value] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, (counts, total, count) in sorted(self._series.items()):
+                label = f'{self.label}="{label_value}"'
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{label}}} {total:.6f}")
+                lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+
+stage_wall_seconds = Histogram(
+    "cv_analysis_stage_wall_seconds",
+    "Temps réel passé dans chaque étape de l'analyse de CV",
+    "stage"
+)
+stage_cpu_seconds = Histogram(
+    "cv_analysis_stage_cpu_seconds",
+    "Temps CPU (thread) passé dans chaque étape de l'analyse de CV",
+    "stage"
+)
+
+
+class StageTimer:
+    """Chronomètre les étapes d'une analyse (temps réel et CPU du thread courant)"""
+
+    def __init__(self):
+        # étape -> [temps réel, temps CPU] cumulés pour cette analyse
+        self.stages: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def span(self, stage: str):
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - wall_start, time.thread_time() - cpu_start)
+
+    def record(self, stage: str, wall: float, cpu: float = 0.0) -> None:
+        totals = self.stages.setdefault(stage, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+        stage_wall_seconds.observe(stage, wall)
+        stage_cpu_seconds.observe(stage, cpu)
+
+    def server_timing(self, extra: Optional[Dict[str, float]] = None) -> str:
+        """Formate les durées pour l'en-tête HTTP Server-Timing (en millisecondes)"""
+        durations = dict(extra or {})
+        durations.update((stage, wall) for stage, (wall, cpu) in self.stages.items())
+        return ", ".join(f"{stage};dur={wall * 1000:.1f}" for stage, wall in durations.items())
+
+
+def render_prometheus() -> str:
+    """Retourne toutes les métriques du worker au format texte Prometheus"""
+    lines: List[str] = []
+    lines.extend(stage_wall_seconds.render())
+    lines.extend(stage_cpu_seconds.render())
+
+    admission = analysis_admission.snapshot()
+    gauges = [
+        ("cv_admission_active", "Analyses en cours d'exécution", admission["active"]),
+        ("cv_admission_queue_depth", "Analyses en attente d'un slot", admission["queue_depth"]),
+        ("cv_admission_max_concurrent", "Nombre maximal d'analyses simultanées", admission["max_concurrent"]),
+    ]
+    for name, help_text, value in gauges:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"])
+
+    counters = [
+        ("cv_admission_admitted_total", "Analyses admises", analysis_admission.admitted_total),
+        ("cv_admission_rejected_total", "Analyses rejetées (file pleine)", analysis_admission.rejected_total),
+        ("cv_admission_timeout_total", "Analyses rejetées après une attente trop longue", analysis_admission.timeout_total),
+    ]
+    # Écritures groupées et cache d'authentification (import tardif : metrics est importé par
+    # cv_analyzer, sans base)
+    from .write_behind import analysis_writer
+    counters.extend([
+        ("cv_write_batches_total", "Transactions d'écriture groupée des analyses", analysis_writer.batches_total),
+        ("cv_write_rows_total", "Analyses enregistrées par écriture groupée", analysis_writer.rows_total),
+        ("cv_write_fallback_total", "Lots réécrits ligne par ligne après un échec", analysis_writer.fallback_total),
+    ])
+    from .auth import user_cache
+    counters.extend([
+        ("cv_auth_user_cache_hits_total", "Utilisateurs authentifiés servis par le cache", user_cache.hits),
+        ("cv_auth_user_cache_misses_total", "Utilisateurs authentifiés lus en base", user_cache.misses),
+    ])
+    for name, help_text, value in counters:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"])
+
+    lines.extend([
+        "# HELP cv_admission_wait_seconds Temps d'attente avant l'obtention d'un slot d'analyse",
+        "# TYPE cv_admission_wait_seconds summary",
+        f"cv_admission_wait_seconds_sum {analysis_admission.wait_time_total:.6f}",
+        f"cv_admission_wait_seconds_count {analysis_admission.admitted_total}",
+    ])
+    return "\n".join(lines) + "\n"
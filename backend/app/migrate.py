@@ -0,0 +1,88 @@
+"""
+Migrations du schéma (Alembic, répertoire migrations/).
+
+Les migrations sont appliquées une seule fois avant le démarrage des workers : par le
+hook `on_starting` de gunicorn (gunicorn.conf.py), ou par `alembic upgrade head` en
+développement. Les workers ne créent ni n'inspectent le schéma.
+
+Les révisions initiales sont idempotentes : une base créée par l'ancien `create_all` et
+les scripts migrate_add_*.py (sans table alembic_version) est complétée puis versionnée.
+
+Les remplissages de colonnes (backfill) se font par lots, une transaction par lot
+(`backfill_in_batches`) : la table n'est verrouillée que le temps d'un lot.
+"""
+import logging
+import os
+from typing import Callable, Dict, Mapping, Optional
+
+import sqlalchemy as sa
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "1000"))
+
+
+def alembic_config():
+    """Configuration Alembic du projet (backend/alembic.ini), indépendante du répertoire courant"""
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+
+def upgrade_database(revision: str = "head") -> None:
+    """Applique les migrations jusqu'à `revision` (une fois, avant le démarrage des workers)"""
+    from alembic import command
+
+    logger.info("Migration du schéma vers %s", revision)
+    command.upgrade(alembic_config(), revision)
+
+
+# Inspection du schéma, pour les révisions qui complètent une base créée avant Alembic
+
+def has_table(bind, table: str) -> bool:
+    return sa.inspect(bind).has_table(table)
+
+
+def has_column(bind, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in sa.inspect(bind).get_columns(table))
+
+
+def backfill_in_batches(bind, table: sa.Table, compute: Callable[[sa.engine.Connection, Mapping], Optional[Dict]],
+                        where=None, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Met à jour les lignes de `table` par lots de `batch_size`, dans l'ordre de la clé primaire.
+
+    `compute(connection, row)` retourne les valeurs à écrire pour une ligne (None : ligne
+    inchangée) ; il peut écrire dans d'autres tables avec `connection`, dans la transaction du lot.
+    Chaque lot est lu puis écrit dans sa propre transaction, sur une connexion séparée :
+    à appeler hors de la transaction de la migration (`op.get_context().autocommit_block()`).
+    Retourne le nombre de lignes mises à jour.
+    """
+    key = table.primary_key.columns.values()[0]
+    last_key = None
+    updated = 0
+    while True:
+        with bind.engine.begin() as connection:
+            query = sa.select(table).order_by(key).limit(batch_size)
+            if where is not None:
+                query = query.where(where)
+            if last_key is not None:
+                query = query.where(key > last_key)
+            rows = connection.execute(query).mappings().all()
+            if not rows:
+                return updated
+            values = []
+            for row in rows:
+                changes = compute(connection, row)
+                if changes:
+                    values.append({**changes, "_key": row[key.name]})
+            if values:
+                # Clause SET déduite des paramètres (executemany)
+                connection.execute(sa.update(table).where(key == sa.bindparam("_key")), values)
+                updated += len(values)
+            last_key = rows[-1][key.name]
+        logger.info("Backfill de %s : %d lignes mises à jour", table.name, updated)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -19,16 +19,45 @@ class Analysis(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     cv_filename = Column(String, nullable=False)
-    job_description = Column(Text, nullable=False)
+    # Description du poste partagée (une ligne job_postings par texte distinct)
+    job_posting_id = Column(Integer, ForeignKey("job_postings.id"), nullable=True)
     score = Column(Float, nullable=True)
     missing_skills = Column(Text, nullable=True)  # JSON string
     relevant_experience = Column(Text, nullable=True)  # JSON string
     irrelevant_experience = Column(Text, nullable=True)  # JSON string
     recommendations = Column(Text, nullable=True)  # JSON string
     languages = Column(Text, nullable=True)  # JSON string
-    candidate_profile = Column(Text, nullable=True)  # JSON string (profil structuré complet)
+    # Analyse en deux niveaux : "partial" (identité, compétences, score provisoire), puis
+    # "complete" ; "failed" si le second niveau n'a pas pu être calculé
+    completeness = Column(String, nullable=False, default="complete", server_default="complete")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     owner = relationship("User", back_populates="analyses")
 
+    # Liste des analyses d'un utilisateur (par date ou par score) lue dans l'ordre de l'index,
+    # sans parcours de la table ni tri ; voir benchmarks/query_plans.py
+    __table_args__ = (
+        Index("ix_analyses_user_id_created_at", "user_id", "created_at"),
+        Index("ix_analyses_user_id_score", "user_id", "score"),
+    )
 
+
+# Description de poste, stockée une seule fois par contenu (SHA-256 du texte)
+class JobPosting(Base):
+    __tablename__ = "job_postings"
+
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False, unique=True)
+    description = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Profil candidat d'une analyse (JSON compressé, voir analysis_store.py), hors de la ligne
+# analyses : lu seulement par GET /analysis/{id}
+class AnalysisProfile(Base):
+    __tablename__ = "analysis_profiles"
+
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="CASCADE"), primary_key=True,
+                         autoincrement=False)
+    encoding = Column(String, nullable=False, default="zlib", server_default="zlib")
+    data = Column(LargeBinary, nullable=False)
@@ -0,0 +1,366 @@
+"""
+Extraction du texte des PDF avec un moteur configurable.
+
+- PDF_BACKEND : pypdf2 (défaut, pur Python), pypdfium2 (PDFium, beaucoup plus rapide)
+  ou pdfminer (pdfminer.six, analyse de mise en page). Les trois sont dans requirements.txt ;
+  un moteur absent de l'environnement retombe sur PyPDF2 avec un avertissement.
+- Les documents longs (>= PDF_PARALLEL_MIN_PAGES pages) sont découpés en plages de pages
+  extraites en parallèle dans le pool de processus partagé (workers.py ; PDF_PARALLEL_WORKERS
+  plages par document, 0 pour désactiver) : l'extraction est du calcul pur Python qui ne
+  libère pas le GIL.
+- Budgets : PDF_MAX_PAGES, PDF_MAX_CHARS (total du document, réparti entre les plages en
+  parallèle) et PDF_MAX_SECONDS. Au-delà, l'extraction s'arrête et le texte déjà extrait
+  est conservé ; un `asyncio.wait_for` côté route n'arrête pas le thread, ces budgets si.
+  PDF_EARLY_EXIT_CHARS arrête l'extraction dès qu'il y a assez de texte.
+  Le délai est vérifié entre deux pages : une page pathologique peut le dépasser. En
+  parallèle, le résultat de chaque plage n'est attendu que jusqu'au délai (plus
+  PDF_RESULT_GRACE_SECONDS) et les plages suivantes sont abandonnées ; le worker bloqué
+  termine sa page en arrière-plan. En séquentiel, seul le contrôle entre pages s'applique.
+  Le nombre de pages est lu à la racine de l'arbre des pages (/Count), sans le parcourir.
+- PDF_TEXT_MODE : compact (défaut, espaces fusionnés puis sauts de ligne reconstitués)
+  ou layout (vraies lignes conservées, blocs séparés par une ligne vide). Les blocs et
+  leurs coordonnées sont disponibles via `extract_pdf_blocks`.
+"""
+import logging
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple, Union
+
+import PyPDF2
+
+from .workers import get_process_pool, shutdown_process_pool
+
+logger = logging.getLogger(__name__)
+
+PDF_BACKENDS = ("pypdf2", "pypdfium2", "pdfminer")
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Budgets d'extraction (0 = illimité)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+PDF_MAX_SECONDS = float(os.getenv("PDF_MAX_SECONDS", "25"))
+# Attente supplémentaire du résultat d'une plage en parallèle, après le délai
+PDF_RESULT_GRACE_SECONDS = float(os.getenv("PDF_RESULT_GRACE_SECONDS", "1"))
+# Arrêt anticipé : assez de texte pour l'analyse (0 = désactivé)
+PDF_EARLY_EXIT_CHARS = int(os.getenv("PDF_EARLY_EXIT_CHARS", "0"))
+
+PDF_TEXT_MODES = ("compact", "layout")
+PDF_TEXT_MODE = os.getenv("PDF_TEXT_MODE", "compact").lower()
+if PDF_TEXT_MODE not in PDF_TEXT_MODES:
+    logger.warning("PDF_TEXT_MODE inconnu (%s), utilisation de compact", PDF_TEXT_MODE)
+    PDF_TEXT_MODE = "compact"
+
+# Nettoyage du texte de chaque page (compilé une seule fois)
+_MULTIPLE_SPACES = re.compile(r'\s+')
+_LINE_SPACES = re.compile(r'[ \t\xa0]+')
+_SENTENCE_BREAK = re.compile(r'([.!?])\s+([A-Z])')
+_DATE_BREAK = re.compile(r'(\d{4})\s+([A-Z])')
+
+
+
+class ExtractionBudgetExceeded(Exception):
+    """Levée quand le budget de temps est épuisé avant qu'aucun texte n'ait été extrait"""
+
+
+# PDFium n'est pas thread-safe : un seul appel à la fois par processus
+_pdfium_lock = threading.Lock()
+
+
+def clean_page_text(page_text: str) -> str:
+    """Normalise les espaces et restaure les sauts de ligne (phrases, dates)"""
+    # Remplacer les espaces multiples par un seul espace
+    page_text = _MULTIPLE_SPACES.sub(' ', page_text)
+    # Restaurer les sauts de ligne pour les listes
+    page_text = _SENTENCE_BREAK.sub(r'\1\n\2', page_text)
+    # Restaurer les sauts de ligne pour les dates
+    return _DATE_BREAK.sub(r'\1\n\2', page_text)
+
+
+@dataclass
+class TextBlock:
+    """Bloc de texte d'une page : lignes consécutives et boîte englobante (points, origine en bas à gauche)"""
+    page: int
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    lines: List[str] = field(default_factory=list)
+
+
+def _group_blocks(page: int, fragments, join_with_space: bool) -> List[TextBlock]:
+    """
+    Regroupe des fragments (x0, y0, x1, y1, texte), dans l'ordre du flux de la page, en lignes
+    puis en blocs : nouvelle ligne quand la hauteur change, nouveau bloc après un grand écart
+    vertical ou une remontée (colonne suivante).
+    """
+    blocks: List[TextBlock] = []
+    line_parts: List[str] = []
+    line_box = None
+    block = None
+
+    def flush_line():
+        if block is not None and line_parts:
+            line = _LINE_SPACES.sub(' ', "".join(line_parts)).strip()
+            if line:
+                block.lines.append(line)
+
+    for x0, y0, x1, y1, text in fragments:
+        text = text.replace("\r", "").replace("\n", " ")
+        if not text.strip():
+            continue
+        height = max(y1 - y0, 1.0)
+        same_line = line_box is not None and abs(y0 - line_box[1]) <= height * 0.5
+        if same_line:
+            if join_with_space and x0 - line_box[2] > height * 0.15:
+                line_parts.append(" ")
+            line_parts.append(text)
+            line_box = (line_box[0], line_box[1], max(line_box[2], x1), line_box[3])
+        else:
+            flush_line()
+            gap = line_box[1] - y1 if line_box is not None else 0.0
+            if block is None or gap > height or y0 > line_box[3]:
+                block = TextBlock(page, x0, y0, x1, y1)
+                blocks.append(block)
+            line_parts = [text]
+            line_box = (x0, y0, x1, y1)
+        block.x0, block.y0 = min(block.x0, x0), min(block.y0, y0)
+        block.x1, block.y1 = max(block.x1, x1), max(block.y1, y1)
+    flush_line()
+    return [b for b in blocks if b.lines]
+
+
+def _pypdf2_page_blocks(page, page_number: int) -> List[TextBlock]:
+    """Blocs d'une page PyPDF2 (positions issues des matrices de texte ; largeurs inconnues)"""
+    fragments = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        fragments.append((x, y, x, y + (font_size or 10.0), text))
+
+    page.extract_text(visitor_text=visitor)
+    return _group_blocks(page_number, fragments, join_with_space=False)
+
+
+def _pdfium_page_blocks(textpage, page_number: int) -> List[TextBlock]:
+    """Blocs d'une page PDFium (lignes délimitées par les sauts générés par PDFium, boîtes des caractères)"""
+    import pypdfium2.raw as pdfium_c
+    count = textpage.count_chars()
+    codes = [pdfium_c.FPDFText_GetUnicode(textpage.raw, index) for index in range(count)]
+    fragments = []
+    line_start = 0
+    for index in range(count + 1):
+        if index < count and codes[index] != 10:
+            continue
+        if index > line_start:
+            boxes = [textpage.get_charbox(i) for i in range(line_start, index) if codes[i] not in (13, 32)]
+            boxes = [box for box in boxes if box[2] > box[0]]
+            if boxes:
+                fragments.append((
+                    min(box[0] for box in boxes), min(box[1] for box in boxes),
+                    max(box[2] for box in boxes), max(box[3] for box in boxes),
+                    textpage.get_text_range(line_start, index - line_start),
+                ))
+        line_start = index + 1
+    return _group_blocks(page_number, fragments, join_with_space=True)
+
+
+def _pdfminer_page_blocks(layout, page_number: int) -> List[TextBlock]:
+    """Blocs d'une page pdfminer (boîtes de texte de l'analyse de mise en page)"""
+    from pdfminer.layout import LTTextContainer
+    blocks = []
+    for element in layout:
+        if isinstance(element, LTTextContainer):
+            lines = [_LINE_SPACES.sub(' ', line).strip() for line in element.get_text().splitlines()]
+            lines = [line for line in lines if line]
+            if lines:
+                blocks.append(TextBlock(page_number, *element.bbox, lines=lines))
+    return blocks
+
+
+def blocks_to_text(blocks: List[TextBlock]) -> str:
+    """Texte d'une page en mode layout : une ligne par ligne, une ligne vide entre les blocs"""
+    return "\n\n".join("\n".join(block.lines) for block in blocks)
+
+
+def _resolve_backend(name: str) -> str:
+    """Retourne le moteur demandé s'il est disponible, sinon pypdf2"""
+    name = (name or "pypdf2").lower()
+    if name not in PDF_BACKENDS:
+        logger.warning("PDF_BACKEND inconnu (%s), utilisation de pypdf2", name)
+        return "pypdf2"
+    try:
+        if name == "pypdfium2":
+            import pypdfium2  # noqa: F401
+        elif name == "pdfminer":
+            import pdfminer.high_level  # noqa: F401
+    except ImportError:
+        logger.warning("Moteur PDF %s non installé, utilisation de pypdf2", name)
+        return "pypdf2"
+    return name
+
+
+PDF_BACKEND = _resolve_backend(os.getenv("PDF_BACKEND", "pypdf2"))
+
+
+def _page_count(file_path: str, backend: str) -> int:
+    """Nombre de pages annoncé par le document (pas de parcours de l'arbre des pages)"""
+    if backend == "pypdfium2":
+        import pypdfium2 as pdfium
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+    reader = PyPDF2.PdfReader(file_path)
+    try:
+        count = int(reader.trailer["/Root"]["/Pages"]["/Count"])
+    except (KeyError, TypeError, ValueError):
+        count = -1
+    # /Count absent ou invalide : parcours de l'arbre
+    return count if count >= 0 else len(reader.pages)
+
+
+def _extract_pages(file_path: str, backend: str, start: int, stop: int,
+                   layout: bool = False) -> Iterator[Union[str, List[TextBlock]]]:
+    """Extrait les pages [start, stop[ une par une : texte brut, ou blocs si `layout`"""
+    if backend == "pypdfium2":
+        import pypdfium2 as pdfium
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                for index in range(start, stop):
+                    page = pdf[index]
+                    textpage = page.get_textpage()
+                    page_content = _pdfium_page_blocks(textpage, index) if layout else textpage.get_text_range()
+                    textpage.close()
+                    page.close()
+                    yield page_content
+            finally:
+                pdf.close()
+        return
+
+    if backend == "pdfminer":
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LAParams, LTTextContainer
+        for index, page_layout in zip(range(start, stop),
+                                      extract_pages(file_path, page_numbers=range(start, stop), laparams=LAParams())):
+            if layout:
+                yield _pdfminer_page_blocks(page_layout, index)
+            else:
+                yield "".join(element.get_text() for element in page_layout if isinstance(element, LTTextContainer))
+        return
+
+    reader = PyPDF2.PdfReader(file_path)
+    # /Count peut annoncer plus de pages que l'arbre n'en contient
+    for index in range(start, min(stop, len(reader.pages))):
+        page = reader.pages[index]
+        yield _pypdf2_page_blocks(page, index) if layout else page.extract_text()
+
+
+def _extract_clean_pages(file_path: str, backend: str, start: int, stop: int,
+                         deadline: Optional[float] = None, max_chars: int = 0,
+                         early_exit_chars: int = 0, text_mode: str = "compact") -> Tuple[List[str], Optional[str]]:
+    """
+    Pages [start, stop[ nettoyées (les pages sans texte sont omises), exécuté dans un worker.
+    Retourne (pages, raison de l'arrêt anticipé ou None) ; `deadline` est un horodatage time.time().
+    """
+    pages, chars = [], 0
+    layout = text_mode == "layout"
+    with closing(_extract_pages(file_path, backend, start, stop, layout)) as raw_pages:
+        for page in raw_pages:
+            if page:
+                page = blocks_to_text(page) if layout else clean_page_text(page)
+                pages.append(page)
+                chars += len(page)
+            if max_chars and chars >= max_chars:
+                return pages, "max_chars"
+            if early_exit_chars and chars >= early_exit_chars:
+                return pages, "early_exit"
+            if deadline is not None and time.time() >= deadline:
+                return pages, "max_seconds"
+    return pages, None
+
+
+def extract_pdf_text(file_path: str, backend: Optional[str] = None) -> str:
+    """Extrait et nettoie le texte d'un PDF dans les limites des budgets ; pages séparées par une ligne vide"""
+    backend = _resolve_backend(backend) if backend else PDF_BACKEND
+    deadline = time.time() + PDF_MAX_SECONDS if PDF_MAX_SECONDS > 0 else None
+    total_pages = _page_count(file_path, backend)
+    if deadline is not None and time.time() >= deadline:
+        raise ExtractionBudgetExceeded("Délai d'extraction du PDF dépassé")
+    page_count = min(total_pages, PDF_MAX_PAGES) if PDF_MAX_PAGES > 0 else total_pages
+    stops = ["max_pages"] if page_count < total_pages else []
+
+    # L'arrêt anticipé n'a de sens que si les pages sont lues dans l'ordre
+    if PDF_PARALLEL_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES and not PDF_EARLY_EXIT_CHARS:
+        chunk = math.ceil(page_count / PDF_PARALLEL_WORKERS)
+        starts = range(0, page_count, chunk)
+        # Budget de caractères du document réparti entre les plages
+        chunk_chars = math.ceil(PDF_MAX_CHARS / len(starts)) if PDF_MAX_CHARS > 0 else 0
+        try:
+            pool = get_process_pool()
+            futures = [
+                pool.submit(_extract_clean_pages, file_path, backend, start, min(start + chunk, page_count),
+                            deadline, chunk_chars, 0, PDF_TEXT_MODE)
+                for start in starts
+            ]
+            pages = []
+            for index, future in enumerate(futures):
+                timeout = None
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.time()) + PDF_RESULT_GRACE_SECONDS
+                try:
+                    chunk_pages, reason = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    # Page trop longue dans cette plage : garder le texte des plages précédentes
+                    for pending in futures[index:]:
+                        pending.cancel()
+                    stops.append("max_seconds")
+                    break
+                pages.extend(chunk_pages)
+                if reason:
+                    stops.append(reason)
+        except BrokenProcessPool:
+            # Un worker a été tué (mémoire, signal) : recréer le pool au prochain appel
+            logger.warning("Pool d'extraction PDF interrompu, extraction séquentielle de %s", file_path)
+            shutdown_process_pool()
+            pages, reason = _extract_clean_pages(file_path, backend, 0, page_count,
+                                                 deadline, PDF_MAX_CHARS, PDF_EARLY_EXIT_CHARS, PDF_TEXT_MODE)
+            stops.append(reason)
+    else:
+        pages, reason = _extract_clean_pages(file_path, backend, 0, page_count,
+                                             deadline, PDF_MAX_CHARS, PDF_EARLY_EXIT_CHARS, PDF_TEXT_MODE)
+        stops.append(reason)
+
+    stops = sorted({reason for reason in stops if reason})
+    if "max_seconds" in stops and not pages:
+        raise ExtractionBudgetExceeded("Délai d'extraction du PDF dépassé")
+    if stops and stops != ["early_exit"]:
+        logger.warning("Extraction PDF tronquée (%s) : %d pages avec texte sur %d, %s",
+                       ", ".join(stops), len(pages), total_pages, os.path.basename(file_path))
+
+    text = "\n\n".join(pages).strip()
+    if PDF_MAX_CHARS > 0 and len(text) > PDF_MAX_CHARS:
+        # Séparateurs entre les pages : le total peut dépasser légèrement la somme des budgets
+        text = text[:PDF_MAX_CHARS]
+    return text
+
+
+def extract_pdf_blocks(file_path: str, backend: Optional[str] = None) -> List[TextBlock]:
+    """Blocs de texte (lignes et coordonnées) de toutes les pages, dans la limite de PDF_MAX_PAGES"""
+    backend = _resolve_backend(backend) if backend else PDF_BACKEND
+    page_count = _page_count(file_path, backend)
+    if PDF_MAX_PAGES > 0:
+        page_count = min(page_count, PDF_MAX_PAGES)
+    with closing(_extract_pages(file_path, backend, 0, page_count, layout=True)) as pages:
+        return [block for page_blocks in pages for block in page_blocks]
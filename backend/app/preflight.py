@@ -0,0 +1,109 @@
+"""
+Contrôles préalables des fichiers uploadés, avant toute mise en file d'analyse.
+
+Le format est déterminé par les octets magiques du contenu, pas par l'extension :
+un fichier mal nommé est analysé avec le bon extracteur, un fichier illisible est
+rejeté (400) sans consommer de slot d'analyse. Les contrôles ne lisent que le début
+et la fin du fichier, plus quelques zones ciblées (répertoire central du zip, table
+des références du PDF) : quelques microsecondes par fichier.
+
+- PDF : en-tête, marqueur %%EOF, startxref cohérent, document chiffré (/Encrypt)
+- DOCX : répertoire central du zip, parties Word présentes, entrées chiffrées, taille décompressée
+- DOC : conteneur OLE2, FIB, chiffrement et table des pièces (voir doc_extraction)
+"""
+import re
+import struct
+from typing import Optional
+
+from .doc_extraction import OLE_SIGNATURE, DocFormatError, check_doc
+
+# Le marqueur %PDF- peut être précédé de quelques octets parasites (tolérés par les lecteurs)
+PDF_HEADER_WINDOW = 1024
+# Zones lues autour de la fin du PDF et de la table des références
+PDF_TRAILER_WINDOW = 4096
+# Taille décompressée maximale d'un DOCX (protection contre les bombes zip)
+DOCX_MAX_UNCOMPRESSED = 200 * 1024 * 1024
+
+UNKNOWN_FORMAT_MESSAGE = "Le contenu du fichier ne correspond pas à un PDF, DOCX ou DOC."
+
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_ZIP_EOCD = b"PK\x05\x06"
+_ZIP_CENTRAL_HEADER = b"PK\x01\x02"
+
+
+class PreflightError(Exception):
+    """Fichier rejeté avant l'analyse (message destiné à l'utilisateur)"""
+
+
+def sniff_format(content: bytes) -> Optional[str]:
+    """Retourne l'extension correspondant au contenu (.pdf, .docx, .doc) ou None"""
+    if b"%PDF-" in content[:PDF_HEADER_WINDOW]:
+        return ".pdf"
+    if content[:4] == b"PK\x03\x04":
+        return ".docx"
+    if content[:8] == OLE_SIGNATURE:
+        return ".doc"
+    return None
+
+
+def _check_pdf(content: bytes) -> None:
+    tail = content[-PDF_TRAILER_WINDOW:]
+    if b"%%EOF" not in tail:
+        raise PreflightError("Le PDF est incomplet ou corrompu (fin de fichier absente).")
+    offsets = _STARTXREF.findall(tail)
+    if not offsets or int(offsets[-1]) >= len(content):
+        raise PreflightError("Le PDF est corrompu (table des références invalide).")
+
+    # Dictionnaire du trailer : en fin de fichier, dans le flux de références (PDF 1.5+)
+    # ou en début de fichier pour les PDF linéarisés
+    xref = int(offsets[-1])
+    for window in (tail, content[xref:xref + PDF_TRAILER_WINDOW], content[:PDF_TRAILER_WINDOW]):
+        if b"/Encrypt" in window:
+            raise PreflightError("Le PDF est protégé (chiffré). Veuillez envoyer une version non protégée.")
+
+
+def _check_docx(content: bytes) -> None:
+    eocd = content.rfind(_ZIP_EOCD, max(0, len(content) - 22 - 0xFFFF))
+    if eocd < 0 or len(content) - eocd < 22:
+        raise PreflightError("Le fichier DOCX est incomplet ou corrompu.")
+    entry_count, directory_size, directory_offset = struct.unpack_from("<HII", content, eocd + 10)
+    if directory_offset == 0xFFFFFFFF:
+        return  # Zip64 : laissé à l'extracteur
+    if directory_offset + directory_size > eocd:
+        raise PreflightError("Le fichier DOCX est incomplet ou corrompu.")
+
+    names, uncompressed_total, position = set(), 0, directory_offset
+    for _ in range(entry_count):
+        if content[position:position + 4] != _ZIP_CENTRAL_HEADER:
+            raise PreflightError("Le fichier DOCX est corrompu (répertoire de l'archive invalide).")
+        flags, = struct.unpack_from("<H", content, position + 8)
+        uncompressed, name_length, extra_length, comment_length = struct.unpack_from("<IHHH", content, position + 24)
+        if flags & 0x1:
+            raise PreflightError("Le document est protégé par un mot de passe.")
+        names.add(content[position + 46:position + 46 + name_length].decode("utf-8", errors="replace"))
+        uncompressed_total += uncompressed
+        position += 46 + name_length + extra_length + comment_length
+
+    if "[Content_Types].xml" not in names or not any(name.startswith("word/") for name in names):
+        raise PreflightError("Ce fichier n'est pas un document Word (DOCX).")
+    if uncompressed_total > DOCX_MAX_UNCOMPRESSED:
+        raise PreflightError("Le fichier DOCX est trop volumineux une fois décompressé.")
+
+
+def preflight(content: bytes) -> str:
+    """Valide le contenu d'un fichier uploadé et retourne son extension réelle ; lève PreflightError"""
+    file_format = sniff_format(content)
+    if file_format is None:
+        raise PreflightError(UNKNOWN_FORMAT_MESSAGE)
+    try:
+        if file_format == ".pdf":
+            _check_pdf(content)
+        elif file_format == ".docx":
+            _check_docx(content)
+        else:
+            check_doc(content)
+    except DocFormatError as e:
+        raise PreflightError(str(e))
+    except struct.error:
+        raise PreflightError("Le fichier est corrompu.")
+    return file_format
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal
 import ast
-from .. import database, models, schemas, auth
+import logging
+from .. import analysis_store, database, models, schemas, auth
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
+logger = logging.getLogger(__name__)
+
 def parse_json_string(json_str: str):
     """Parse une chaîne JSON ou liste Python en liste Python"""
     if not json_str:
@@ -22,45 +26,63 @@ def parse_json_string(json_str: str):
         except:
             return []
 
+# Colonnes de la liste : pas de chargement des textes (description du poste, profil JSON)
+LIST_COLUMNS = (
+    models.Analysis.id,
+    models.Analysis.cv_filename,
+    models.Analysis.score,
+    models.Analysis.completeness,
+    models.Analysis.created_at,
+)
+
+# Tri de la liste -> colonne de l'index (user_id, <colonne>) ; l'id départage les égalités
+# sans tri supplémentaire (dernière colonne implicite de l'index). ListSort (valeurs acceptées
+# par GET /analysis/?sort=) doit avoir les mêmes clés que LIST_SORTS.
+ListSort = Literal["date", "score"]
+LIST_SORTS = {
+    "date": models.Analysis.created_at,
+    "score": models.Analysis.score,
+}
+
+def list_analyses_query(user_id: int, sort: ListSort = "date"):
+    """Requête de la liste des analyses d'un utilisateur, la plus récente (ou le meilleur score) en premier"""
+    return (
+        select(*LIST_COLUMNS)
+        .where(models.Analysis.user_id == user_id)
+        .order_by(LIST_SORTS[sort].desc(), models.Analysis.id.desc())
+    )
+
 @router.get("/", response_model=List[schemas.AnalysisListItem])
 async def list_analyses(
+    sort: ListSort = "date",
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
-    """Récupère toutes les analyses de l'utilisateur connecté"""
-    analyses = db.query(models.Analysis).filter(
-        models.Analysis.user_id == current_user.id
-    ).order_by(models.Analysis.created_at.desc()).all()
-    
-    return [
-        {
-            "id": analysis.id,
-            "cv_filename": analysis.cv_filename,
-            "score": analysis.score,
-            "created_at": analysis.created_at
-        }
-        for analysis in analyses
-    ]
+    """Récupère toutes les analyses de l'utilisateur connecté (sort=date ou sort=score)"""
+    result = await db.execute(list_analyses_query(current_user.id, sort))
+    return [dict(row) for row in result.mappings()]
 
 @router.get("/{analysis_id}", response_model=schemas.AnalysisResponse)
 async def get_analysis(
     analysis_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
-    # Récupérer l'analyse
-    analysis = db.query(models.Analysis).filter(
-        models.Analysis.id == analysis_id
-    ).first()
+    # Récupérer l'analyse (la ligne complète n'est chargée que pour son propriétaire)
+    result = await db.execute(
+        select(models.Analysis)
+        .where(models.Analysis.id == analysis_id, models.Analysis.user_id == current_user.id)
+    )
+    analysis = result.scalars().first()
     
     if not analysis:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analyse non trouvée"
-        )
-    
-    # Vérifier que l'utilisateur est le propriétaire
-    if analysis.user_id != current_user.id:
+        # Distinguer une analyse inexistante d'une analyse d'un autre utilisateur
+        owner_id = await db.scalar(select(models.Analysis.user_id).where(models.Analysis.id == analysis_id))
+        if owner_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Analyse non trouvée"
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Vous n'avez pas accès à cette analyse"
@@ -69,39 +91,43 @@ async def get_analysis(
     # Convertir les chaînes JSON en listes
     import json
     candidate_profile = None
-    if hasattr(analysis, 'candidate_profile') and analysis.candidate_profile:
+    job_description = None
+    try:
+        # Profil (compressé) et description du poste stockés hors de la ligne analyses
+        candidate_profile = await analysis_store.load_profile(db, analysis.id)
+        if candidate_profile and analysis.completeness != "partial":
+            job_description = await analysis_store.load_job_description(db, analysis.job_posting_id)
+    except Exception as e:
+        logger.exception("Erreur lors du chargement du candidate_profile: %s", e)
+    if candidate_profile:
         try:
-            candidate_profile = json.loads(analysis.candidate_profile)
-            
             # FORCER le recalcul du score_correspondance avec la nouvelle logique IA
             # Ceci garantit que même les anciennes analyses utilisent la nouvelle logique
-            if candidate_profile and analysis.job_description:
+            # (pas pendant le second niveau de l'analyse : la sauvegarde écraserait le profil complet)
+            if job_description:
                 from .. import cv_analyzer
                 analyzer = cv_analyzer.CVAnalyzer()
                 
-                print(f"[DEBUG] Recalcul du score pour l'analyse {analysis_id}")
-                print(f"[DEBUG] Description du poste: {analysis.job_description[:100]}...")
+                logger.debug("Recalcul du score pour l'analyse %s", analysis_id)
                 
                 # Recalculer le score avec la description du poste (NOUVELLE LOGIQUE IA)
-                new_score = analyzer._calculate_match_score(candidate_profile, analysis.job_description)
+                new_score = analyzer._calculate_match_score(candidate_profile, job_description)
                 
-                print(f"[DEBUG] Nouveau score calculé: {new_score} (ancien: {candidate_profile.get('score_correspondance', 'N/A')})")
+                logger.debug("Nouveau score calculé: %s (ancien: %s)",
+                             new_score, candidate_profile.get('score_correspondance', 'N/A'))
                 
                 # Mettre à jour le score dans le profil (TOUJOURS, même si déjà présent)
                 candidate_profile["score_correspondance"] = new_score
                 
                 # Sauvegarder le nouveau score dans la base de données pour éviter de recalculer à chaque fois
                 try:
-                    analysis.candidate_profile = json.dumps(candidate_profile, ensure_ascii=False)
-                    db.commit()
-                    print(f"[DEBUG] Score sauvegardé dans la base de données")
+                    profile_json = json.dumps(candidate_profile, ensure_ascii=False)
+                    await database.run_write(
+                        lambda session: analysis_store.save_profile(session, analysis_id, profile_json))
                 except Exception as save_error:
-                    print(f"[WARNING] Erreur lors de la sauvegarde du score: {save_error}")
-                    db.rollback()
+                    logger.warning("Erreur lors de la sauvegarde du score: %s", save_error)
         except Exception as e:
-            import traceback
-            print(f"[ERROR] Erreur lors du parsing/recalcul du candidate_profile: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.exception("Erreur lors du parsing/recalcul du candidate_profile: %s", e)
             candidate_profile = None
     
     return {
@@ -113,6 +139,7 @@ async def get_analysis(
         "recommendations": parse_json_string(analysis.recommendations),
         "languages": parse_json_string(analysis.languages) if hasattr(analysis, 'languages') else [],
         "candidate_profile": candidate_profile,
+        "completeness": analysis.completeness,
         "created_at": analysis.created_at
     }
 
@@ -1,18 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+import logging
 from .. import database, models, schemas, auth
+from ..admission import AdmissionRejected
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+logger = logging.getLogger(__name__)
+
+def _hashing_overloaded(rejected: AdmissionRejected) -> HTTPException:
+    """File de hachage des mots de passe pleine : réponse 429 avec l'en-tête Retry-After"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Trop de connexions simultanées, veuillez réessayer dans quelques instants.",
+        headers={"Retry-After": str(rejected.retry_after)}
+    )
+
 @router.post("/register", response_model=schemas.Token)
 async def register(
     user_data: schemas.UserRegister,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     try:
         # Vérifier si l'utilisateur existe déjà
-        db_user = auth.get_user_by_email(db, email=user_data.email)
+        db_user = await auth.get_user_by_email(db, email=user_data.email)
         if db_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -20,14 +32,12 @@ async def register(
             )
         
         # Créer le nouvel utilisateur
-        hashed_password = auth.get_password_hash(user_data.password)
+        hashed_password = await auth.hash_password(user_data.password, key=user_data.email)
         db_user = models.User(
             email=user_data.email,
             hashed_password=hashed_password
         )
-        db.add(db_user)
-        db.commit()  # Commit explicite pour l'opération d'écriture
-        db.refresh(db_user)
+        await database.run_write(lambda session: session.add(db_user))
         
         # Créer le token d'accès
         access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -39,9 +49,9 @@ async def register(
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except AdmissionRejected as rejected:
+        raise _hashing_overloaded(rejected)
     except Exception as e:
-        # Rollback en cas d'erreur
-        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de l'inscription: {str(e)}"
@@ -50,10 +60,10 @@ async def register(
 @router.post("/login", response_model=schemas.Token)
 async def login(
     user_data: schemas.UserLogin,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     try:
-        user = auth.authenticate_user(db, user_data.email, user_data.password)
+        user = await auth.authenticate_user(db, user_data.email, user_data.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,11 +78,11 @@ async def login(
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except AdmissionRejected as rejected:
+        raise _hashing_overloaded(rejected)
     except Exception as e:
         # Log l'erreur pour le débogage
-        import traceback
-        print(f"Erreur lors de la connexion: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Erreur lors de la connexion: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la connexion: {str(e)}"
@@ -1,25 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form, Response
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from datetime import datetime, timedelta, timezone
 import os
+import json
 import uuid
 import asyncio
+import contextvars
+import functools
+import logging
 from concurrent.futures import ThreadPoolExecutor
-from .. import database, models, schemas, auth, cv_analyzer
-from ..database import SessionLocal
+from .. import analysis_store, database, models, schemas, auth, cv_analyzer
+from ..admission import ANALYSIS_WORKERS, AdmissionRejected, analysis_admission
+from ..pdf_extraction import ExtractionBudgetExceeded
+from ..preflight import UNKNOWN_FORMAT_MESSAGE, PreflightError, preflight, sniff_format
+from ..write_behind import analysis_writer
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/cv", tags=["cv"])
 
+logger = logging.getLogger(__name__)
+
 # Créer le dossier uploads s'il n'existe pas
 # Utiliser un chemin absolu pour éviter les problèmes de chemin relatif
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# Semaphore pour limiter le nombre de requêtes simultanées (évite la surcharge)
-# Maximum 3 analyses simultanées (réduit pour éviter les blocages SQLite)
-MAX_CONCURRENT_ANALYSES = 3
-analysis_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+# Le nombre d'analyses simultanées est géré par analysis_admission (voir admission.py) :
+# concurrence alignée sur la taille de l'executor, file bornée et équitable par utilisateur
+
+# Ajouter l'en-tête Server-Timing (durée de chaque étape) aux réponses d'upload
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# Analyse en deux niveaux pour l'upload unitaire : le premier niveau (identité, compétences,
+# score provisoire) est enregistré et renvoyé tout de suite, le second (expériences, formation,
+# recommandations, score définitif) est calculé en tâche de fond et complète la même ligne
+TIERED_ANALYSIS = os.getenv("TIERED_ANALYSIS", "true").lower() == "true"
+
+# Le second niveau s'exécute dans le worker qui a reçu l'upload, avec le texte du CV gardé en
+# mémoire : si ce worker redémarre ou s'arrête avant la fin, la ligne resterait "partial".
+# Chaque worker marque "failed" les analyses partielles plus anciennes que
+# PARTIAL_ANALYSIS_DEADLINE secondes, au démarrage puis toutes les PARTIAL_SWEEP_INTERVAL secondes.
+PARTIAL_ANALYSIS_DEADLINE = float(os.getenv("PARTIAL_ANALYSIS_DEADLINE", "600"))
+PARTIAL_SWEEP_INTERVAL = float(os.getenv("PARTIAL_SWEEP_INTERVAL", "60"))
 
 # Executor partagé pour toutes les analyses
 _shared_executor = None
@@ -28,15 +52,120 @@ def get_executor():
     """Retourne l'executor partagé, le créant si nécessaire"""
     global _shared_executor
     if _shared_executor is None:
-        _shared_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cv_analyzer")
+        _shared_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="cv_analyzer")
     return _shared_executor
 
+def _run_in_executor(func, *args):
+    """Exécute func dans l'executor partagé en propageant le contexte (identifiant de requête des logs)"""
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(get_executor(), functools.partial(context.run, func, *args))
+
+# Taille maximale d'un CV et taille des blocs lus depuis l'upload
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+async def _read_upload(cv_file: UploadFile) -> bytes:
+    """Lit l'upload par blocs : rejet dès le premier bloc (format inconnu) ou dès que la taille maximale est dépassée"""
+    chunks, size = [], 0
+    while True:
+        chunk = await cv_file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not chunks and sniff_format(chunk) is None:
+            raise PreflightError(UNKNOWN_FORMAT_MESSAGE)
+        size += len(chunk)
+        if size > MAX_UPLOAD_SIZE:
+            raise PreflightError("Le fichier est trop volumineux. Taille maximale : 10MB")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _analysis_columns(analysis_result: dict) -> dict:
+    """Valeurs enregistrées pour un résultat d'analyse (candidate_profile : JSON stocké dans analysis_profiles)"""
+    return {
+        "score": float(analysis_result.get("score", 0.0)),
+        "missing_skills": str(analysis_result.get("missing_skills", [])),
+        "relevant_experience": str(analysis_result.get("relevant_experience", [])),
+        "irrelevant_experience": str(analysis_result.get("irrelevant_experience", [])),
+        "recommendations": str(analysis_result.get("recommendations", [])),
+        "languages": str(analysis_result.get("languages", [])),
+        "candidate_profile": json.dumps(analysis_result.get("candidate_profile", {}), ensure_ascii=False),
+    }
+
+async def _complete_analysis(analysis_id: int, user_id: int, analyzer, cv_text: str,
+                             job_description: str, partial: dict):
+    """Second niveau de l'analyse (tâche de fond) : complète la ligne enregistrée par l'upload"""
+    analysis_result = None
+    try:
+        # Même contrôle d'admission que le premier niveau (tour de rôle par utilisateur)
+        async with analysis_admission.slot(user_id):
+            analysis_result = await asyncio.wait_for(
+                _run_in_executor(analyzer.complete_analysis, cv_text, job_description, partial),
+                timeout=60.0
+            )
+    except AdmissionRejected:
+        logger.warning("File d'analyse pleine, analyse %s marquée en échec", analysis_id)
+    except Exception as e:
+        logger.exception("Erreur lors du second niveau de l'analyse %s: %s", analysis_id, e)
+    
+    def save(session):
+        analysis = session.get(models.Analysis, analysis_id)
+        if analysis is not None:
+            if analysis_result:
+                columns = _analysis_columns(analysis_result)
+                analysis_store.save_profile(session, analysis_id, columns.pop("candidate_profile"))
+                for column, value in columns.items():
+                    setattr(analysis, column, value)
+            analysis.completeness = "complete" if analysis_result else "failed"
+    
+    try:
+        await database.run_write(save)
+    except Exception as db_error:
+        logger.exception("Erreur lors de l'enregistrement du second niveau de l'analyse %s: %s",
+                         analysis_id, db_error)
+
+async def fail_stale_partial_analyses() -> int:
+    """Marque "failed" les analyses restées "partial" au-delà du délai ; retourne leur nombre"""
+    deadline = datetime.now(timezone.utc) - timedelta(seconds=PARTIAL_ANALYSIS_DEADLINE)
+    
+    def sweep(session):
+        return session.execute(
+            update(models.Analysis)
+            .where(models.Analysis.completeness == "partial", models.Analysis.created_at < deadline)
+            .values(completeness="failed")
+        ).rowcount
+    
+    swept = await database.run_write(sweep)
+    if swept:
+        logger.warning("%d analyses incomplètes depuis plus de %.0f s marquées en échec",
+                       swept, PARTIAL_ANALYSIS_DEADLINE)
+    return swept
+
+async def sweep_partial_analyses():
+    """Tâche de fond du worker : balayage des analyses partielles abandonnées"""
+    while True:
+        try:
+            await fail_stale_partial_analyses()
+        except Exception as e:
+            logger.exception("Erreur lors du balayage des analyses incomplètes: %s", e)
+        await asyncio.sleep(PARTIAL_SWEEP_INTERVAL)
+
+def _too_many_requests(rejected: AdmissionRejected) -> HTTPException:
+    """Convertit un rejet d'admission en réponse 429 avec l'en-tête Retry-After"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(rejected),
+        headers={"Retry-After": str(rejected.retry_after)}
+    )
+
 @router.post("/upload", response_model=schemas.AnalysisCreate)
 async def upload_cv(
+    response: Response,
+    background_tasks: BackgroundTasks,
     cv_file: UploadFile = File(...),
     job_description: str = Form(...),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     # Vérifier que le fichier a un nom
     if not cv_file.filename:
@@ -52,31 +181,34 @@ async def upload_cv(
     if file_extension not in allowed_extensions:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Format de fichier non supporté. Utilisez PDF ou DOCX."
+            detail="Format de fichier non supporté. Utilisez PDF, DOCX ou DOC."
         )
     
     # Sauvegarder l'ID utilisateur avant de libérer la session
     user_id = current_user.id
     cv_filename = cv_file.filename
     
-    # Note: La session sera automatiquement fermée par get_db() après le yield
-    # On ne ferme pas manuellement pour éviter la double fermeture
+    # Rendre la connexion tout de suite : la transaction de lecture ouverte par
+    # get_current_user resterait sinon ouverte pendant toute l'analyse
+    # (get_async_db refermera la session, une seconde fermeture est sans effet)
+    await db.close()
     
-    # Note: La vérification de taille se fera après la lecture du fichier
+    # Note: La vérification de taille se fait pendant la lecture du fichier (par blocs)
     
     # Sauvegarder le fichier
     file_id = str(uuid.uuid4())
     file_path = os.path.join(UPLOAD_DIR, f"{file_id}{file_extension}")
     
     try:
-        # Lire le contenu du fichier
-        content = await cv_file.read()
-        
-        # Vérifier la taille (max 10MB)
-        if len(content) > 10 * 1024 * 1024:
+        # Lecture par blocs puis contrôles préalables (octets magiques, structure, chiffrement) :
+        # un fichier invalide est rejeté avant d'être écrit et d'occuper un slot d'analyse
+        try:
+            content = await _read_upload(cv_file)
+            file_format = preflight(content)
+        except PreflightError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Le fichier est trop volumineux. Taille maximale : 10MB"
+                detail=str(e)
             )
         
         # Sauvegarder le fichier
@@ -84,107 +216,99 @@ async def upload_cv(
             buffer.write(content)
         # Le fichier est maintenant fermé
         
-        # Utiliser le semaphore pour limiter les requêtes simultanées
-        async with analysis_semaphore:
+        # Attendre un slot d'analyse (rejet immédiat si la file est pleine)
+        async with analysis_admission.slot(user_id) as queue_wait:
             # Analyser le CV de manière asynchrone avec timeout
             analyzer = cv_analyzer.CVAnalyzer()
             
-            # Utiliser l'executor partagé au lieu d'en créer un nouveau
-            executor = get_executor()
-            loop = asyncio.get_event_loop()
-            
             try:
-                # Extraction du texte avec timeout de 30 secondes
+                # Extraction du texte avec timeout de 30 secondes (executor partagé)
                 cv_text = await asyncio.wait_for(
-                    loop.run_in_executor(executor, analyzer.extract_text, file_path, file_extension),
+                    _run_in_executor(analyzer.extract_text, file_path, file_format),
                     timeout=30.0
                 )
                 
-                # Analyse du CV avec timeout de 60 secondes (optimisé - devrait prendre < 10s maintenant)
+                # Analyse du CV avec timeout de 60 secondes (premier niveau seulement en mode deux niveaux)
+                analyze = analyzer.analyze_cv_fast if TIERED_ANALYSIS else analyzer.analyze_cv
                 analysis_result = await asyncio.wait_for(
-                    loop.run_in_executor(executor, analyzer.analyze_cv, cv_text, job_description),
+                    _run_in_executor(analyze, cv_text, job_description),
                     timeout=60.0
                 )
-            except asyncio.TimeoutError:
+            except (asyncio.TimeoutError, ExtractionBudgetExceeded):
                 raise HTTPException(
                     status_code=status.HTTP_408_REQUEST_TIMEOUT,
                     detail="L'analyse du CV a pris trop de temps. Veuillez réessayer."
                 )
             except Exception as e:
-                import traceback
-                error_trace = traceback.format_exc()
-                print(f"Erreur détaillée lors de l'analyse du CV: {error_trace}")
+                logger.exception("Erreur détaillée lors de l'analyse du CV: %s", e)
                 # Nettoyer le fichier en cas d'erreur
                 if os.path.exists(file_path):
                     try:
                         os.remove(file_path)
                     except Exception as cleanup_error:
-                        print(f"Erreur lors du nettoyage du fichier: {cleanup_error}")
+                        logger.warning("Erreur lors du nettoyage du fichier: %s", cleanup_error)
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Erreur lors de l'analyse: {str(e)}"
                 )
         
-        # Créer une NOUVELLE session de base de données pour sauvegarder les résultats
-        # Cela évite de garder une connexion ouverte pendant toute l'analyse
-        import json
-        db_new = SessionLocal()
+        # Enregistrer les résultats avec les autres analyses qui se terminent en même temps
+        # (une transaction par lot, voir write_behind.py)
+        completeness = "partial" if TIERED_ANALYSIS else "complete"
         try:
             # S'assurer que le résultat contient tous les champs nécessaires
             if not analysis_result or "score" not in analysis_result:
                 raise ValueError("Le résultat de l'analyse est invalide ou incomplet")
             
-            db_analysis = models.Analysis(
+            saved = await analysis_writer.insert(dict(
                 user_id=user_id,
                 cv_filename=cv_filename,
                 job_description=job_description,
-                score=float(analysis_result.get("score", 0.0)),
-                missing_skills=str(analysis_result.get("missing_skills", [])),
-                relevant_experience=str(analysis_result.get("relevant_experience", [])),
-                irrelevant_experience=str(analysis_result.get("irrelevant_experience", [])),
-                recommendations=str(analysis_result.get("recommendations", [])),
-                languages=str(analysis_result.get("languages", [])),
-                candidate_profile=json.dumps(analysis_result.get("candidate_profile", {}), ensure_ascii=False)
-            )
-            db_new.add(db_analysis)
-            db_new.commit()
-            db_new.refresh(db_analysis)
-            analysis_id = db_analysis.id
+                completeness=completeness,
+                **_analysis_columns(analysis_result)
+            ))
+            analysis_id = saved.id
         except Exception as db_error:
-            db_new.rollback()
-            import traceback
-            error_trace = traceback.format_exc()
-            print(f"Erreur détaillée lors de l'enregistrement en base de données: {error_trace}")
+            logger.exception("Erreur détaillée lors de l'enregistrement en base de données: %s", db_error)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Erreur lors de l'enregistrement en base de données: {str(db_error)}"
             )
-        finally:
-            db_new.close()
         
         # Supprimer le fichier temporaire
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
         except Exception as cleanup_error:
-            print(f"Erreur lors de la suppression du fichier temporaire: {cleanup_error}")
+            logger.warning("Erreur lors de la suppression du fichier temporaire: %s", cleanup_error)
             # Ne pas faire échouer la requête si le fichier ne peut pas être supprimé
         
-        return {"analysis_id": analysis_id}
+        if SERVER_TIMING:
+            response.headers["Server-Timing"] = analyzer.timer.server_timing({"queue": queue_wait})
+        
+        # Second niveau après l'envoi de la réponse (le texte extrait est gardé en mémoire)
+        if TIERED_ANALYSIS:
+            background_tasks.add_task(_complete_analysis, analysis_id, user_id, analyzer,
+                                      cv_text, job_description, analysis_result)
+        
+        return {"analysis_id": analysis_id, "completeness": completeness}
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except AdmissionRejected as rejected:
+        # File d'attente pleine : ne pas garder le fichier, indiquer quand réessayer
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise _too_many_requests(rejected)
     except Exception as e:
         # Nettoyer en cas d'erreur
         if 'file_path' in locals() and os.path.exists(file_path):
             try:
                 os.remove(file_path)
             except Exception as cleanup_error:
-                print(f"Erreur lors du nettoyage du fichier: {cleanup_error}")
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"Erreur générale lors de l'upload du CV: {error_trace}")
+                logger.warning("Erreur lors du nettoyage du fichier: %s", cleanup_error)
+        logger.exception("Erreur générale lors de l'upload du CV: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de l'analyse du CV: {str(e)}"
@@ -196,7 +320,7 @@ async def process_single_cv(
     user_id: int,
     file_id: str
 ) -> dict:
-    """Traite un seul CV et retourne le résultat"""
+    """Analyse un seul CV et retourne le résultat, avec la ligne à enregistrer (`values`) si l'analyse a réussi"""
     try:
         # Vérifier que le fichier a un nom
         if not cv_file.filename:
@@ -207,82 +331,48 @@ async def process_single_cv(
         allowed_extensions = ['.pdf', '.docx', '.doc']
         
         if file_extension not in allowed_extensions:
-            return {"success": False, "filename": cv_file.filename, "error": "Format de fichier non supporté. Utilisez PDF ou DOCX."}
+            return {"success": False, "filename": cv_file.filename, "error": "Format de fichier non supporté. Utilisez PDF, DOCX ou DOC."}
         
         cv_filename = cv_file.filename
         file_path = os.path.join(UPLOAD_DIR, f"{file_id}{file_extension}")
         
-        # Lire le contenu du fichier
-        content = await cv_file.read()
-        
-        # Vérifier la taille (max 10MB)
-        if len(content) > 10 * 1024 * 1024:
-            return {"success": False, "filename": cv_filename, "error": "Le fichier est trop volumineux. Taille maximale : 10MB"}
+        # Lecture par blocs puis contrôles préalables, avant d'occuper un slot d'analyse
+        try:
+            content = await _read_upload(cv_file)
+            file_format = preflight(content)
+        except PreflightError as e:
+            return {"success": False, "filename": cv_filename, "error": str(e)}
         
         # Sauvegarder le fichier
         with open(file_path, "wb") as buffer:
             buffer.write(content)
         
-        # Utiliser le semaphore pour limiter les requêtes simultanées
-        async with analysis_semaphore:
+        # Attendre un slot d'analyse (tour de rôle avec les autres utilisateurs)
+        async with analysis_admission.slot(user_id):
             analyzer = cv_analyzer.CVAnalyzer()
-            executor = get_executor()
-            loop = asyncio.get_event_loop()
             
             try:
                 # Extraction du texte avec timeout
                 cv_text = await asyncio.wait_for(
-                    loop.run_in_executor(executor, analyzer.extract_text, file_path, file_extension),
+                    _run_in_executor(analyzer.extract_text, file_path, file_format),
                     timeout=30.0
                 )
                 
                 # Analyse du CV avec timeout
                 analysis_result = await asyncio.wait_for(
-                    loop.run_in_executor(executor, analyzer.analyze_cv, cv_text, job_description),
+                    _run_in_executor(analyzer.analyze_cv, cv_text, job_description),
                     timeout=60.0
                 )
-            except asyncio.TimeoutError:
+            except (asyncio.TimeoutError, ExtractionBudgetExceeded):
                 if os.path.exists(file_path):
                     os.remove(file_path)
                 return {"success": False, "filename": cv_filename, "error": "L'analyse du CV a pris trop de temps."}
             except Exception as e:
+                logger.exception("Erreur lors de l'analyse du CV %s: %s", cv_filename, e)
                 if os.path.exists(file_path):
                     os.remove(file_path)
                 return {"success": False, "filename": cv_filename, "error": f"Erreur lors de l'analyse: {str(e)}"}
         
-        # Sauvegarder en base de données
-        import json
-        db_new = SessionLocal()
-        try:
-            if not analysis_result or "score" not in analysis_result:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                return {"success": False, "filename": cv_filename, "error": "Le résultat de l'analyse est invalide"}
-            
-            db_analysis = models.Analysis(
-                user_id=user_id,
-                cv_filename=cv_filename,
-                job_description=job_description,
-                score=float(analysis_result.get("score", 0.0)),
-                missing_skills=str(analysis_result.get("missing_skills", [])),
-                relevant_experience=str(analysis_result.get("relevant_experience", [])),
-                irrelevant_experience=str(analysis_result.get("irrelevant_experience", [])),
-                recommendations=str(analysis_result.get("recommendations", [])),
-                languages=str(analysis_result.get("languages", [])),
-                candidate_profile=json.dumps(analysis_result.get("candidate_profile", {}), ensure_ascii=False)
-            )
-            db_new.add(db_analysis)
-            db_new.commit()
-            db_new.refresh(db_analysis)
-            analysis_id = db_analysis.id
-        except Exception as db_error:
-            db_new.rollback()
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            return {"success": False, "filename": cv_filename, "error": f"Erreur lors de l'enregistrement: {str(db_error)}"}
-        finally:
-            db_new.close()
-        
         # Supprimer le fichier temporaire
         try:
             if os.path.exists(file_path):
@@ -290,14 +380,25 @@ async def process_single_cv(
         except Exception:
             pass
         
+        if not analysis_result or "score" not in analysis_result:
+            return {"success": False, "filename": cv_filename, "error": "Le résultat de l'analyse est invalide"}
+        
+        # Ligne à enregistrer avec le reste du lot (voir bulk_upload_cvs)
         return {
             "success": True,
-            "id": analysis_id,
             "cv_filename": cv_filename,
-            "score": float(analysis_result.get("score", 0.0)),
-            "created_at": db_analysis.created_at
+            "values": dict(
+                user_id=user_id,
+                cv_filename=cv_filename,
+                job_description=job_description,
+                **_analysis_columns(analysis_result)
+            )
         }
         
+    except AdmissionRejected as rejected:
+        if 'file_path' in locals() and os.path.exists(file_path):
+            os.remove(file_path)
+        return {"success": False, "filename": cv_file.filename, "error": str(rejected)}
     except Exception as e:
         if 'file_path' in locals() and os.path.exists(file_path):
             try:
@@ -311,7 +412,7 @@ async def bulk_upload_cvs(
     cv_files: List[UploadFile] = File(...),
     job_description: str = Form(...),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     """Upload et analyse plusieurs CVs en parallèle"""
     
@@ -336,6 +437,14 @@ async def bulk_upload_cvs(
         )
     
     user_id = current_user.id
+    # Rendre la connexion avant les analyses (voir upload_cv)
+    await db.close()
+    
+    # Refuser tout le lot d'emblée si la file d'attente ne peut pas l'absorber
+    try:
+        analysis_admission.check_capacity(len(cv_files))
+    except AdmissionRejected as rejected:
+        raise _too_many_requests(rejected)
     
     # Traiter tous les fichiers en parallèle
     tasks = []
@@ -347,26 +456,29 @@ async def bulk_upload_cvs(
     # Attendre que toutes les analyses soient terminées
     results = await asyncio.gather(*tasks, return_exceptions=True)
     
+    # Enregistrer tout le lot en une transaction (un savepoint par CV si l'insertion groupée
+    # échoue : un CV en erreur n'annule pas les autres)
+    analyzed = [result for result in results if not isinstance(result, Exception) and result.get("success")]
+    try:
+        saved_rows = await analysis_writer.insert_all([result["values"] for result in analyzed])
+    except Exception as db_error:
+        logger.exception("Erreur lors de l'enregistrement du lot: %s", db_error)
+        saved_rows = [db_error] * len(analyzed)
+    
     # Traiter les résultats
     successful_analyses = []
-    successful_count = 0
-    failed_count = 0
-    
-    for result in results:
-        if isinstance(result, Exception):
-            failed_count += 1
+    for result, saved in zip(analyzed, saved_rows):
+        if isinstance(saved, Exception):
+            logger.warning("Erreur lors de l'enregistrement de %s: %s", result["cv_filename"], saved)
             continue
-        
-        if result.get("success"):
-            successful_analyses.append(schemas.AnalysisListItem(
-                id=result["id"],
-                cv_filename=result["cv_filename"],
-                score=result.get("score"),
-                created_at=result["created_at"]
-            ))
-            successful_count += 1
-        else:
-            failed_count += 1
+        successful_analyses.append(schemas.AnalysisListItem(
+            id=saved.id,
+            cv_filename=result["cv_filename"],
+            score=result["values"]["score"],
+            created_at=saved.created_at
+        ))
+    successful_count = len(successful_analyses)
+    failed_count = len(cv_files) - successful_count
     
     # Trier par score décroissant
     successful_analyses.sort(key=lambda x: x.score if x.score is not None else 0, reverse=True)
@@ -98,6 +98,7 @@ class AnalysisResponse(BaseModel):
     recommendations: Optional[List[str]] = None
     languages: Optional[List[str]] = None
     candidate_profile: Optional[CandidateProfile] = None
+    completeness: str = "complete"  # partial / complete / failed
     created_at: datetime
 
     class Config:
@@ -105,11 +106,13 @@ class AnalysisResponse(BaseModel):
 
 class AnalysisCreate(BaseModel):
     analysis_id: int
+    completeness: str = "complete"
 
 class AnalysisListItem(BaseModel):
     id: int
     cv_filename: str
     score: Optional[float] = None
+    completeness: str = "complete"
     created_at: datetime
     
     class Config:
@@ -0,0 +1,138 @@
+"""
+Segmentation d'un CV en sections, calculée une seule fois par texte.
+
+Les extracteurs du profil (résumé, expériences, stages, projets, formation, certifications,
+langues) et le calcul du score recherchaient chacun leurs titres de section en reparcourant
+toutes les lignes avec leurs propres mots-clés. `segment_cv` repère tous ces marqueurs d'un
+coup : une recherche regex par famille de mots-clés sur le texte complet (pas de boucle Python
+par ligne), positions converties en numéros de ligne. Chaque extracteur ne parcourt ensuite
+que sa tranche (`SectionMap.ranges`).
+
+Les règles de détection sont exactement celles des extracteurs (mêmes mots-clés, mêmes seuils
+de longueur) : le profil extrait est inchangé (voir benchmarks/golden).
+"""
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, List, Set, Tuple
+
+SUMMARY_KEYWORDS = ('résumé', 'resume', 'profil', 'profile', 'summary', 'about', 'à propos')
+EXPERIENCE_KEYWORDS = ('expérience', 'experience', 'work', 'employment', 'emploi', 'professional', 'career')
+EDUCATION_KEYWORDS = ('formation', 'education', 'études', 'studies', 'diplôme', 'diploma')
+# Titres qui terminent la section Formation
+EDUCATION_END_KEYWORDS = ('expérience', 'experience', 'compétences', 'skills', 'projets', 'certifications', 'langues')
+
+# Longueur maximale d'une ligne de titre (au-delà, le mot-clé est dans une phrase)
+EXPERIENCE_HEADING_MAX_LENGTH = 50
+EDUCATION_HEADING_MAX_LENGTH = 30
+# Nombre de lignes examinées après le titre Formation pour en trouver la fin
+EDUCATION_SECTION_SPAN = 100
+
+
+def _keywords(words) -> "re.Pattern":
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+# Marqueurs recherchés dans le texte en minuscules (sous-chaînes, comme dans les extracteurs)
+_MARKERS = {
+    "summary": _keywords(SUMMARY_KEYWORDS),
+    "experience": _keywords(EXPERIENCE_KEYWORDS),
+    "education": _keywords(EDUCATION_KEYWORDS),
+    "education_end": _keywords(EDUCATION_END_KEYWORDS),
+    "internships": re.compile(r'stage|internship|alternance|apprentissage|apprenticeship|stagiaire|intern'),
+    "projects": re.compile(r'projet|project|portfolio|réalisations|achievements'),
+    "certifications": re.compile(r'certification|certificat|certificate|cert|'
+                                 r'aws certified|azure certified|google cloud|oracle certified'),
+    "language_levels": re.compile(r'natif|native|maternel|mother tongue|courant|fluent|avancé|advanced|'
+                                  r'intermédiaire|intermediate|moyen|débutant|beginner|basic|a1|a2|b1|b2|c1|c2'),
+}
+
+# Période d'une expérience ("2019 - 2021", "2020 – présent"), sans déborder sur la ligne suivante
+_PERIOD = re.compile(r'(\d{4})[^\S\n]*[-–—][^\S\n]*(\d{4}|présent|present|now)')
+
+
+@dataclass
+class SectionMap:
+    """Découpage d'un CV : lignes, marqueurs par famille et tranche de lignes par section"""
+    text: str
+    lowered: str
+    lines: List[str]
+    stripped: List[str]
+    markers: Dict[str, Set[int]]        # famille -> indices des lignes contenant un marqueur
+    periods: Dict[int, str]             # ligne -> première période trouvée sur la ligne
+    ranges: Dict[str, Tuple[int, int]]  # section -> (première ligne, fin exclue)
+    summary_lines: List[str]            # lignes du résumé professionnel
+
+    def section(self, name: str) -> range:
+        """Indices des lignes de la section (vide si la section est absente)"""
+        return range(*self.ranges.get(name, (0, 0)))
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    return list(accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+
+
+def _marked_lines(pattern: "re.Pattern", text: str, starts: List[int]) -> Set[int]:
+    return {bisect_right(starts, match.start()) - 1 for match in pattern.finditer(text)}
+
+
+def segment_cv(cv_text: str) -> SectionMap:
+    """Repère en une passe les sections du CV (voir le docstring du module)"""
+    lines = cv_text.split('\n')
+    stripped = [line.strip() for line in lines]
+    count = len(lines)
+    starts = _line_starts(lines)
+
+    lowered = cv_text.lower()
+    # lower() peut changer la longueur de certains caractères : positions recalculées si besoin
+    lowered_starts = starts if len(lowered) == len(cv_text) else _line_starts(lowered.split('\n'))
+    markers = {name: _marked_lines(pattern, lowered, lowered_starts) for name, pattern in _MARKERS.items()}
+    markers["experience"] = {i for i in markers["experience"]
+                             if len(lines[i].lower().strip()) < EXPERIENCE_HEADING_MAX_LENGTH}
+    markers["education"] = {i for i in markers["education"]
+                            if len(lines[i].lower().strip()) < EDUCATION_HEADING_MAX_LENGTH}
+
+    periods: Dict[int, str] = {}
+    for match in _PERIOD.finditer(cv_text):
+        periods.setdefault(bisect_right(starts, match.start()) - 1, match.group(0))
+
+    ranges: Dict[str, Tuple[int, int]] = {}
+
+    # Résumé : après le premier titre, lignes de plus de 10 caractères jusqu'à la première ligne courte
+    summary_lines: List[str] = []
+    if markers["summary"]:
+        start = end = min(markers["summary"]) + 1
+        for end in range(start, count + 1):
+            if end == count:
+                break
+            if end in markers["summary"]:
+                continue
+            if len(stripped[end]) > 10:
+                summary_lines.append(stripped[end])
+            elif summary_lines:
+                break
+        ranges["summary"] = (start, end)
+
+    # Formation : du premier titre jusqu'au titre de section suivant (dans la limite de 100 lignes)
+    if markers["education"]:
+        heading = min(markers["education"])
+        limit = min(count, heading + EDUCATION_SECTION_SPAN)
+        ends = [j for j in markers["education_end"] if heading < j < limit]
+        ranges["education"] = (heading + 1, min(ends) if ends else count)
+    else:
+        ranges["education"] = (0, count)
+
+    # Sections à entrées multiples : du premier marqueur jusqu'à la fin du document
+    # (avant le premier marqueur, les extracteurs n'ont aucun état)
+    experience_start = markers["experience"] | set(periods)
+    if experience_start:
+        ranges["experience"] = (min(experience_start), count)
+    for name in ("internships", "projects", "certifications"):
+        if markers[name]:
+            ranges[name] = (min(markers[name]), count)
+    if markers["language_levels"]:
+        ranges["languages"] = (max(0, min(markers["language_levels"]) - 2),
+                               min(count, max(markers["language_levels"]) + 3))
+
+    return SectionMap(cv_text, lowered, lines, stripped, markers, periods, ranges, summary_lines)
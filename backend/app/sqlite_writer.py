@@ -0,0 +1,180 @@
+"""
+Écrivain unique pour les déploiements SQLite.
+
+SQLite n'accepte qu'un écrivain à la fois par fichier : les écritures concurrentes (requêtes
+d'un même worker, workers gunicorn) se disputaient le verrou et attendaient dans busy_timeout,
+avec des pauses de plusieurs secondes. En mode écrivain unique, toutes les écritures du
+processus passent par une file et sont exécutées dans l'ordre par un thread dédié, sur une
+seule connexion. Entre processus, chaque transaction prend un verrou de fichier
+(`<base>.writer.lock`, fcntl) : les workers attendent leur tour au lieu de réessayer en boucle.
+Les lectures utilisent les connexions du moteur asynchrone, en lecture seule (query_only).
+
+Les checkpoints du WAL sont déclenchés par l'écrivain (wal_autocheckpoint désactivé) :
+checkpoint PASSIVE quand la file est vide après SQLITE_CHECKPOINT_WRITES écritures ou après
+SQLITE_CHECKPOINT_INTERVAL secondes, checkpoint TRUNCATE quand le fichier WAL dépasse
+SQLITE_WAL_MAX_MB.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SQLITE_CHECKPOINT_INTERVAL = float(os.getenv("SQLITE_CHECKPOINT_INTERVAL", "30"))
+SQLITE_CHECKPOINT_WRITES = int(os.getenv("SQLITE_CHECKPOINT_WRITES", "200"))
+SQLITE_WAL_MAX_MB = float(os.getenv("SQLITE_WAL_MAX_MB", "64"))
+
+# File toujours occupée : checkpoint forcé au-delà de ce multiple de SQLITE_CHECKPOINT_WRITES
+_BUSY_CHECKPOINT_FACTOR = 4
+
+
+class SQLiteWriter:
+    """Thread écrivain d'une base SQLite : exécute `job(session)` dans l'ordre, un commit par job"""
+
+    def __init__(self, engine, database_path: str):
+        self.engine = engine
+        self.database_path = database_path
+        self.wal_path = database_path + "-wal"
+        self.lock_path = database_path + ".writer.lock"
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._writes_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+
+        # Métriques exportées
+        self.jobs_total = 0
+        self.errors_total = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.checkpoints_total = 0
+        self.truncate_checkpoints_total = 0
+
+    def submit(self, job: Callable[[Session], object]) -> Future:
+        """Ajoute une écriture à la file ; le Future reçoit la valeur retournée par `job`"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((job, future, time.monotonic()))
+        return future
+
+    def stop(self) -> None:
+        """Termine les écritures en file puis arrête le thread (à l'arrêt de l'application)"""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=30)
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite_writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=SQLITE_CHECKPOINT_INTERVAL)
+            except queue.Empty:
+                # Inactif : vider le WAL des écritures récentes
+                if self._writes_since_checkpoint:
+                    self._checkpoint()
+                continue
+            if item is None:
+                if self._writes_since_checkpoint:
+                    self._checkpoint()
+                return
+            self._execute(*item)
+            self._maybe_checkpoint()
+
+    def _execute(self, job, future: Future, queued_at: float) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        waited = time.monotonic() - queued_at
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        try:
+            with self._process_lock(), Session(self.engine, expire_on_commit=False) as session:
+                result = job(session)
+                session.commit()
+        except Exception as e:
+            self.errors_total += 1
+            future.set_exception(e)
+        else:
+            self.jobs_total += 1
+            self._writes_since_checkpoint += 1
+            future.set_result(result)
+
+    @contextmanager
+    def _process_lock(self):
+        """Verrou exclusif entre processus pendant une transaction d'écriture"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _maybe_checkpoint(self) -> None:
+        pending = self._writes_since_checkpoint
+        if not pending:
+            return
+        idle = self._queue.empty()
+        due = time.monotonic() - self._last_checkpoint >= SQLITE_CHECKPOINT_INTERVAL
+        if (idle and (due or pending >= SQLITE_CHECKPOINT_WRITES)) \
+                or pending >= SQLITE_CHECKPOINT_WRITES * _BUSY_CHECKPOINT_FACTOR:
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        try:
+            wal_size = os.path.getsize(self.wal_path) if os.path.exists(self.wal_path) else 0
+        except OSError:
+            wal_size = 0
+        # TRUNCATE remet le fichier WAL à zéro (attend la fin des lectures en cours)
+        mode = "TRUNCATE" if wal_size > SQLITE_WAL_MAX_MB * 1024 * 1024 else "PASSIVE"
+        try:
+            # Connexion DBAPI directe : le checkpoint s'exécute hors transaction
+            connection = self.engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                busy, log_frames, checkpointed = cursor.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+                cursor.close()
+            finally:
+                connection.close()
+        except Exception as e:
+            logger.warning("Échec du checkpoint SQLite (%s): %s", mode, e)
+            return
+        self.checkpoints_total += 1
+        if mode == "TRUNCATE":
+            self.truncate_checkpoints_total += 1
+        self._writes_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        logger.debug("Checkpoint SQLite %s : %s/%s pages (occupé : %s)", mode, checkpointed, log_frames, busy)
+
+    def snapshot(self) -> Dict:
+        """Retourne les métriques courantes (file, attente, checkpoints)"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "jobs_total": self.jobs_total,
+            "errors_total": self.errors_total,
+            "wait_time_avg": round(self.wait_time_total / self.jobs_total, 4) if self.jobs_total else 0.0,
+            "wait_time_max": round(self.wait_time_max, 4),
+            "checkpoints_total": self.checkpoints_total,
+            "truncate_checkpoints_total": self.truncate_checkpoints_total,
+        }
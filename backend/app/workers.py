@@ -0,0 +1,42 @@
+"""
+Pool de processus partagé pour le calcul pur Python qui ne libère pas le GIL :
+plages de pages des PDF longs (pdf_extraction) et extracteurs du profil candidat
+(cv_analyzer, PROFILE_PARALLEL).
+
+Le pool est créé à la demande en mode spawn (pas de fork d'un processus multi-threadé :
+executor d'analyse, serveur) et arrêté à l'arrêt de l'application.
+PROCESS_POOL_WORKERS fixe sa taille (PDF_PARALLEL_WORKERS à défaut, sinon min(4, CPU)).
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+PROCESS_POOL_WORKERS = int(os.getenv(
+    "PROCESS_POOL_WORKERS", os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1)))
+))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Pool de processus partagé (créé à la demande)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max(1, PROCESS_POOL_WORKERS),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Arrête le pool (à l'arrêt de l'application, ou pour le recréer après un worker tué)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
@@ -0,0 +1,236 @@
+"""
+Écriture différée et groupée des résultats d'analyse.
+
+Chaque upload (et chaque CV d'un upload en masse) insérait sa ligne dans sa propre
+transaction : autant de commits (et de fsync) que d'analyses, en concurrence pour le
+verrou d'écriture unique de SQLite. Le committer regroupe les insertions concurrentes :
+une insertion attend au plus WRITE_BATCH_DELAY_MS qu'un lot se forme (WRITE_BATCH_SIZE
+lignes au plus), le lot est inséré en une seule transaction (executemany avec RETURNING
+quand la base le permet, via database.run_write) et chaque appelant reçoit l'identifiant
+de sa ligne.
+
+Pendant l'écriture d'un lot, les insertions suivantes s'accumulent et partent dans le lot
+suivant, sans délai supplémentaire (WRITE_BATCH_DELAY_MS=0 : écriture immédiate, regroupement
+uniquement pendant une écriture en cours). Si un lot échoue, ses lignes sont réinsérées une par
+une : seule la ligne fautive remonte une erreur à son appelant.
+
+Un upload en masse connaît tout son lot d'avance : `insert_all` l'écrit d'un coup, en une
+transaction, avec un savepoint par ligne si l'insertion groupée échoue.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from . import models
+from . import database
+from . import analysis_store
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "20"))
+WRITE_BATCH_DELAY_MS = float(os.getenv("WRITE_BATCH_DELAY_MS", "5"))
+
+
+class WriteBehindCommitter:
+    """Regroupe les insertions concurrentes d'une table en transactions groupées"""
+
+    def __init__(self, table, returning, max_batch: int, max_delay: float):
+        self.table = table
+        self.returning = returning
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay)
+
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writer: Optional[asyncio.Task] = None
+
+        # Métriques exportées
+        self.batches_total = 0
+        self.rows_total = 0
+        self.batch_size_max = 0
+        self.fallback_total = 0
+
+    async def insert(self, values: Dict):
+        """Insère une ligne avec le lot en cours et retourne les colonnes `returning` (id, ...)"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Nouvelle boucle d'événements (redémarrage, tests) : repartir d'un état vide
+            self._loop, self._timer, self._writer = loop, None, None
+        future = loop.create_future()
+        self._pending.append((values, future))
+
+        if self._writer is None or self._writer.done():
+            if len(self._pending) >= self.max_batch or self.max_delay == 0:
+                self._start_writer()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_delay, self._start_writer)
+        # L'insertion aboutit même si l'appelant est annulé (client déconnecté, timeout)
+        return await asyncio.shield(future)
+
+    async def insert_all(self, rows: List[Dict]) -> list:
+        """
+        Insère un lot complet tout de suite, en une transaction (un seul commit), et retourne
+        pour chaque ligne ses colonnes `returning` ou l'exception qui l'a rejetée. Le lot est
+        d'abord inséré d'un bloc ; en cas d'échec, ligne par ligne, chacune dans un savepoint :
+        une ligne en erreur n'annule pas les autres.
+        """
+        def write(session):
+            try:
+                with session.begin_nested():
+                    return self._insert_rows(session, rows)
+            except Exception as e:
+                logger.warning("Échec de l'insertion du lot (%d lignes), insertion ligne par ligne: %s",
+                               len(rows), e)
+                self.fallback_total += 1
+            results = []
+            for row in rows:
+                try:
+                    with session.begin_nested():
+                        results.append(self._insert_rows(session, [row])[0])
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        if not rows:
+            return []
+        results = await database.run_write(write)
+        self._committed([(row, result) for row, result in zip(rows, results) if not isinstance(result, Exception)])
+        written = sum(not isinstance(result, Exception) for result in results)
+        self.batches_total += 1
+        self.rows_total += written
+        self.batch_size_max = max(self.batch_size_max, written)
+        return results
+
+    async def drain(self) -> None:
+        """Écrit les insertions en attente (à l'arrêt de l'application)"""
+        if self._pending and (self._writer is None or self._writer.done()):
+            self._start_writer()
+        if self._writer is not None and not self._writer.done():
+            await self._writer
+
+    def _start_writer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._writer is None or self._writer.done():
+            self._writer = self._loop.create_task(self._write_pending())
+
+    async def _write_pending(self) -> None:
+        # Les insertions arrivées pendant l'écriture d'un lot forment le lot suivant
+        batch: List[Tuple[Dict, asyncio.Future]] = []
+        try:
+            while self._pending:
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                try:
+                    rows = await self._write_batch([values for values, _ in batch])
+                except Exception as e:
+                    logger.warning("Échec de l'écriture groupée (%d lignes), écriture ligne par ligne: %s",
+                                   len(batch), e)
+                    self.fallback_total += 1
+                    await self._write_one_by_one(batch)
+                    continue
+                for (_, future), row in zip(batch, rows):
+                    if not future.done():
+                        future.set_result(row)
+        except BaseException as e:
+            # Écrivain annulé (arrêt, fin de la boucle) : les appelants en attente reçoivent
+            # l'erreur au lieu d'attendre indéfiniment
+            unresolved, self._pending = batch + self._pending, []
+            failed = [future for _, future in unresolved if not future.done()]
+            if failed:
+                logger.error("Écriture groupée interrompue, %d lignes non écrites: %r", len(failed), e)
+            for future in failed:
+                future.set_exception(RuntimeError(f"Écriture groupée interrompue: {e!r}"))
+            raise
+
+    def _insert_rows(self, session, rows: List[Dict]) -> list:
+        """Insère les lignes dans la transaction de `session` ; colonnes `returning`, dans l'ordre"""
+        if session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            statement = insert(self.table).returning(*self.returning, sort_by_parameter_order=True)
+            return session.execute(statement, rows).all()
+        # Pas de RETURNING sur executemany : une instruction par ligne, un seul commit
+        statement = insert(self.table).returning(*self.returning)
+        return [session.execute(statement, row).one() for row in rows]
+
+    def _committed(self, written: List[Tuple[Dict, object]]) -> None:
+        """Appelé après le commit avec les (valeurs, colonnes `returning`) des lignes écrites"""
+
+    async def _write_batch(self, rows: List[Dict]) -> list:
+        """Insère les lignes en une transaction et retourne les colonnes `returning`, dans l'ordre"""
+        result = await database.run_write(lambda session: self._insert_rows(session, rows))
+        self._committed(list(zip(rows, result)))
+        self.batches_total += 1
+        self.rows_total += len(rows)
+        self.batch_size_max = max(self.batch_size_max, len(rows))
+        return result
+
+    async def _write_one_by_one(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        for values, future in batch:
+            try:
+                row = (await self._write_batch([values]))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(row)
+
+    def snapshot(self) -> Dict:
+        """Retourne les métriques courantes (lots écrits, taille des lots, replis ligne par ligne)"""
+        return {
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+            "batches_total": self.batches_total,
+            "rows_total": self.rows_total,
+            "batch_size_avg": round(self.rows_total / self.batches_total, 2) if self.batches_total else 0.0,
+            "batch_size_max": self.batch_size_max,
+            "fallback_total": self.fallback_total,
+        }
+
+
+class AnalysisWriter(WriteBehindCommitter):
+    """
+    Insertions de la table analyses. Les lignes reçues portent encore `job_description` et
+    `candidate_profile` (JSON) : la description est remplacée par sa ligne job_postings et le
+    profil compressé dans analysis_profiles, dans la même transaction (voir analysis_store.py).
+    Les identifiants job_postings ne sont mis en cache qu'après le commit, à partir des lignes
+    écrites (colonne `job_posting_id` de `returning`).
+    """
+
+    STORED_APART = ("job_description", "candidate_profile")
+
+    def _insert_rows(self, session, rows: List[Dict]) -> list:
+        try:
+            posting_ids = analysis_store.job_posting_ids(session, [row["job_description"] for row in rows])
+            analyses = []
+            for row in rows:
+                analysis = {column: value for column, value in row.items() if column not in self.STORED_APART}
+                analysis["job_posting_id"] = posting_ids[row["job_description"]]
+                analyses.append(analysis)
+            saved = super()._insert_rows(session, analyses)
+            profiles = [analysis_store.profile_row(analysis.id, row["candidate_profile"])
+                        for analysis, row in zip(saved, rows) if row.get("candidate_profile")]
+            if profiles:
+                session.execute(insert(models.AnalysisProfile), profiles)
+            return saved
+        except Exception:
+            # Identifiant en cache peut-être périmé (base vidée) : relu au prochain lot
+            analysis_store.forget_job_postings()
+            raise
+
+    def _committed(self, written: List[Tuple[Dict, object]]) -> None:
+        analysis_store.remember_job_postings({values["job_description"]: row.job_posting_id
+                                              for values, row in written})
+
+
+analysis_writer = AnalysisWriter(
+    models.Analysis.__table__,
+    returning=(models.Analysis.__table__.c.id, models.Analysis.__table__.c.created_at,
+               models.Analysis.__table__.c.job_posting_id),
+    max_batch=WRITE_BATCH_SIZE,
+    max_delay=WRITE_BATCH_DELAY_MS / 1000,
+)
@@ -0,0 +1,58 @@
+"""
+Compare deux résultats de benchmark (JSON produits par benchmarks.run).
+
+Usage (depuis backend/) :
+    python -m benchmarks.compare benchmarks/results/avant.json benchmarks/results/apres.json
+    python -m benchmarks.compare avant.json apres.json --metric p95_ms --threshold 15
+
+Code de sortie 1 si une suite régresse au-delà du seuil (en %) sur la métrique choisie.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare deux résultats de benchmark")
+    parser.add_argument("baseline", help="Résultats de référence (JSON)")
+    parser.add_argument("candidate", help="Résultats à comparer (JSON)")
+    parser.add_argument("--metric", default="p50_ms", help="Métrique de latence comparée (défaut : p50_ms)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Régression tolérée en %% (défaut : 10)")
+    parser.add_argument("--all-labels", action="store_true", help="Afficher aussi le détail par étiquette")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"Référence : {baseline['meta']['git'].get('commit')}  ->  "
+          f"Candidat : {candidate['meta']['git'].get('commit')}   ({args.metric})")
+
+    regressions = []
+    for suite, stats in candidate["suites"].items():
+        base_stats = baseline["suites"].get(suite)
+        if base_stats is None:
+            print(f"{suite:28s} (absente de la référence)")
+            continue
+        labels = sorted(stats) if args.all_labels else ["all"]
+        for label in labels:
+            if label not in base_stats:
+                continue
+            before, after = base_stats[label][args.metric], stats[label][args.metric]
+            delta = (after - before) / before * 100 if before else 0.0
+            name = suite if label == "all" else f"  {label}"
+            flag = ""
+            if label == "all" and delta > args.threshold:
+                flag = "  REGRESSION"
+                regressions.append(suite)
+            print(f"{name:28s} {before:10.2f} -> {after:10.2f} ms  ({delta:+6.1f}%){flag}")
+
+    if regressions:
+        print(f"Régression au-delà de {args.threshold}% : {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Génération d'un corpus synthétique de CVs (PDF et DOCX) et de descriptions de poste.
+
+Le corpus est entièrement déterministe (graine fixe) : deux exécutions produisent
+les mêmes fichiers, ce qui permet de comparer les résultats entre commits.
+Variantes couvertes : langue (fr/en), taille (small/medium/large/xlarge) et mise en page
+(classic : une colonne, two_column : barre latérale, table : compétences en tableau).
+"""
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import docx
+
+LANGUAGES = ("fr", "en")
+SIZES = {"small": 2, "medium": 5, "large": 14, "xlarge": 80}  # nombre d'expériences (xlarge : ~20 pages)
+LAYOUTS = ("classic", "two_column", "table")
+
+FIRST_NAMES = ["Camille", "Hugo", "Lea", "Nathan", "Ines", "Louis", "Chloe", "Adam", "Sarah", "Yanis"]
+LAST_NAMES = ["Durand", "Lefebvre", "Moreau", "Girard", "Rousseau", "Fontaine", "Chevalier", "Lambert"]
+CITIES = [("Paris", "France"), ("Lyon", "France"), ("Nantes", "France"), ("Casablanca", "Maroc"),
+          ("Madrid", "Spain"), ("Berlin", "Germany"), ("London", "UK")]
+COMPANIES = ["Acme Solutions", "Nexora", "Datavia", "Blue Harbor", "Optimis Conseil", "Kelvin Labs",
+             "Polaris Finance", "Atelier Numerique", "Vertigo Media", "Helios Systems"]
+SCHOOLS = ["Université de Lyon", "École Supérieure de Commerce de Paris", "Institut National Polytechnique",
+           "University of Manchester", "École Nationale Supérieure d'Informatique"]
+SKILLS = {
+    "dev": ["Python", "JavaScript", "TypeScript", "React", "Node.js", "Django", "Flask", "Docker",
+            "Kubernetes", "AWS", "PostgreSQL", "MongoDB", "Git", "Jenkins", "GraphQL", "REST API"],
+    "data": ["Python", "Pandas", "NumPy", "TensorFlow", "PyTorch", "SQL", "Spark", "Tableau",
+             "Power BI", "Machine Learning", "Deep Learning", "Azure", "Git"],
+    "finance": ["Sage", "Ciel", "Excel", "Power BI", "IFRS", "Fiscalité", "TVA", "Audit", "SAP"],
+    "marketing": ["SEO", "SEM", "Google Analytics", "HubSpot", "Mailchimp", "Canva", "WordPress",
+                  "Content Marketing", "Social Media"],
+}
+TITLES = {
+    "fr": {"dev": "Développeur Full Stack", "data": "Data Scientist", "finance": "Comptable Senior",
+           "marketing": "Responsable Marketing Digital"},
+    "en": {"dev": "Full Stack Developer", "data": "Data Scientist", "finance": "Senior Accountant",
+           "marketing": "Digital Marketing Manager"},
+}
+MISSIONS = {
+    "fr": ["Développé une application web de gestion des commandes",
+           "Conçu une architecture microservices pour la plateforme client",
+           "Géré une équipe de 4 personnes sur un projet de refonte",
+           "Implémenté des tableaux de bord de suivi de l'activité",
+           "Amélioré les performances de l'application de 40%",
+           "Gestion de la clôture mensuelle et des déclarations fiscales",
+           "Création de campagnes emailing et suivi des indicateurs",
+           "Analyse des données clients et segmentation"],
+    "en": ["Developed a web application to manage customer orders",
+           "Designed a microservices architecture for the client platform",
+           "Managed a team of 4 people on a redesign project",
+           "Implemented dashboards to monitor business activity",
+           "Improved application performance by 40%",
+           "Performed monthly closing and tax declarations",
+           "Created email campaigns and tracked key metrics",
+           "Analyzed customer data and built segments"],
+}
+HEADINGS = {
+    "fr": {"summary": "Profil professionnel", "experience": "Expérience Professionnelle",
+           "education": "Formation", "skills": "Compétences", "projects": "Projets",
+           "certifications": "Certifications", "languages": "Langues"},
+    "en": {"summary": "Professional Summary", "experience": "Work Experience",
+           "education": "Education", "skills": "Skills", "projects": "Projects",
+           "certifications": "Certifications", "languages": "Languages"},
+}
+SUMMARIES = {
+    "fr": "{title} avec {years} ans d'expérience, spécialisé dans {a} et {b}. "
+          "Autonome, rigoureux et orienté résultats, je recherche un nouveau défi.",
+    "en": "{title} with {years} years of experience, specialized in {a} and {b}. "
+          "Autonomous, rigorous and results-driven, looking for a new challenge.",
+}
+JOB_DESCRIPTIONS = [
+    ("dev_fr", "Développeur Full Stack React / Node.js\n"
+               "Nous recherchons un développeur full stack maîtrisant React, Node.js et PostgreSQL.\n"
+               "Compétences requises : JavaScript, TypeScript, Docker, Git, REST API.\n"
+               "Connaissance de AWS et Kubernetes appréciée. Méthodes agiles (Scrum)."),
+    ("data_en", "Data Scientist\n"
+                "We are looking for a data scientist proficient in Python, Pandas and machine learning.\n"
+                "Required skills: TensorFlow or PyTorch, SQL, Spark.\n"
+                "Experience with Azure and Power BI is a plus."),
+    ("finance_fr", "Comptable confirmé\n"
+                   "Maîtrise de Sage et Excel, connaissance des normes IFRS.\n"
+                   "Missions : clôtures mensuelles, déclarations fiscales, TVA."),
+    ("marketing_en", "Digital Marketing Manager\n"
+                     "Skills: SEO, SEM, Google Analytics, content marketing and social media.\n"
+                     "Experience with HubSpot and Mailchimp required."),
+]
+
+
+@dataclass
+class CorpusItem:
+    name: str
+    path: str
+    extension: str
+    language: str
+    size: str
+    layout: str
+    domain: str
+
+
+def build_cv(rng: random.Random, language: str, size: str, domain: str) -> Dict:
+    """Construit le contenu structuré d'un CV fictif"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    city, country = rng.choice(CITIES)
+    title = TITLES[language][domain]
+    skills = rng.sample(SKILLS[domain], k=min(len(SKILLS[domain]), 8))
+    years = rng.randint(2, 15)
+    experiences = []
+    year = 2024
+    for _ in range(SIZES[size]):
+        start = year - rng.randint(1, 3)
+        experiences.append({
+            "title": title if rng.random() < 0.5 else rng.choice(list(TITLES[language].values())),
+            "company": rng.choice(COMPANIES),
+            "period": f"{start} - {year}" if year != 2024 else f"{start} - {'Présent' if language == 'fr' else 'Present'}",
+            "missions": rng.sample(MISSIONS[language], k=3),
+        })
+        year = start
+    education = [{
+        "degree": rng.choice(["Master en Informatique", "Licence en Gestion", "Master of Science in Data",
+                              "Bachelor in Business", "Diplôme d'ingénieur"]),
+        "school": rng.choice(SCHOOLS),
+        "years": f"{year - 5} - {year - 3}",
+    } for _ in range(1 + (size != "small"))]
+    projects = [{"name": f"Projet {rng.choice(['Atlas', 'Orion', 'Nova', 'Zephyr'])}",
+                 "description": rng.choice(MISSIONS[language])} for _ in range(1 + SIZES[size] // 3)]
+    return {
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "phone": f"+33 6 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+        "location": f"{city}, {country}",
+        "title": title,
+        "summary": SUMMARIES[language].format(title=title, years=years, a=skills[0], b=skills[1]),
+        "skills": skills,
+        "experiences": experiences,
+        "education": education,
+        "projects": projects,
+        "certifications": [rng.choice(["AWS Certified Cloud Practitioner", "Google Analytics Certification",
+                                       "Certificat Voltaire", "Scrum Master Certified"])],
+        "languages": ["Français - Natif", "Anglais - Courant (C1)"] if language == "fr"
+                     else ["English - Fluent", "French - Intermediate (B1)"],
+    }
+
+
+def cv_sections(cv: Dict, language: str) -> List[Tuple[str, List[str]]]:
+    """Retourne les sections du CV sous forme (titre, lignes)"""
+    h = HEADINGS[language]
+    experience_lines = []
+    for exp in cv["experiences"]:
+        experience_lines.extend([exp["title"], exp["company"], exp["period"]])
+        experience_lines.extend(f"- {m}" for m in exp["missions"])
+        experience_lines.append("")
+    return [
+        (h["summary"], [cv["summary"]]),
+        (h["experience"], experience_lines),
+        (h["education"], [f"{e['degree']} {e['school']} {e['years']}" for e in cv["education"]]),
+        (h["skills"], [", ".join(cv["skills"])]),
+        (h["projects"], [line for p in cv["projects"] for line in (p["name"], f"- {p['description']}")]),
+        (h["certifications"], cv["certifications"]),
+        (h["languages"], cv["languages"]),
+    ]
+
+
+def cv_to_text(cv: Dict, language: str) -> str:
+    """Version texte brut du CV (utilisée pour les benchmarks sans extraction)"""
+    lines = [cv["name"], cv["title"], cv["email"], cv["phone"], cv["location"], ""]
+    for heading, section_lines in cv_sections(cv, language):
+        lines.append(heading)
+        lines.extend(section_lines)
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+class _PdfWriter:
+    """Écrit un PDF texte minimal (Helvetica, encodage WinAnsi) sans dépendance externe"""
+
+    PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+
+    def __init__(self):
+        self.pages: List[List[Tuple[float, float, int, bool, str]]] = [[]]
+
+    def new_page(self):
+        self.pages.append([])
+
+    def text(self, x: float, y: float, size: int, value: str, bold: bool = False):
+        self.pages[-1].append((x, y, size, bold, value))
+
+    @staticmethod
+    def _escape(value: str) -> bytes:
+        raw = value.encode("cp1252", errors="replace")
+        return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def save(self, path: str):
+        objects: List[bytes] = []
+        page_count = len(self.pages)
+        # 1: catalogue, 2: pages, 3-4: polices, puis (page, contenu) par page
+        kids = " ".join(f"{5 + 2 * i} 0 R" for i in range(page_count))
+        objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+        objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode())
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+        for i, items in enumerate(self.pages):
+            stream = b"".join(
+                b"BT /" + (b"F2" if bold else b"F1") + f" {size} Tf {x:.1f} {y:.1f} Td (".encode()
+                + self._escape(value) + b") Tj ET\n"
+                for x, y, size, bold, value in items
+            )
+            objects.append(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.PAGE_WIDTH} {self.PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {6 + 2 * i} 0 R >>".encode()
+            )
+            objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"endstream")
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        with open(path, "wb") as f:
+            f.write(out)
+
+
+def _wrap(value: str, width: int) -> List[str]:
+    words, lines, current = value.split(), [], ""
+    for word in words:
+        if current and len(current) + len(word) + 1 > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+
+def write_pdf(cv: Dict, language: str, layout: str, path: str):
+    """Écrit le CV en PDF (une colonne, ou barre latérale pour two_column)"""
+    pdf = _PdfWriter()
+    top, bottom, line_height = 800, 50, 14
+
+    if layout == "two_column":
+        # Barre latérale (contact, compétences, langues) à gauche, contenu principal à droite
+        y = top
+        pdf.text(40, y, 16, cv["name"], bold=True)
+        y -= 2 * line_height
+        sidebar = [cv["email"], cv["phone"], cv["location"], "", HEADINGS[language]["skills"]]
+        sidebar += cv["skills"] + ["", HEADINGS[language]["languages"]] + cv["languages"]
+        for line in sidebar:
+            pdf.text(40, y, 9, line, bold=line in HEADINGS[language].values())
+            y -= line_height
+        sections = [s for s in cv_sections(cv, language)
+                    if s[0] not in (HEADINGS[language]["skills"], HEADINGS[language]["languages"])]
+        x, width, y = 220, 60, top - 2 * line_height
+        pdf.text(x, top, 12, cv["title"], bold=True)
+    else:
+        y = top
+        for line, size, bold in ((cv["name"], 16, True), (cv["title"], 12, True), (cv["email"], 10, False),
+                                 (cv["phone"], 10, False), (cv["location"], 10, False)):
+            pdf.text(50, y, size, line, bold=bold)
+            y -= line_height + (4 if size > 10 else 0)
+        y -= line_height
+        sections = cv_sections(cv, language)
+        x, width = 50, 90
+
+    for heading, lines in sections:
+        if y < bottom + 3 * line_height:
+            pdf.new_page()
+            y = top
+        pdf.text(x, y, 12, heading, bold=True)
+        y -= line_height + 4
+        for line in lines:
+            for wrapped in _wrap(line, width):
+                if y < bottom:
+                    pdf.new_page()
+                    y = top
+                if wrapped:
+                    pdf.text(x, y, 10, wrapped)
+                y -= line_height
+        y -= line_height
+    pdf.save(path)
+
+
+def write_docx(cv: Dict, language: str, layout: str, path: str):
+    """Écrit le CV en DOCX (paragraphes, ou tableaux pour les mises en page table/two_column)"""
+    document = docx.Document()
+    document.add_heading(cv["name"], level=0)
+    document.add_paragraph(cv["title"])
+    contact = [cv["email"], cv["phone"], cv["location"]]
+    if layout == "classic":
+        for line in contact:
+            document.add_paragraph(line)
+    else:
+        table = document.add_table(rows=1, cols=3)
+        for cell, line in zip(table.rows[0].cells, contact):
+            cell.text = line
+
+    for heading, lines in cv_sections(cv, language):
+        document.add_heading(heading, level=1)
+        if layout != "classic" and heading == HEADINGS[language]["skills"]:
+            skills = cv["skills"]
+            table = document.add_table(rows=(len(skills) + 3) // 4, cols=4)
+            for i, skill in enumerate(skills):
+                table.cell(i // 4, i % 4).text = skill
+            continue
+        for line in lines:
+            if line:
+                document.add_paragraph(line)
+    document.save(path)
+
+
+def generate_corpus(output_dir: str, seed: int = 42, per_variant: int = 1) -> List[CorpusItem]:
+    """Génère tous les CVs (langue x taille x mise en page x format) dans output_dir"""
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    domains = list(SKILLS)
+    items = []
+    for language in LANGUAGES:
+        for size in SIZES:
+            for layout in LAYOUTS:
+                for n in range(per_variant):
+                    domain = rng.choice(domains)
+                    cv = build_cv(rng, language, size, domain)
+                    for extension, writer in ((".pdf", write_pdf), (".docx", write_docx)):
+                        name = f"{language}_{size}_{layout}_{n}{extension}"
+                        path = os.path.join(output_dir, name)
+                        writer(cv, language, layout, path)
+                        items.append(CorpusItem(name, path, extension, language, size, layout, domain))
+    return items
+
+
+def generate_texts(seed: int = 42, per_variant: int = 1) -> List[Tuple[str, str]]:
+    """Génère les textes bruts des CVs (nom, texte), sans passer par des fichiers"""
+    rng = random.Random(seed)
+    domains = list(SKILLS)
+    texts = []
+    for language in LANGUAGES:
+        for size in SIZES:
+            for n in range(per_variant):
+                cv = build_cv(rng, language, size, rng.choice(domains))
+                texts.append((f"{language}_{size}_{n}", cv_to_text(cv, language)))
+    return texts
@@ -0,0 +1,182 @@
+"""
+Corpus de référence (golden) des sorties de l'analyseur de CV.
+
+Les textes de CV anonymisés de benchmarks/golden/cases/ sont analysés avec chaque
+description de poste du corpus de benchmark ; les sorties de `analyze_cv` et de
+`extract_candidate_profile` sont figées dans benchmarks/golden/expected/.
+
+Usage (depuis backend/) :
+    python -m benchmarks.golden check                  # compare aux sorties figées
+    python -m benchmarks.golden check --tolerance 0.5  # écarts numériques tolérés
+    python -m benchmarks.golden record                 # fige les sorties actuelles (changement voulu)
+
+`check` affiche les différences champ par champ et les écarts de score, et sort
+en erreur (code 1) en cas de dérive : une optimisation doit prouver qu'elle ne
+change pas les résultats, ou quantifier l'écart.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+CASES_DIR = os.path.join(GOLDEN_DIR, "cases")
+EXPECTED_DIR = os.path.join(GOLDEN_DIR, "expected")
+
+# Champs de score suivis séparément dans le rapport
+SCORE_FIELDS = ("analyze_cv.score", "candidate_profile.score_correspondance")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def load_cases() -> List[Tuple[str, str]]:
+    """Retourne les cas (nom, texte du CV) triés par nom"""
+    cases = []
+    for filename in sorted(os.listdir(CASES_DIR)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(CASES_DIR, filename), encoding="utf-8") as f:
+                cases.append((filename[:-4], f.read()))
+    return cases
+
+
+def compute_outputs(text: str) -> Dict[str, Dict]:
+    """Sorties de l'analyseur pour un CV, par description de poste"""
+    from app.cv_analyzer import CVAnalyzer
+    from benchmarks.corpus import JOB_DESCRIPTIONS
+
+    outputs = {}
+    for job_name, job_description in JOB_DESCRIPTIONS:
+        outputs[job_name] = {
+            "analyze_cv": CVAnalyzer().analyze_cv(text, job_description),
+            "candidate_profile": CVAnalyzer().extract_candidate_profile(text, job_description),
+        }
+    # Aller-retour JSON : mêmes types que les sorties figées (tuples -> listes, etc.)
+    return json.loads(json.dumps(outputs, ensure_ascii=False))
+
+
+def flatten(value: Any, prefix: str = "") -> Dict[str, Any]:
+    """Aplatit un objet JSON en {chemin: valeur scalaire}"""
+    if isinstance(value, dict):
+        items = {}
+        for key, child in value.items():
+            items.update(flatten(child, f"{prefix}.{key}" if prefix else str(key)))
+        return items or {prefix: {}}
+    if isinstance(value, list):
+        items = {}
+        for index, child in enumerate(value):
+            items.update(flatten(child, f"{prefix}[{index}]"))
+        return items or {prefix: []}
+    return {prefix: value}
+
+
+def diff(expected: Dict, actual: Dict, tolerance: float) -> List[Tuple[str, Any, Any]]:
+    """Différences champ par champ (chemin, attendu, obtenu) ; `None` signale un champ absent"""
+    before, after = flatten(expected), flatten(actual)
+    changes = []
+    for path in sorted(set(before) | set(after), key=lambda p: (p not in before, p)):
+        old, new = before.get(path, None), after.get(path, None)
+        if path not in before or path not in after:
+            changes.append((path, old, new))
+        elif isinstance(old, (int, float)) and isinstance(new, (int, float)) \
+                and not isinstance(old, bool) and not isinstance(new, bool):
+            if abs(old - new) > tolerance:
+                changes.append((path, old, new))
+        elif old != new:
+            changes.append((path, old, new))
+    return changes
+
+
+def _short(value: Any, width: int = 70) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def record() -> None:
+    os.makedirs(EXPECTED_DIR, exist_ok=True)
+    for name, text in load_cases():
+        with open(os.path.join(EXPECTED_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(compute_outputs(text), f, indent=1, ensure_ascii=False, sort_keys=True)
+            f.write("\n")
+        print(f"[golden] {name} enregistré")
+
+
+def check(tolerance: float, max_fields: int, report_path: str = None) -> int:
+    drifted, score_deltas, report = 0, [], {}
+    cases = load_cases()
+    for name, text in cases:
+        expected_path = os.path.join(EXPECTED_DIR, f"{name}.json")
+        if not os.path.exists(expected_path):
+            print(f"[golden] {name} : aucune sortie figée (lancer `record`)")
+            drifted += 1
+            continue
+        with open(expected_path, encoding="utf-8") as f:
+            expected = json.load(f)
+        actual = compute_outputs(text)
+
+        for job_name in sorted(set(expected) | set(actual)):
+            changes = diff(expected.get(job_name, {}), actual.get(job_name, {}), tolerance)
+            if not changes:
+                continue
+            drifted += 1
+            report[f"{name}/{job_name}"] = [{"field": p, "expected": o, "actual": n} for p, o, n in changes]
+            print(f"\n[golden] {name} / {job_name} : {len(changes)} champ(s) modifié(s)")
+            for path, old, new in changes:
+                if path in SCORE_FIELDS and isinstance(old, (int, float)) and isinstance(new, (int, float)):
+                    score_deltas.append(new - old)
+                    print(f"  SCORE {path}: {old} -> {new} ({new - old:+.2f})")
+            for path, old, new in changes[:max_fields]:
+                if path not in SCORE_FIELDS:
+                    print(f"  {path}: {_short(old)} -> {_short(new)}")
+            if len(changes) > max_fields:
+                print(f"  ... {len(changes) - max_fields} autre(s)")
+
+    total = len(cases) * len(_job_names())
+    print(f"\n[golden] {total - drifted}/{total} combinaisons identiques", end="")
+    if score_deltas:
+        print(f", écart de score max {max(score_deltas, key=abs):+.2f}, "
+              f"moyen {sum(abs(d) for d in score_deltas) / len(score_deltas):.2f}")
+    else:
+        print()
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 1 if drifted else 0
+
+
+def _job_names() -> List[str]:
+    from benchmarks.corpus import JOB_DESCRIPTIONS
+    return [name for name, _ in JOB_DESCRIPTIONS]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corpus de référence des sorties de l'analyseur")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("record", help="Fige les sorties actuelles")
+    check_parser = sub.add_parser("check", help="Compare les sorties actuelles aux sorties figées")
+    check_parser.add_argument("--tolerance", type=float, default=0.0,
+                              help="Écart toléré sur les valeurs numériques (défaut : 0, comparaison exacte)")
+    check_parser.add_argument("--max-fields", type=int, default=20,
+                              help="Nombre maximal de champs affichés par combinaison")
+    check_parser.add_argument("--report", help="Écrit le détail des différences dans ce fichier JSON")
+    args = parser.parse_args(argv)
+
+    if os.environ.get("PYTHONHASHSEED") != "0":
+        # Certaines listes sont construites à partir de sets (ex. technologies d'une expérience) :
+        # l'ordre dépend du hachage des chaînes, on le fixe pour des sorties reproductibles
+        env = dict(os.environ, PYTHONHASHSEED="0")
+        sys.exit(subprocess.call([sys.executable, "-m", "benchmarks.golden", *(argv or sys.argv[1:])],
+                                 cwd=BACKEND_DIR, env=env))
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.command == "record":
+        record()
+    else:
+        sys.exit(check(args.tolerance, args.max_fields, args.report))
+
+
+if __name__ == "__main__":
+    main()
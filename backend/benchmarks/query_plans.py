@@ -0,0 +1,179 @@
+"""
+Plans d'exécution des requêtes de lecture de la table analyses.
+
+Crée une base SQLite temporaire avec le schéma des migrations, la remplit, puis vérifie
+avec EXPLAIN QUERY PLAN que :
+  - la liste des analyses d'un utilisateur (GET /analysis/, tri par date ou par score)
+    est lue dans l'ordre de l'index (user_id, created_at) ou (user_id, score), sans
+    parcours de la table ni tri temporaire ;
+  - le chargement d'une analyse avec contrôle du propriétaire, puis de son profil, passe
+    par la clé primaire.
+Mesure ensuite la latence de la liste pour des tables de tailles croissantes (même
+nombre d'analyses par utilisateur) : elle doit rester stable.
+
+Usage (depuis backend/) :
+    python -m benchmarks.query_plans                      # plans + latence (1k, 10k, 100k lignes)
+    python -m benchmarks.query_plans --sizes 1000 200000  # tailles de table mesurées
+    python -m benchmarks.query_plans --max-growth 3       # ratio de latence toléré (défaut : 3)
+
+Sort en erreur (code 1) si un plan n'utilise pas l'index attendu ou si la latence croît
+au-delà de --max-growth entre la plus petite et la plus grande table.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Analyses par utilisateur, constant quelle que soit la taille de la table
+ANALYSES_PER_USER = 50
+
+
+def compile_query(statement, dialect) -> Tuple[str, tuple]:
+    """SQL et paramètres positionnels d'une requête SQLAlchemy"""
+    compiled = statement.compile(dialect=dialect)
+    return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+
+
+def query_plan(connection, statement) -> List[str]:
+    """Lignes de EXPLAIN QUERY PLAN (colonne detail)"""
+    sql, params = compile_query(statement, connection.dialect)
+    return [row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def checked_queries(user_id: int, analysis_id: int) -> List[Tuple[str, object, str]]:
+    """(nom, requête, index attendu dans le plan) des requêtes des routes d'analyse"""
+    from sqlalchemy import select
+    from app import models
+    from app.routes.analysis import list_analyses_query
+
+    return [
+        ("liste par date", list_analyses_query(user_id, "date"), "ix_analyses_user_id_created_at"),
+        ("liste par score", list_analyses_query(user_id, "score"), "ix_analyses_user_id_score"),
+        ("analyse du propriétaire",
+         select(models.Analysis).where(models.Analysis.id == analysis_id, models.Analysis.user_id == user_id),
+         "INTEGER PRIMARY KEY"),
+        ("profil de l'analyse",
+         select(models.AnalysisProfile).where(models.AnalysisProfile.analysis_id == analysis_id),
+         "PRIMARY KEY"),
+    ]
+
+
+def plan_problems(plan: List[str], expected_index: str) -> List[str]:
+    problems = []
+    if not any(expected_index in line for line in plan):
+        problems.append(f"index {expected_index} non utilisé")
+    if any("TEMP B-TREE" in line for line in plan):
+        problems.append("tri temporaire")
+    if any(line.startswith("SCAN") and "INDEX" not in line for line in plan):
+        problems.append("parcours complet de la table")
+    return problems
+
+
+def fill(engine, size: int) -> None:
+    """Complète la table jusqu'à `size` analyses (ANALYSES_PER_USER par utilisateur)"""
+    from sqlalchemy import func, insert, select
+    from app import models
+
+    rng = random.Random(size)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        current = connection.scalar(select(func.count()).select_from(models.Analysis))
+        users = connection.scalar(select(func.count()).select_from(models.User))
+        needed_users = -(-size // ANALYSES_PER_USER)
+        if needed_users > users:
+            connection.execute(insert(models.User), [
+                {"email": f"user{i}@example.com", "hashed_password": "x"} for i in range(users, needed_users)
+            ])
+        posting_id = connection.scalar(select(models.JobPosting.id))
+        if posting_id is None:
+            posting_id = connection.execute(insert(models.JobPosting).values(
+                content_hash="0" * 64, description="Développeur Python")).inserted_primary_key[0]
+        rows = []
+        for i in range(current, size):
+            rows.append({
+                "user_id": i % needed_users + 1,
+                "cv_filename": f"cv_{i}.pdf",
+                "job_posting_id": posting_id,
+                "score": rng.choice([None] + [round(rng.uniform(0, 100), 1)] * 9),
+                "completeness": "complete",
+                "created_at": start + timedelta(minutes=i),
+            })
+        if rows:
+            connection.execute(insert(models.Analysis), rows)
+
+
+def time_list(engine, user_id: int, sort: str, repeat: int) -> float:
+    """Latence médiane (ms) de la liste d'un utilisateur"""
+    from app.routes.analysis import list_analyses_query
+
+    durations = []
+    with engine.connect() as connection:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            connection.execute(list_analyses_query(user_id, sort)).all()
+            durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2] * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plans d'exécution des requêtes de la table analyses")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Tailles de table mesurées (nombre d'analyses)")
+    parser.add_argument("--repeat", type=int, default=50, help="Exécutions par mesure de latence")
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="Ratio de latence toléré entre la plus grande et la plus petite table")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="cv-plans-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'plans.db')}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from sqlalchemy import create_engine
+    from app.migrate import upgrade_database
+
+    # Schéma et index créés par les migrations, comme en production
+    upgrade_database()
+    engine = create_engine(os.environ["DATABASE_URL"])
+
+    failures = 0
+    sizes = sorted(args.sizes)
+    latencies: Dict[str, List[float]] = {"date": [], "score": []}
+    for size in sizes:
+        fill(engine, size)
+        user_id = -(-size // ANALYSES_PER_USER) // 2 + 1
+        if size == sizes[-1]:
+            print(f"Plans d'exécution ({size} analyses) :")
+            with engine.connect() as connection:
+                for name, statement, expected_index in checked_queries(user_id, analysis_id=size // 2):
+                    plan = query_plan(connection, statement)
+                    problems = plan_problems(plan, expected_index)
+                    failures += bool(problems)
+                    print(f"  [{'ERREUR' if problems else 'OK'}] {name} : {' | '.join(plan)}")
+                    for problem in problems:
+                        print(f"         {problem}")
+        for sort in latencies:
+            latencies[sort].append(time_list(engine, user_id, sort, args.repeat))
+
+    print(f"Latence médiane de la liste ({ANALYSES_PER_USER} analyses par utilisateur) :")
+    for sort, values in latencies.items():
+        growth = values[-1] / values[0] if values[0] else 0.0
+        failed = growth > args.max_growth
+        failures += failed
+        detail = ", ".join(f"{size}: {value:.3f} ms" for size, value in zip(sizes, values))
+        print(f"  [{'ERREUR' if failed else 'OK'}] tri par {sort} : {detail} (x{growth:.2f})")
+
+    engine.dispose()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
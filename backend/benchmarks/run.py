@@ -0,0 +1,266 @@
+"""
+Benchmark du pipeline d'analyse et des endpoints HTTP.
+
+Usage (depuis backend/) :
+    python -m benchmarks.run                      # toutes les suites
+    python -m benchmarks.run --suites extract_text,analyze_cv --iterations 5
+    python -m benchmarks.run --quick --output benchmarks/results/ma_branche.json
+
+Suites :
+- extract_text               : extraction du texte de chaque fichier du corpus (PDF, DOCX)
+- extract_candidate_profile  : profil candidat complet pour chaque CV x description de poste
+- analyze_cv                 : analyse (compétences, pertinence, score) pour chaque CV x description
+- http                       : POST /cv/upload, GET /analysis/{id}, GET /analysis/ via TestClient
+
+Les résultats (débit, p50/p95/p99 en ms, métadonnées du commit) sont écrits en JSON
+dans benchmarks/results/ ; `python -m benchmarks.compare` compare deux fichiers.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+SUITES = ("extract_text", "extract_candidate_profile", "analyze_cv", "http")
+
+# Variables d'environnement qui influencent les performances, enregistrées avec les résultats
+TRACKED_ENV = ("ANALYSIS_WORKERS", "MAX_CONCURRENT_ANALYSES", "LOG_LEVEL",
+               "PDF_BACKEND", "PDF_TEXT_MODE", "PDF_PARALLEL_WORKERS", "PDF_PARALLEL_MIN_PAGES",
+               "PROCESS_POOL_WORKERS", "PROFILE_PARALLEL")
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentile par interpolation linéaire sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def summarize(durations: List[float]) -> Dict:
+    """Statistiques d'une série de durées (secondes) ; latences en millisecondes"""
+    values = sorted(durations)
+    total = sum(values)
+    return {
+        "count": len(values),
+        "total_s": round(total, 4),
+        "throughput_per_s": round(len(values) / total, 2) if total else 0.0,
+        "mean_ms": round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+        "min_ms": round(values[0] * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def measure(cases: Iterable, func: Callable, iterations: int, warmup: int = 1) -> Dict[str, List[float]]:
+    """Exécute func(case) pour chaque cas ; retourne les durées par étiquette (et "all")"""
+    cases = list(cases)
+    for label, case in cases[:warmup]:
+        func(case)
+    timings: Dict[str, List[float]] = {"all": []}
+    for _ in range(iterations):
+        for label, case in cases:
+            start = time.perf_counter()
+            func(case)
+            elapsed = time.perf_counter() - start
+            timings["all"].append(elapsed)
+            timings.setdefault(label, []).append(elapsed)
+    return timings
+
+
+def bench_extract_text(corpus, iterations: int) -> Dict:
+    from app.cv_analyzer import CVAnalyzer
+
+    def run(item):
+        CVAnalyzer().extract_text(item.path, item.extension)
+
+    cases = [(f"{item.extension[1:]}_{item.size}", item) for item in corpus]
+    return measure(cases, run, iterations)
+
+
+def _text_cases(texts, jobs):
+    return [(f"{name.split('_')[1]}", (text, job)) for name, text in texts for _, job in jobs]
+
+
+def bench_candidate_profile(texts, jobs, iterations: int) -> Dict:
+    from app.cv_analyzer import CVAnalyzer
+
+    def run(case):
+        CVAnalyzer().extract_candidate_profile(*case)
+
+    return measure(_text_cases(texts, jobs), run, iterations)
+
+
+def bench_analyze_cv(texts, jobs, iterations: int) -> Dict:
+    from app.cv_analyzer import CVAnalyzer
+
+    def run(case):
+        CVAnalyzer().analyze_cv(*case)
+
+    return measure(_text_cases(texts, jobs), run, iterations)
+
+
+def bench_http(corpus, jobs, iterations: int) -> Dict:
+    """Benchmark des endpoints via TestClient, sur une base SQLite temporaire"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.migrate import upgrade_database
+
+    upgrade_database()
+
+    timings: Dict[str, List[float]] = {"all": []}
+
+    def timed(label, call):
+        start = time.perf_counter()
+        response = call()
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"{label}: HTTP {response.status_code} {response.text[:200]}")
+        timings["all"].append(elapsed)
+        timings.setdefault(label, []).append(elapsed)
+        return response
+
+    mime = {".pdf": "application/pdf",
+            ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
+    with TestClient(app) as client:
+        credentials = {"email": "bench@example.com", "password": "benchmark"}
+        client.post("/auth/register", json=credentials)
+        token = client.post("/auth/login", json=credentials).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        analysis_ids = []
+        for _ in range(iterations):
+            for i, item in enumerate(corpus):
+                job = jobs[i % len(jobs)][1]
+                with open(item.path, "rb") as f:
+                    response = timed("POST /cv/upload", lambda: client.post(
+                        "/cv/upload", headers=headers,
+                        files={"cv_file": (item.name, f, mime[item.extension])},
+                        data={"job_description": job},
+                    ))
+                analysis_ids.append(response.json()["analysis_id"])
+
+        for analysis_id in analysis_ids:
+            timed("GET /analysis/{id}", lambda: client.get(f"/analysis/{analysis_id}", headers=headers))
+        for _ in range(max(10, iterations * 5)):
+            timed("GET /analysis/", lambda: client.get("/analysis/", headers=headers))
+    return timings
+
+
+def git_metadata() -> Dict:
+    def git(*args):
+        try:
+            return subprocess.check_output(["git", *args], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL,
+                                           text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline d'analyse de CV")
+    parser.add_argument("--suites", default=",".join(SUITES),
+                        help=f"Suites à exécuter, séparées par des virgules ({', '.join(SUITES)})")
+    parser.add_argument("--iterations", type=int, default=3, help="Répétitions de chaque suite")
+    parser.add_argument("--per-variant", type=int, default=1,
+                        help="Nombre de CVs par combinaison langue x taille x mise en page")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du corpus synthétique")
+    parser.add_argument("--pdf-backend", choices=("pypdf2", "pypdfium2", "pdfminer"),
+                        help="Moteur d'extraction PDF (équivaut à PDF_BACKEND)")
+    parser.add_argument("--pdf-text-mode", choices=("compact", "layout"),
+                        help="Mode de texte PDF (équivaut à PDF_TEXT_MODE)")
+    parser.add_argument("--quick", action="store_true", help="Une seule itération (vérification rapide)")
+    parser.add_argument("--output", help="Fichier JSON de sortie (défaut : benchmarks/results/<date>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Suites inconnues : {', '.join(sorted(unknown))}")
+    iterations = 1 if args.quick else args.iterations
+
+    work_dir = tempfile.mkdtemp(prefix="cv-bench-")
+    # Base temporaire : le benchmark HTTP ne doit jamais toucher la base de développement
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.pdf_backend:
+        os.environ["PDF_BACKEND"] = args.pdf_backend
+    if args.pdf_text_mode:
+        os.environ["PDF_TEXT_MODE"] = args.pdf_text_mode
+
+    from benchmarks.corpus import JOB_DESCRIPTIONS, generate_corpus, generate_texts
+
+    corpus = generate_corpus(os.path.join(work_dir, "corpus"), seed=args.seed, per_variant=args.per_variant)
+    texts = generate_texts(seed=args.seed, per_variant=args.per_variant)
+    jobs = JOB_DESCRIPTIONS
+
+    raw: Dict[str, Dict[str, List[float]]] = {}
+    for suite in suites:
+        print(f"[bench] {suite} ...", file=sys.stderr)
+        if suite == "extract_text":
+            raw[suite] = bench_extract_text(corpus, iterations)
+        elif suite == "extract_candidate_profile":
+            raw[suite] = bench_candidate_profile(texts, jobs, iterations)
+        elif suite == "analyze_cv":
+            raw[suite] = bench_analyze_cv(texts, jobs, iterations)
+        elif suite == "http":
+            raw[suite] = bench_http(corpus, jobs, iterations)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": git_metadata(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "iterations": iterations,
+            "seed": args.seed,
+            "per_variant": args.per_variant,
+            "corpus_files": len(corpus),
+            "corpus_texts": len(texts),
+            "job_descriptions": len(jobs),
+            "env": {name: os.environ[name] for name in TRACKED_ENV if name in os.environ},
+        },
+        "suites": {
+            suite: {label: summarize(durations) for label, durations in timings.items()}
+            for suite, timings in raw.items()
+        },
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{results['meta']['git']['commit'] or 'nogit'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    for suite, stats in results["suites"].items():
+        overall = stats["all"]
+        print(f"{suite:28s} n={overall['count']:4d}  {overall['throughput_per_s']:8.2f}/s  "
+              f"p50={overall['p50_ms']:9.2f}ms  p95={overall['p95_ms']:9.2f}ms  p99={overall['p99_ms']:9.2f}ms")
+    print(f"Résultats écrits dans {output}")
+
+
+if __name__ == "__main__":
+    main()
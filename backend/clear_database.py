@@ -2,15 +2,17 @@
 Script pour supprimer toutes les données de la base de données
 """
 from app.database import SessionLocal, engine
-from app.models import User, Analysis
+from app.models import User, Analysis, AnalysisProfile, JobPosting
 
 def clear_all_data():
     """Supprime toutes les données des tables"""
     db = SessionLocal()
     try:
-        # Supprimer toutes les analyses
+        # Supprimer toutes les analyses (et leurs profils, puis les descriptions de poste)
+        db.query(AnalysisProfile).delete()
         deleted_analyses = db.query(Analysis).delete()
         print(f"[OK] {deleted_analyses} analyses supprimees")
+        db.query(JobPosting).delete()
         
         # Supprimer tous les utilisateurs
         deleted_users = db.query(User).delete()
@@ -0,0 +1,12 @@
+"""
+Configuration gunicorn (chargée automatiquement depuis backend/).
+
+Les migrations du schéma sont appliquées une seule fois par le processus maître, avant
+la création des workers (voir app/migrate.py).
+"""
+
+
+def on_starting(server):
+    from app.migrate import upgrade_database
+
+    upgrade_database()
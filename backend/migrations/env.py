@@ -0,0 +1,46 @@
+"""
+Environnement Alembic : base de l'application (DATABASE_URL), métadonnées des modèles.
+
+Exécuté par `alembic upgrade head` ou par app.migrate.upgrade_database (gunicorn on_starting).
+"""
+from alembic import context
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
+
+from app import database, models  # noqa: F401 (tables enregistrées dans Base.metadata)
+from app.logging_config import configure_logging
+
+configure_logging()
+
+target_metadata = database.Base.metadata
+
+
+def run_migrations_online() -> None:
+    # Moteur dédié sans pool : le processus maître de gunicorn ne garde aucune connexion
+    # ouverte avant de créer les workers
+    engine = create_engine(database.DATABASE_URL, connect_args=database.connect_args, poolclass=NullPool)
+    if engine.dialect.name == "sqlite":
+        # Sans contrôle des clés étrangères : le mode batch recrée les tables (DROP TABLE
+        # supprimerait en cascade les lignes des tables qui les référencent)
+        event.listen(engine, "connect", database._sqlite_pragmas("PRAGMA foreign_keys=OFF"))
+    try:
+        with engine.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                # SQLite ne sait pas modifier une colonne : les révisions générées recopient la
+                # table (batch) ; les ajouts de colonnes restent des ALTER TABLE directs
+                render_as_batch=connection.dialect.name == "sqlite",
+                # Une transaction par révision : une révision en échec n'annule pas les précédentes
+                transaction_per_migration=True,
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    # Les révisions initiales inspectent le schéma existant (base créée avant Alembic)
+    raise SystemExit("Mode hors ligne (--sql) non pris en charge : les migrations inspectent la base")
+run_migrations_online()
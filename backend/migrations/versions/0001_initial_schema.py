@@ -0,0 +1,63 @@
+"""Schéma initial : tables users et analyses
+
+Reprend les colonnes ajoutées par les anciens scripts migrate_add_languages.py et
+migrate_add_candidate_profile.py. Sur une base créée avant Alembic (create_all), seules
+les tables et colonnes manquantes sont ajoutées.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrate import has_column, has_table
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if not has_table(bind, "users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if not has_table(bind, "analyses"):
+        op.create_table(
+            "analyses",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("cv_filename", sa.String(), nullable=False),
+            sa.Column("job_description", sa.Text(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=True),
+            sa.Column("missing_skills", sa.Text(), nullable=True),
+            sa.Column("relevant_experience", sa.Text(), nullable=True),
+            sa.Column("irrelevant_experience", sa.Text(), nullable=True),
+            sa.Column("recommendations", sa.Text(), nullable=True),
+            sa.Column("languages", sa.Text(), nullable=True),
+            sa.Column("candidate_profile", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_analyses_id", "analyses", ["id"])
+        return
+
+    # Base antérieure aux migrations : colonnes nullables, ajout sans réécriture de la table
+    for column in ("languages", "candidate_profile"):
+        if not has_column(bind, "analyses", column):
+            op.add_column("analyses", sa.Column(column, sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_table("analyses")
+    op.drop_table("users")
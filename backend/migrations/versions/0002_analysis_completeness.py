@@ -0,0 +1,29 @@
+"""Colonne analyses.completeness (analyse en deux niveaux)
+
+Remplace migrate_add_completeness.py. La valeur par défaut est une constante : l'ajout
+ne réécrit pas la table (SQLite, PostgreSQL >= 11), les lignes existantes valent "complete".
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrate import has_column
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_column(op.get_bind(), "analyses", "completeness"):
+        op.add_column("analyses", sa.Column("completeness", sa.String(), nullable=False,
+                                            server_default="complete"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("analyses") as batch_op:
+        batch_op.drop_column("completeness")
@@ -0,0 +1,36 @@
+"""Index (user_id, created_at) et (user_id, score) de la table analyses
+
+Liste des analyses d'un utilisateur par date ou par score (voir benchmarks/query_plans.py).
+Sur PostgreSQL, les index sont construits avec CREATE INDEX CONCURRENTLY (sans bloquer
+les écritures), hors transaction.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_analyses_user_id_created_at": ["user_id", "created_at"],
+    "ix_analyses_user_id_score": ["user_id", "score"],
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES.items():
+                op.create_index(name, "analyses", columns, if_not_exists=True, postgresql_concurrently=True)
+        return
+    for name, columns in INDEXES.items():
+        op.create_index(name, "analyses", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="analyses")
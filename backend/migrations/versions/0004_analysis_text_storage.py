@@ -0,0 +1,104 @@
+"""Descriptions de poste et profils candidats hors de la ligne analyses
+
+- job_postings : descriptions de poste adressées par contenu (SHA-256), une ligne par texte
+  distinct, référencées par analyses.job_posting_id ;
+- analysis_profiles : profil candidat de chaque analyse, JSON compressé avec zlib.
+
+Les lignes existantes sont recopiées par lots (une transaction par lot) ; les anciennes
+colonnes sont supprimées par la révision suivante.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+import hashlib
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrate import backfill_in_batches
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# État des tables au moment de cette révision (indépendant de app/models.py)
+metadata = sa.MetaData()
+analyses = sa.Table(
+    "analyses", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("job_description", sa.Text()),
+    sa.Column("candidate_profile", sa.Text()),
+    sa.Column("job_posting_id", sa.Integer()),
+)
+job_postings = sa.Table(
+    "job_postings", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("content_hash", sa.String(64)),
+    sa.Column("description", sa.Text()),
+)
+analysis_profiles = sa.Table(
+    "analysis_profiles", metadata,
+    sa.Column("analysis_id", sa.Integer(), primary_key=True),
+    sa.Column("encoding", sa.String()),
+    sa.Column("data", sa.LargeBinary()),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_postings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("content_hash"),
+    )
+    op.create_table(
+        "analysis_profiles",
+        sa.Column("analysis_id", sa.Integer(), sa.ForeignKey("analyses.id", ondelete="CASCADE"),
+                  primary_key=True, autoincrement=False),
+        sa.Column("encoding", sa.String(), nullable=False, server_default="zlib"),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        # ADD COLUMN avec REFERENCES : pas de recopie de la table (mode batch)
+        op.execute("ALTER TABLE analyses ADD COLUMN job_posting_id INTEGER REFERENCES job_postings (id)")
+    else:
+        op.add_column("analyses", sa.Column("job_posting_id", sa.Integer(), nullable=True))
+        op.create_foreign_key("fk_analyses_job_posting_id", "analyses", "job_postings", ["job_posting_id"], ["id"])
+
+    posting_ids = {}
+
+    def move_texts(connection, row):
+        content_hash = hashlib.sha256(row["job_description"].encode("utf-8")).hexdigest()
+        posting_id = posting_ids.get(content_hash)
+        if posting_id is None:
+            posting_id = connection.scalar(
+                sa.select(job_postings.c.id).where(job_postings.c.content_hash == content_hash))
+            if posting_id is None:
+                posting_id = connection.execute(sa.insert(job_postings).values(
+                    content_hash=content_hash, description=row["job_description"])).inserted_primary_key[0]
+            posting_ids[content_hash] = posting_id
+        if row["candidate_profile"]:
+            connection.execute(sa.insert(analysis_profiles).values(
+                analysis_id=row["id"], encoding="zlib",
+                data=zlib.compress(row["candidate_profile"].encode("utf-8"), 6)))
+        return {"job_posting_id": posting_id}
+
+    with op.get_context().autocommit_block():
+        backfill_in_batches(op.get_bind(), analyses, move_texts, where=analyses.c.job_posting_id.is_(None))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        # Clé étrangère sans nom sous SQLite : recopie de la table sans la colonne
+        with op.batch_alter_table("analyses") as batch_op:
+            batch_op.drop_column("job_posting_id")
+    else:
+        op.drop_constraint("fk_analyses_job_posting_id", "analyses", type_="foreignkey")
+        op.drop_column("analyses", "job_posting_id")
+    op.drop_table("analysis_profiles")
+    op.drop_table("job_postings")
@@ -0,0 +1,63 @@
+"""Suppression de analyses.job_description et analyses.candidate_profile
+
+Textes recopiés dans job_postings et analysis_profiles par la révision 0004. Sous SQLite,
+DROP COLUMN réécrit la table une fois (sans recopie vers une table temporaire), puis `VACUUM`
+(hors transaction) rend l'espace libéré au système de fichiers. Les imports servent au
+downgrade, qui recopie les textes dans la table.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrate import backfill_in_batches
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_column("analyses", "candidate_profile")
+    op.drop_column("analyses", "job_description")
+    if op.get_bind().dialect.name == "sqlite":
+        # VACUUM refuse de s'exécuter dans une transaction
+        with op.get_context().autocommit_block():
+            op.execute("VACUUM")
+
+
+def downgrade() -> None:
+    op.add_column("analyses", sa.Column("job_description", sa.Text(), nullable=True))
+    op.add_column("analyses", sa.Column("candidate_profile", sa.Text(), nullable=True))
+
+    metadata = sa.MetaData()
+    analyses = sa.Table(
+        "analyses", metadata,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_posting_id", sa.Integer()),
+        sa.Column("job_description", sa.Text()),
+        sa.Column("candidate_profile", sa.Text()),
+    )
+    job_postings = sa.Table("job_postings", metadata, sa.Column("id", sa.Integer()), sa.Column("description", sa.Text()))
+    analysis_profiles = sa.Table("analysis_profiles", metadata, sa.Column("analysis_id", sa.Integer()),
+                                 sa.Column("encoding", sa.String()), sa.Column("data", sa.LargeBinary()))
+
+    def restore_texts(connection, row):
+        description = connection.scalar(
+            sa.select(job_postings.c.description).where(job_postings.c.id == row["job_posting_id"]))
+        profile = connection.execute(
+            sa.select(analysis_profiles.c.encoding, analysis_profiles.c.data)
+            .where(analysis_profiles.c.analysis_id == row["id"])).first()
+        candidate_profile = None
+        if profile is not None:
+            data = zlib.decompress(profile.data) if profile.encoding == "zlib" else profile.data
+            candidate_profile = data.decode("utf-8")
+        return {"job_description": description or "", "candidate_profile": candidate_profile}
+
+    with op.get_context().autocommit_block():
+        backfill_in_batches(op.get_bind(), analyses, restore_texts, where=analyses.c.job_description.is_(None))
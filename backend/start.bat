@@ -1,5 +1,6 @@
 @echo off
 echo Démarrage du serveur FastAPI...
+alembic upgrade head
 uvicorn app.main:app --reload --port 8000
 
 
@@ -0,0 +1,29 @@
+"""
+Configuration des tests (depuis backend/ : `python -m pytest`).
+
+Les modules de l'application lisent DATABASE_URL à l'import : une base SQLite temporaire est
+configurée avant tout import de `app`. Les tests qui utilisent la base demandent la fixture
+`migrated_db` (schéma créé par les migrations, comme en production).
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_WORK_DIR = tempfile.mkdtemp(prefix="cv-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_WORK_DIR, 'tests.db')}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+@pytest.fixture(scope="session")
+def migrated_db():
+    """Base temporaire migrée jusqu'à head ; retourne son URL"""
+    from app import database
+    from app.migrate import upgrade_database
+
+    upgrade_database()
+    yield os.environ["DATABASE_URL"]
+    database.shutdown_writer()
+    database.engine.dispose()
+    shutil.rmtree(_WORK_DIR, ignore_errors=True)
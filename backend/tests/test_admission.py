@@ -0,0 +1,81 @@
+"""Contrôle d'admission : file bornée (429), délai d'attente et tour de rôle par utilisateur"""
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected
+
+
+def test_free_slot_is_granted_without_waiting():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=2, max_queue=0, max_wait=1)
+        async with controller.slot("alice") as waited:
+            assert waited == 0.0
+            assert controller.active == 1
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait=5)
+        await controller.acquire("alice")
+        queued = asyncio.create_task(controller.acquire("bob"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("carol")
+        assert rejected.value.retry_after >= 1
+        assert controller.rejected_total == 1
+        controller.release()
+        await queued
+        controller.release()
+
+    asyncio.run(scenario())
+
+
+def test_wait_longer_than_max_wait_is_rejected():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=5, max_wait=0.05)
+        await controller.acquire("alice")
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("bob")
+        assert controller.timeout_total == 1
+        # La demande abandonnée ne reste pas dans la file
+        assert controller.queue_depth == 0
+        controller.release()
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_batch_capacity_check():
+    controller = AdmissionController(max_concurrent=2, max_queue=3, max_wait=1)
+    controller.check_capacity(5)
+    with pytest.raises(AdmissionRejected):
+        controller.check_capacity(6)
+
+
+def test_waiting_users_are_served_in_turn():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=10, max_wait=5)
+        served = []
+
+        async def analysis(user, index):
+            async with controller.slot(user):
+                served.append(f"{user}{index}")
+                await asyncio.sleep(0)
+
+        await controller.acquire("bulk")
+        # Upload en masse : trois analyses en file, puis un upload unitaire d'un autre utilisateur
+        tasks = [asyncio.create_task(analysis("bulk", i)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(analysis("single", 0)))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 4
+        controller.release()
+        await asyncio.gather(*tasks)
+        assert served == ["bulk0", "single0", "bulk1", "bulk2"]
+        assert controller.active == 0
+
+    asyncio.run(scenario())
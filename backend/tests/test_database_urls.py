@@ -0,0 +1,22 @@
+"""URL asynchrone des routes déduite de DATABASE_URL"""
+import pytest
+
+from app.database import _async_url, _check_async_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./cv_analysis.db", "sqlite+aiosqlite:///./cv_analysis.db"),
+    ("postgresql://u:p@db/cv?sslmode=require", "postgresql+asyncpg://u:p@db/cv?ssl=require"),
+    ("postgres://u:p@db/cv", "postgresql+asyncpg://u:p@db/cv"),
+    ("mysql://u:p@db/cv", "mysql+aiomysql://u:p@db/cv"),
+    ("mysql+pymysql://u:p@db/cv", "mysql+aiomysql://u:p@db/cv"),
+    ("postgresql+asyncpg://u:p@db/cv", "postgresql+asyncpg://u:p@db/cv"),
+])
+def test_supported_urls_use_an_async_driver(url, expected):
+    assert _check_async_url(_async_url(url)) == expected
+
+
+@pytest.mark.parametrize("url", ["oracle://u:p@db/cv", "mssql+pyodbc://u:p@db/cv"])
+def test_sync_only_driver_is_rejected(url):
+    with pytest.raises(ValueError, match="ASYNC_DATABASE_URL"):
+        _check_async_url(_async_url(url))
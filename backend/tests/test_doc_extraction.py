@@ -0,0 +1,42 @@
+"""Lecteur natif des .doc (OLE2) sur des documents enregistrés par Word"""
+import os
+
+import pytest
+
+from app.doc_extraction import DocFormatError, check_doc, extract_doc_text
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+HARMLESS_DOC = os.path.join(FIXTURES_DIR, "harmless-clean.doc")
+ENCRYPTED_DOC = os.path.join(FIXTURES_DIR, "encrypted.doc")
+
+
+def test_extracts_paragraphs_of_a_word_document():
+    text = extract_doc_text(HARMLESS_DOC)
+    lines = text.split("\n")
+    assert lines[0] == "Test"
+    assert lines[1] == "This is a harmless test document."
+    # Texte Unicode (pièces non compressées)
+    assert "ünicöde-ßtringß" in text
+    # Ni marqueurs de champ ni caractères de contrôle
+    assert not any(ord(char) < 32 and char != "\n" for char in text)
+
+
+def test_readable_document_passes_check():
+    with open(HARMLESS_DOC, "rb") as f:
+        check_doc(f.read())
+
+
+def test_encrypted_document_is_rejected():
+    with open(ENCRYPTED_DOC, "rb") as f:
+        data = f.read()
+    with pytest.raises(DocFormatError, match="mot de passe"):
+        check_doc(data)
+    with pytest.raises(DocFormatError):
+        extract_doc_text(ENCRYPTED_DOC)
+
+
+def test_truncated_document_is_rejected():
+    with open(HARMLESS_DOC, "rb") as f:
+        data = f.read()
+    with pytest.raises(DocFormatError):
+        check_doc(data[:2048])
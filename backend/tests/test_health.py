@@ -0,0 +1,50 @@
+"""/health public minimal ; état interne réservé à la supervision"""
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(migrated_db):
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_public_health_exposes_no_internal_state(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_details_and_metrics_require_the_token(client, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", "jeton")
+    for path in ("/health/details", "/metrics"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer autre"}).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer jeton"}).status_code == 200
+    details = client.get("/health/details", headers={"Authorization": "Bearer jeton"}).json()
+    assert {"admission", "writes", "password_hashing"} <= set(details)
+
+
+def _request(host: str, headers=()):
+    from starlette.requests import Request
+
+    return Request({"type": "http", "client": (host, 50000),
+                    "headers": [(name.encode(), value.encode()) for name, value in headers]})
+
+
+def test_without_token_only_direct_local_clients_are_allowed(monkeypatch):
+    from fastapi import HTTPException
+    from app import main
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", "")
+    main._check_metrics_access(_request("127.0.0.1"))
+    for request in (_request("203.0.113.7"),
+                    # Requête relayée par un reverse proxy de la même machine
+                    _request("127.0.0.1", [("x-forwarded-for", "203.0.113.7")])):
+        with pytest.raises(HTTPException) as rejected:
+            main._check_metrics_access(request)
+        assert rejected.value.status_code == 403
@@ -0,0 +1,115 @@
+"""Contrôles préalables des uploads : format réel et rejets avant la file d'analyse"""
+import io
+import os
+import zipfile
+
+import docx
+import pytest
+from PyPDF2 import PdfWriter
+
+from app import preflight as preflight_module
+from app.preflight import UNKNOWN_FORMAT_MESSAGE, PreflightError, preflight, sniff_format
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _pdf(password: str = None) -> bytes:
+    writer = PdfWriter()
+    writer.add_blank_page(width=595, height=842)
+    if password:
+        writer.encrypt(password)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _docx() -> bytes:
+    document = docx.Document()
+    document.add_paragraph("Développeuse Python")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _zip(entries) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _mark_encrypted(content: bytes) -> bytes:
+    """Positionne le bit « chiffré » des entrées du répertoire central"""
+    content = bytearray(content)
+    position = content.find(b"PK\x01\x02")
+    while position >= 0:
+        content[position + 8] |= 0x1
+        position = content.find(b"PK\x01\x02", position + 4)
+    return bytes(content)
+
+
+def _fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def test_format_is_sniffed_from_content():
+    assert sniff_format(b"\x00\x00%PDF-1.7\n") == ".pdf"
+    assert sniff_format(_docx()) == ".docx"
+    assert sniff_format(_fixture("harmless-clean.doc")) == ".doc"
+    assert sniff_format(b"Bonjour, ceci est un fichier texte") is None
+
+
+def test_valid_files_pass():
+    assert preflight(_pdf()) == ".pdf"
+    assert preflight(_docx()) == ".docx"
+    assert preflight(_fixture("harmless-clean.doc")) == ".doc"
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(PreflightError, match=UNKNOWN_FORMAT_MESSAGE):
+        preflight(b"GIF89a" + b"\x00" * 64)
+
+
+def test_truncated_pdf_is_rejected():
+    with pytest.raises(PreflightError, match="incomplet"):
+        preflight(_pdf()[:-64])
+
+
+def test_pdf_with_invalid_startxref_is_rejected():
+    content = _pdf().replace(b"startxref", b"startxref\n99999999\n%")
+    with pytest.raises(PreflightError, match="références"):
+        preflight(content)
+
+
+def test_encrypted_pdf_is_rejected():
+    with pytest.raises(PreflightError, match="chiffré"):
+        preflight(_pdf(password="secret"))
+
+
+def test_zip_without_word_parts_is_rejected():
+    with pytest.raises(PreflightError, match="pas un document Word"):
+        preflight(_zip({"[Content_Types].xml": "<Types/>", "xl/workbook.xml": "<workbook/>"}))
+
+
+def test_password_protected_zip_entries_are_rejected():
+    entries = {"[Content_Types].xml": "<Types/>", "word/document.xml": "<document/>"}
+    with pytest.raises(PreflightError, match="mot de passe"):
+        preflight(_mark_encrypted(_zip(entries)))
+
+
+def test_docx_too_large_once_decompressed_is_rejected(monkeypatch):
+    monkeypatch.setattr(preflight_module, "DOCX_MAX_UNCOMPRESSED", 1024)
+    with pytest.raises(PreflightError, match="décompressé"):
+        preflight(_docx())
+
+
+def test_truncated_docx_is_rejected():
+    with pytest.raises(PreflightError, match="incomplet ou corrompu"):
+        preflight(_docx()[:-30])
+
+
+def test_encrypted_doc_is_rejected():
+    with pytest.raises(PreflightError, match="mot de passe"):
+        preflight(_fixture("encrypted.doc"))
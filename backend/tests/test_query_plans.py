@@ -0,0 +1,63 @@
+"""Plans d'exécution de la liste des analyses : lecture dans l'ordre des index, sans tri"""
+import pytest
+
+from benchmarks.query_plans import fill, query_plan
+
+TABLE_SIZE = 2000
+USER_ID = 3
+
+
+@pytest.fixture(scope="module")
+def engine(migrated_db):
+    from app.database import engine
+
+    fill(engine, TABLE_SIZE)
+    return engine
+
+
+@pytest.mark.parametrize("sort, index", [
+    ("date", "ix_analyses_user_id_created_at"),
+    ("score", "ix_analyses_user_id_score"),
+])
+def test_list_reads_the_user_index_without_sorting(engine, sort, index):
+    from app.routes.analysis import list_analyses_query
+
+    with engine.connect() as connection:
+        plan = query_plan(connection, list_analyses_query(USER_ID, sort))
+    assert any(index in line for line in plan), plan
+    assert not any("TEMP B-TREE" in line for line in plan), plan
+    assert not any(line.startswith("SCAN") and "INDEX" not in line for line in plan), plan
+
+
+def test_list_returns_only_the_users_rows_in_order(engine):
+    from app.routes.analysis import list_analyses_query
+
+    with engine.connect() as connection:
+        by_date = connection.execute(list_analyses_query(USER_ID, "date")).all()
+        by_score = connection.execute(list_analyses_query(USER_ID, "score")).all()
+    assert by_date and {row.id for row in by_date} == {row.id for row in by_score}
+    dates = [row.created_at for row in by_date]
+    assert dates == sorted(dates, reverse=True)
+    scores = [row.score for row in by_score if row.score is not None]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_accepted_sorts_match_the_indexed_columns():
+    from typing import get_args
+    from app.routes.analysis import LIST_SORTS, ListSort
+
+    assert set(get_args(ListSort)) == set(LIST_SORTS)
+
+
+def test_list_endpoint_rejects_unknown_sort(migrated_db):
+    from fastapi.testclient import TestClient
+    from app import auth
+    from app.main import app
+
+    app.dependency_overrides[auth.get_current_user] = lambda: type("User", (), {"id": USER_ID})()
+    try:
+        with TestClient(app) as client:
+            assert client.get("/analysis/?sort=score").status_code == 200
+            assert client.get("/analysis/?sort=name").status_code == 422
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,67 @@
+"""Écriture groupée des analyses : un lot, une transaction, une ligne fautive isolée"""
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select
+
+
+@pytest.fixture
+def user_id(migrated_db):
+    from app import database, models
+
+    with database.engine.begin() as connection:
+        count = connection.scalar(select(func.count()).select_from(models.User))
+        return connection.execute(insert(models.User).values(
+            email=f"bulk{count}@example.com", hashed_password="x")).inserted_primary_key[0]
+
+
+def _row(user_id: int, filename: str) -> dict:
+    return {
+        "user_id": user_id,
+        "cv_filename": filename,
+        "job_description": "Développeur Python, FastAPI et SQLAlchemy",
+        "candidate_profile": '{"identite": {"nom": "Test"}}',
+        "score": 72.5,
+        "completeness": "complete",
+    }
+
+
+def test_insert_all_isolates_a_failing_row(user_id):
+    from app import analysis_store, database, models
+    from app.write_behind import analysis_writer
+
+    # Utilisateur inexistant : clé étrangère refusée pour cette ligne seulement
+    rows = [_row(user_id, "a.pdf"), _row(10 ** 9, "b.pdf"), _row(user_id, "c.pdf")]
+    fallbacks = analysis_writer.fallback_total
+    results = asyncio.run(analysis_writer.insert_all(rows))
+
+    assert isinstance(results[1], Exception)
+    saved = [results[0], results[2]]
+    assert all(not isinstance(result, Exception) for result in saved)
+    assert analysis_writer.fallback_total == fallbacks + 1
+
+    with database.engine.connect() as connection:
+        stored = connection.execute(
+            select(models.Analysis.id, models.Analysis.cv_filename, models.Analysis.job_posting_id)
+            .where(models.Analysis.user_id == user_id).order_by(models.Analysis.id)
+        ).all()
+        profiles = connection.scalar(
+            select(func.count()).select_from(models.AnalysisProfile)
+            .where(models.AnalysisProfile.analysis_id.in_([row.id for row in saved])))
+    assert [(row.id, row.cv_filename) for row in stored] == [(saved[0].id, "a.pdf"), (saved[1].id, "c.pdf")]
+    assert profiles == 2
+    # Une seule description de poste, partagée par les deux lignes
+    assert stored[0].job_posting_id == stored[1].job_posting_id == saved[0].job_posting_id
+
+    # Identifiant mis en cache après le commit : la description n'est plus relue
+    ids = analysis_store.job_posting_ids(None, [rows[0]["job_description"]])
+    assert ids == {rows[0]["job_description"]: saved[0].job_posting_id}
+
+
+def test_insert_all_writes_a_clean_batch_in_one_go(user_id):
+    from app.write_behind import analysis_writer
+
+    fallbacks = analysis_writer.fallback_total
+    results = asyncio.run(analysis_writer.insert_all([_row(user_id, f"{i}.pdf") for i in range(5)]))
+    assert len({result.id for result in results}) == 5
+    assert analysis_writer.fallback_total == fallbacks
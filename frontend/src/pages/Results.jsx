@@ -1,36 +1,65 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import Navbar from '../components/Navbar';
 import Loading from '../components/Loading';
 import CandidateProfile from '../components/CandidateProfile';
 import api from '../api/axios';
 
+// Analyse en deux niveaux : tant que l'analyse est partielle, elle est rechargée régulièrement
+// (au plus MAX_POLLS fois, puis l'utilisateur peut relancer le chargement)
+const POLL_INTERVAL_MS = 1500;
+const MAX_POLLS = 60;
+
 const Results = () => {
   const { id } = useParams();
   const navigate = useNavigate();
   const [analysis, setAnalysis] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [pollTimedOut, setPollTimedOut] = useState(false);
+  const polls = useRef(0);
 
-  useEffect(() => {
-    const fetchAnalysis = async () => {
-      try {
-        const response = await api.get(`/analysis/${id}`);
-        setAnalysis(response.data);
-        setLoading(false);
-      } catch (error) {
-        setError(
-          error.response?.data?.detail ||
-            'Erreur lors du chargement de l\'analyse'
-        );
-        setLoading(false);
-      }
-    };
+  const fetchAnalysis = useCallback(async () => {
+    try {
+      const response = await api.get(`/analysis/${id}`);
+      setAnalysis(response.data);
+      setLoading(false);
+    } catch (error) {
+      setError(
+        error.response?.data?.detail ||
+          'Erreur lors du chargement de l\'analyse'
+      );
+      setLoading(false);
+    }
+  }, [id]);
 
+  useEffect(() => {
     if (id) {
+      polls.current = 0;
       fetchAnalysis();
     }
-  }, [id]);
+  }, [id, fetchAnalysis]);
+
+  useEffect(() => {
+    if (analysis?.completeness !== 'partial') {
+      return undefined;
+    }
+    if (polls.current >= MAX_POLLS) {
+      setPollTimedOut(true);
+      return undefined;
+    }
+    const timer = setTimeout(() => {
+      polls.current += 1;
+      fetchAnalysis();
+    }, POLL_INTERVAL_MS);
+    return () => clearTimeout(timer);
+  }, [analysis, fetchAnalysis]);
+
+  const reloadAnalysis = () => {
+    polls.current = 0;
+    setPollTimedOut(false);
+    fetchAnalysis();
+  };
 
   if (loading) {
     return (
@@ -85,6 +114,37 @@ const Results = () => {
             </button>
           </div>
 
+          {/* Analyse partielle : le second niveau est en cours ou a échoué */}
+          {analysis.completeness === 'partial' && !pollTimedOut && (
+            <div className="mb-6 flex items-center gap-3 bg-blue-50 border border-blue-200 text-blue-800 px-4 py-3 rounded-xl">
+              <div className="animate-spin rounded-full h-5 w-5 border-b-2 border-blue-600"></div>
+              <p>
+                Analyse détaillée en cours : expériences, formation et recommandations
+                s'afficheront dans quelques instants. Le score est provisoire.
+              </p>
+            </div>
+          )}
+          {analysis.completeness === 'partial' && pollTimedOut && (
+            <div className="mb-6 flex flex-col sm:flex-row sm:items-center justify-between gap-3 bg-yellow-50 border border-yellow-300 text-yellow-800 px-4 py-3 rounded-xl">
+              <p>
+                L'analyse détaillée prend plus de temps que prévu : le score affiché reste
+                provisoire.
+              </p>
+              <button
+                onClick={reloadAnalysis}
+                className="shrink-0 bg-yellow-600 hover:bg-yellow-700 text-white font-medium py-2 px-4 rounded-md"
+              >
+                Recharger
+              </button>
+            </div>
+          )}
+          {analysis.completeness === 'failed' && (
+            <div className="mb-6 bg-yellow-50 border border-yellow-300 text-yellow-800 px-4 py-3 rounded-xl">
+              L'analyse détaillée n'a pas pu être terminée : seuls l'identité, les compétences et un
+              score provisoire sont disponibles.
+            </div>
+          )}
+
           {/* Contenu principal */}
           <div className="space-y-6">
             {analysis.candidate_profile ? (